@@ -0,0 +1,47 @@
+from django.utils.functional import cached_property
+from rest_framework import permissions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+
+
+class ClaimsUser(TokenUser):
+    """Usuário leve montado a partir das claims do access token"""
+
+    @cached_property
+    def participante_id(self):
+        return self.token.get('participante_id')
+
+    @cached_property
+    def organizador_id(self):
+        return self.token.get('organizador_id')
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Autenticação JWT que evita a consulta ao User em requisições de leitura.
+
+    Em métodos seguros (GET/HEAD/OPTIONS) retorna um ClaimsUser construído a
+    partir do token; escritas, tokens de staff e tokens emitidos antes das
+    claims de identidade carregam o User do banco normalmente.
+
+    As claims valem até o access token expirar (ACCESS_TOKEN_LIFETIME): um
+    usuário desativado ainda lê os próprios dados nesse intervalo. Rotas de
+    staff não dependem disso, pois o is_staff/is_active vem do banco.
+    """
+
+    def authenticate(self, request):
+        if request.method not in permissions.SAFE_METHODS:
+            return super().authenticate(request)
+
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        if 'participante_id' not in validated_token or validated_token.get('is_staff'):
+            return self.get_user(validated_token), validated_token
+        return ClaimsUser(validated_token), validated_token
@@ -0,0 +1,67 @@
+from usuarios.models import participante, organizador
+from .backends import ClaimsUser
+
+_CACHE_ATTR = '_participante_atual'
+
+
+def _http_request(request):
+    """Retorna o HttpRequest subjacente (o Request do DRF encapsula o do Django)"""
+    return getattr(request, '_request', request)
+
+
+def _resolver_participante(request):
+    consulta = participante.objects.select_related('organizadores')
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        # Tokens com claims de identidade dispensam a busca pelo user
+        participante_id = getattr(user, 'participante_id', None)
+        try:
+            if participante_id is not None:
+                return consulta.get(pk=participante_id)
+            return consulta.get(user_id=user.pk)
+        except participante.DoesNotExist:
+            pass
+    return consulta.get(pk=1)
+
+
+def get_current_participante(request):
+    """
+    Retorna o participante atual ou fallback para pk=1.
+
+    O resultado (já com o organizador carregado) é memoizado na requisição,
+    então views e serializers compartilham uma única consulta.
+    """
+    http_request = _http_request(request)
+    if not hasattr(http_request, _CACHE_ATTR):
+        setattr(http_request, _CACHE_ATTR, _resolver_participante(request))
+    return getattr(http_request, _CACHE_ATTR)
+
+
+def get_current_organizador(request):
+    """Retorna o organizador do participante atual ou None, sem consultas extras"""
+    try:
+        return get_current_participante(request).organizadores
+    except organizador.DoesNotExist:
+        return None
+
+
+def get_current_participante_id(request):
+    """Id do participante atual, lido das claims do token quando disponíveis"""
+    participante_id = getattr(getattr(request, 'user', None), 'participante_id', None)
+    if participante_id is not None:
+        return participante_id
+    return get_current_participante(request).pk
+
+
+def get_current_organizador_id(request):
+    """
+    Id do organizador atual ou None. A claim presente no token vale mesmo
+    nula (não é organizador), sem consulta: quem vira organizador recebe
+    tokens novos ao criar o primeiro evento. Só tokens anteriores às claims
+    caem na consulta ao banco.
+    """
+    user = getattr(request, 'user', None)
+    if isinstance(user, ClaimsUser) and 'organizador_id' in user.token:
+        return user.organizador_id
+    organizador_obj = get_current_organizador(request)
+    return organizador_obj.pk if organizador_obj is not None else None
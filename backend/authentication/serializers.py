@@ -3,6 +3,9 @@ from django.contrib.auth import authenticate
 from usuarios.models import participante
 from localidades.models import localidade
 from django.contrib.auth.models import User
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from .tokens import ParticipanteRefreshToken
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -169,3 +172,26 @@ class UserProfileSerializer(serializers.ModelSerializer):
             return participanteSerializer(participante_obj).data
         except participante.DoesNotExist:
             return None
+
+
+class ParticipanteTokenRefreshSerializer(TokenRefreshSerializer):
+    """Renova os tokens atualizando as claims de identidade do participante"""
+    token_class = ParticipanteRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        refresh.atualizar_claims()
+
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+
+            data['refresh'] = str(refresh)
+
+        return data
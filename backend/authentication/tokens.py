@@ -0,0 +1,45 @@
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.contrib.auth.models import User
+from usuarios.models import participante, organizador
+
+
+def adicionar_claims_identidade(token, user):
+    """Grava participante_id, organizador_id e is_staff no token"""
+    participante_obj = participante.objects.select_related('organizadores').filter(user_id=user.pk).first()
+    organizador_id = None
+    if participante_obj is not None:
+        try:
+            organizador_id = participante_obj.organizadores.pk
+        except organizador.DoesNotExist:
+            pass
+
+    token['participante_id'] = participante_obj.pk if participante_obj else None
+    token['organizador_id'] = organizador_id
+    token['is_staff'] = user.is_staff
+    return token
+
+
+class ParticipanteRefreshToken(RefreshToken):
+    """
+    RefreshToken com as claims de identidade do participante.
+
+    O access token derivado herda as claims, permitindo identificar o
+    participante/organizador sem consultar o banco.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        return adicionar_claims_identidade(token, user)
+
+    def atualizar_claims(self):
+        """
+        Relê as claims do banco (ex.: usuário virou organizador após o login).
+        AuthenticationFailed se o usuário foi removido ou desativado.
+        """
+        user = User.objects.filter(**{api_settings.USER_ID_FIELD: self[api_settings.USER_ID_CLAIM]}).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed('Usuário removido ou inativo.', code='user_inactive')
+        adicionar_claims_identidade(self, user)
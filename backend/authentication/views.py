@@ -2,12 +2,17 @@ from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework.authentication import SessionAuthentication
+from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
+from django.db.models import Count, Max
 from usuarios.models import participante
 from localidades.models import localidade
+from evento.condicional import gerar_etag, responder_condicional
 
+from .tokens import ParticipanteRefreshToken
 from .serializers import (
     CompleteRegistrationSerializer,
     LoginSerializer,
@@ -25,7 +30,7 @@ class RegisterView(APIView):
             try:
                 result = serializer.save()
                 user = result['user']
-                refresh = RefreshToken.for_user(user)
+                refresh = ParticipanteRefreshToken.for_user(user)
                 
                 return Response({
                     'message': 'Usuário cadastrado com sucesso',
@@ -59,7 +64,7 @@ class LoginView(APIView):
         
         if serializer.is_valid():
             user = serializer.validated_data['user']
-            refresh = RefreshToken.for_user(user)
+            refresh = ParticipanteRefreshToken.for_user(user)
             
             try:
                 participante_obj = participante.objects.get(user=user)
@@ -92,6 +97,8 @@ class LoginView(APIView):
 
 
 class ProfileView(APIView):
+    # O perfil serializa o User completo, então não usa o usuário leve das claims
+    authentication_classes = [JWTAuthentication, SessionAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
@@ -161,11 +168,13 @@ def check_cpf(request):
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def list_estados(request):
-    """Lista todos os estados disponíveis"""
+    """Lista todos os estados disponíveis (ETag pela contagem, maior id e última edição)"""
+    agregado = localidade.objects.aggregate(total=Count('id'), ultima=Max('id'), editada=Max('atualizadoEm'))
+    etag = gerar_etag('estados', agregado['total'], agregado['ultima'], agregado['editada'])
     estados = localidade.objects.values_list('uf', flat=True).distinct().order_by('uf')
-    return Response({
+    return responder_condicional(request, lambda: Response({
         'estados': list(estados)
-    })
+    }), etag)
 
 
 @api_view(['GET'])
@@ -178,10 +187,13 @@ def list_cidades(request):
             'error': 'Estado não fornecido'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    cidades = localidade.objects.filter(uf=estado.upper()).values_list('cidade', flat=True).order_by('cidade')
-    return Response({
+    localidades = localidade.objects.filter(uf=estado.upper())
+    agregado = localidades.aggregate(total=Count('id'), ultima=Max('id'), editada=Max('atualizadoEm'))
+    etag = gerar_etag('cidades', estado.upper(), agregado['total'], agregado['ultima'], agregado['editada'])
+    cidades = localidades.values_list('cidade', flat=True).order_by('cidade')
+    return responder_condicional(request, lambda: Response({
         'cidades': list(cidades)
-    })
+    }), etag)
 
 
 @api_view(['GET'])
@@ -208,7 +220,10 @@ def get_cidades(request):
     
     from localidades.models import localidade
     
-    cidades = localidade.objects.filter(uf=estado.upper()).values_list('cidade', flat=True).order_by('cidade')
-    return Response({
+    localidades = localidade.objects.filter(uf=estado.upper())
+    agregado = localidades.aggregate(total=Count('id'), ultima=Max('id'), editada=Max('atualizadoEm'))
+    etag = gerar_etag('cidades', estado.upper(), agregado['total'], agregado['ultima'], agregado['editada'])
+    cidades = localidades.values_list('cidade', flat=True).order_by('cidade')
+    return responder_condicional(request, lambda: Response({
         'cidades': list(cidades)
-    })
+    }), etag)
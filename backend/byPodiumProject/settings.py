@@ -66,13 +66,19 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Templates (inclusive os de email) compilados uma vez por processo
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
@@ -87,7 +93,34 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Banco de teste em arquivo: o SQLite em memória (cache compartilhado)
+        # não espera por locks, o que inviabiliza os testes de concorrência
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
+    }
+}
+
+# Cache compartilhado por todos os processos/workers: o painel do organizador e os
+# detalhes públicos dos eventos são invalidados aqui, e o ETag do detalhe depende da
+# versão guardada nele. Um cache por processo (LocMemCache) deixaria os demais workers
+# servindo dados vencidos. Com REDIS_URL usa o Redis (requer o pacote redis); senão, a
+# tabela do banco (crie com `python manage.py createcachetable`), e cada leitura do cache é
+# uma consulta SQL: um acerto troca as consultas aos modelos por uma à tabela do cache.
+# 'local' guarda só dicas de curta duração por processo (ex.: evento lotado).
+if os.getenv('REDIS_URL'):
+    CACHE_COMPARTILHADO = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_URL'),
+    }
+else:
+    CACHE_COMPARTILHADO = {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'cache_compartilhado',
     }
+CACHES = {
+    'default': CACHE_COMPARTILHADO,
+    'local': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
 }
 
 
@@ -135,6 +168,31 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Tempo (minutos) que uma inscrição pendente segura a vaga aguardando pagamento
+INSCRICAO_RESERVA_MINUTOS = int(os.getenv('INSCRICAO_RESERVA_MINUTOS', 24 * 60))
+
+# Tempo (horas) que a resposta de uma requisição com Idempotency-Key fica guardada
+IDEMPOTENCIA_TTL_HORAS = int(os.getenv('IDEMPOTENCIA_TTL_HORAS', 24))
+
+# Threads que concluem os pagamentos do gateway simulado (a espera do gateway não ocupa threads)
+GATEWAY_WORKERS = int(os.getenv('GATEWAY_WORKERS', 4))
+
+# Tempo (s) após o qual um pagamento em 'processando' é considerado um job perdido (ex.: restart do worker)
+GATEWAY_JOB_TIMEOUT_SEGUNDOS = int(os.getenv('GATEWAY_JOB_TIMEOUT_SEGUNDOS', 120))
+
+# Tempo (s) que o painel do organizador fica em cache (invalidado a cada mudança nas inscrições)
+PAINEL_CACHE_SEGUNDOS = int(os.getenv('PAINEL_CACHE_SEGUNDOS', 300))
+
+# Tempo (s) que os detalhes públicos de um evento ficam em cache (invalidado quando o evento é salvo)
+EVENTO_CACHE_SEGUNDOS = int(os.getenv('EVENTO_CACHE_SEGUNDOS', 600))
+
+# Atraso (s) com que uma alteração do catálogo aparece em /eventos/changes/ (transações ainda abertas não são puladas)
+ALTERACOES_MARGEM_SEGUNDOS = int(os.getenv('ALTERACOES_MARGEM_SEGUNDOS', 2))
+
+# Dias que o log de alterações do catálogo é mantido inteiro; antes disso o comando compacta_alteracoes
+# deixa só a última alteração de cada evento ativo e tokens mais antigos recebem 410 (refazer com since=0)
+ALTERACOES_RETENCAO_DIAS = int(os.getenv('ALTERACOES_RETENCAO_DIAS', 30))
+
 # Configurações de Email
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'  # Para produção
 # EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # Para desenvolvimento
@@ -150,6 +208,13 @@ EMAIL_HOST_PASSWORD = os.getenv('GMAIL_APP_PASSWORD')
 DEFAULT_FROM_EMAIL = 'noreply@bypodium.com'
 ADMIN_EMAIL = 'admin@bypodium.com'
 
+# Endereço público do backend, usado nos links dos emails (ex.: página de pagamento)
+SITE_URL = os.getenv('SITE_URL', 'http://localhost:8000').rstrip('/')
+
+# Outbox de emails (comando envia_emails): tentativas antes do dead-letter e atraso base do backoff
+OUTBOX_MAX_TENTATIVAS = int(os.getenv('OUTBOX_MAX_TENTATIVAS', 5))
+OUTBOX_BACKOFF_SEGUNDOS = int(os.getenv('OUTBOX_BACKOFF_SEGUNDOS', 30))
+
 CORS_ORIGIN_WHITELIST = (
     "http://localhost:5173",
     "http://localhost:8000",
@@ -160,7 +225,7 @@ CSRF_TRUSTED_ORIGINS = ["http://localhost:5173"]
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.backends.ClaimsJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -175,6 +240,10 @@ REST_FRAMEWORK = {
 # JWT Configuration
 from datetime import timedelta
 
+# O access token leva participante_id, organizador_id e is_staff (authentication.tokens);
+# em GETs elas são usadas sem consultar o banco, então mudanças de perfil ou a desativação
+# do usuário só aparecem no refresh. ACCESS_TOKEN_LIFETIME limita esse atraso: mantenha-o
+# curto. Tokens de staff sempre consultam o User (authentication.backends).
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
@@ -188,4 +257,5 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    'TOKEN_REFRESH_SERIALIZER': 'authentication.serializers.ParticipanteTokenRefreshSerializer',
 }
\ No newline at end of file
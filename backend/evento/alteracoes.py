@@ -0,0 +1,119 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef, Q
+from django.utils import timezone
+from .models import alteracaoEvento, compactacaoAlteracoes, evento
+from .serializers import eventoSerializerList, aplicar_plano
+
+
+class AlteracoesCatalogo:
+    """
+    Sync incremental do catálogo a partir do log alteracaoEvento.
+
+    Os sinais do evento registram uma alteração quando o status antes ou
+    depois do save é 'ativo'; caminhos com QuerySet.update (moderação em
+    lote) chamam registrar() diretamente. A leitura custa duas consultas
+    por página (três com token), proporcional às alterações e não ao
+    tamanho do catálogo.
+
+    compactar() apaga o que passou de ALTERACOES_RETENCAO_DIAS, menos a
+    última alteração de cada evento ativo: since=0 continua devolvendo o
+    catálogo inteiro, mas tokens anteriores ao corte perdem tombstones.
+    """
+
+    @staticmethod
+    def registrar(evento_ids):
+        alteracaoEvento.objects.bulk_create([alteracaoEvento(evento_id=evento_id) for evento_id in evento_ids])
+
+    @staticmethod
+    def afeta_catalogo(anterior, atual, created):
+        """Se um save com status `anterior` -> `atual` muda o catálogo (None = campo não carregado)"""
+        if 'ativo' in (anterior, atual):
+            return True
+        # Sem o status anterior ou atual não dá para descartar: o tombstone é inofensivo
+        return not created and (anterior is None or atual is None)
+
+    @staticmethod
+    def ultima():
+        """
+        (id, criadoEm) da alteração mais recente, ou (0, None): versão do
+        catálogo que avança também quando um evento sai dele
+        """
+        return alteracaoEvento.objects.order_by('-id').values_list('id', 'criadoEm').first() or (0, None)
+
+    @staticmethod
+    def token_expirado(since):
+        """Se o token é anterior ao corte da compactação (since=0 nunca expira)"""
+        if since == 0:
+            return False
+        corte = compactacaoAlteracoes.objects.values_list('corte', flat=True).first()
+        return corte is not None and since < corte
+
+    @staticmethod
+    def compactar(lote=1000):
+        """
+        Remove as alterações com mais de ALTERACOES_RETENCAO_DIAS que foram
+        substituídas por uma mais nova do mesmo evento ou cujo evento não está
+        mais ativo. O corte é gravado antes das remoções: uma execução
+        interrompida só faz tokens expirarem cedo. Retorna a quantidade removida.
+        """
+        limite_criacao = timezone.now() - timedelta(days=settings.ALTERACOES_RETENCAO_DIAS)
+        corte = alteracaoEvento.objects.filter(criadoEm__lt=limite_criacao).aggregate(corte=Max('id'))['corte']
+        if corte is None:
+            return 0
+        with transaction.atomic():
+            registro, _ = compactacaoAlteracoes.objects.select_for_update().get_or_create(pk=1)
+            if corte > registro.corte:
+                registro.corte = corte
+                registro.save(update_fields=['corte', 'atualizadoEm'])
+
+        descartaveis = alteracaoEvento.objects.filter(
+            Q(Exists(alteracaoEvento.objects.filter(evento_id=OuterRef('evento_id'), id__gt=OuterRef('id'))))
+            | ~Q(Exists(evento.objects.filter(pk=OuterRef('evento_id'), status='ativo'))),
+            id__lte=corte,
+        )
+        removidas = 0
+        while True:
+            ids = list(descartaveis.values_list('id', flat=True)[:lote])
+            if not ids:
+                return removidas
+            removidas += alteracaoEvento.objects.filter(pk__in=ids).delete()[0]
+
+    @staticmethod
+    def listar(since, limite, context=None):
+        """
+        Alterações com id > since, agrupadas por evento (estado atual):
+        {'eventos': [...], 'removidos': [{'id', 'status'}], 'proximo', 'tem_mais'}.
+
+        Alterações mais novas que ALTERACOES_MARGEM_SEGUNDOS ficam para a
+        próxima chamada: uma transação que ainda não confirmou um id menor
+        não é pulada pelo token. Uma transação que confirma depois da margem
+        (contada do INSERT da alteração) ainda pode ser pulada.
+        """
+        limite_criacao = timezone.now() - timedelta(seconds=settings.ALTERACOES_MARGEM_SEGUNDOS)
+        alteracoes = list(
+            alteracaoEvento.objects.filter(id__gt=since, criadoEm__lte=limite_criacao)
+            .order_by('id').values_list('id', 'evento_id')[:limite]
+        )
+        # dict preserva a ordem da última alteração de cada evento
+        ordem = {}
+        for _, evento_id in alteracoes:
+            ordem.pop(evento_id, None)
+            ordem[evento_id] = None
+
+        eventos = aplicar_plano(evento.objects.filter(pk__in=ordem), eventoSerializerList).in_bulk()
+        ativos, removidos = [], []
+        for evento_id in ordem:
+            evento_obj = eventos.get(evento_id)
+            if evento_obj is not None and evento_obj.status == 'ativo':
+                ativos.append(evento_obj)
+            else:
+                removidos.append({'id': evento_id, 'status': evento_obj.status if evento_obj else 'removido'})
+
+        return {
+            'eventos': eventoSerializerList(ativos, many=True, context=context or {}).data,
+            'removidos': removidos,
+            'proximo': alteracoes[-1][0] if alteracoes else since,
+            'tem_mais': len(alteracoes) == limite,
+        }
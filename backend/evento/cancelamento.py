@@ -0,0 +1,143 @@
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import F, Q
+from django.utils import timezone
+from inscricoes.models import inscricao
+from .email_service import EmailService
+from .models import emailPendente, evento, notificacaoCancelamento
+
+logger = logging.getLogger(__name__)
+
+# Tempo (s) que uma notificação fica reservada para uma execução; renovado a cada lote
+RESERVA_NOTIFICACAO_SEGUNDOS = 300
+
+
+class CancelamentoService:
+    """Aviso de cancelamento de evento a todos os inscritos, em lotes retomáveis"""
+
+    @staticmethod
+    def registrar(evento_obj):
+        """Agenda o aviso (chamar na mesma transação do cancelamento)"""
+        notificacaoCancelamento.objects.get_or_create(evento=evento_obj)
+
+    @staticmethod
+    def reservar(notificacao):
+        """
+        Reserva a notificação para esta execução com um UPDATE condicional.
+        False se outra execução a reservou e a reserva ainda não venceu.
+        """
+        agora = timezone.now()
+        reserva = agora + timedelta(seconds=RESERVA_NOTIFICACAO_SEGUNDOS)
+        reservada = notificacaoCancelamento.objects.filter(
+            Q(reservadaAte__isnull=True) | Q(reservadaAte__lte=agora), pk=notificacao.pk, status='pendente'
+        ).update(reservadaAte=reserva, atualizadoEm=agora) == 1
+        if reservada:
+            notificacao.reservadaAte = reserva
+        return reservada
+
+    @staticmethod
+    def notificar(notificacao_id, lote=500, connection=None):
+        """
+        Envia o aviso aos inscritos a partir de ultimaInscricao, em lotes por
+        id. O layout do email é renderizado uma vez por evento (só a saudação
+        muda por inscrito); a conexão SMTP é reaproveitada
+        por todos os lotes. Falhas individuais vão para o outbox (com retry).
+        Execuções simultâneas não repetem avisos: só quem reserva a
+        notificação envia. Retorna a notificação atualizada.
+        """
+        notificacao = notificacaoCancelamento.objects.get(pk=notificacao_id)
+        if notificacao.status == 'concluida' or not CancelamentoService.reservar(notificacao):
+            return notificacao
+        # Progresso relido após a reserva: outra execução pode ter avançado desde a leitura acima
+        notificacao.refresh_from_db()
+
+        try:
+            CancelamentoService._enviar(notificacao, lote, connection)
+        finally:
+            # Libera a própria reserva; se o processo morrer, ela vence em RESERVA_NOTIFICACAO_SEGUNDOS
+            notificacaoCancelamento.objects.filter(
+                pk=notificacao.pk, reservadaAte=notificacao.reservadaAte
+            ).update(reservadaAte=None)
+        notificacao.refresh_from_db()
+        return notificacao
+
+    @staticmethod
+    def _enviar(notificacao, lote, connection):
+        evento_obj = evento.objects.select_related('localidade').get(pk=notificacao.evento_id)
+        email_evento = EmailService.preparar_email_cancelamento(evento_obj)
+
+        connection = connection or get_connection(fail_silently=False)
+        connection.open()
+        try:
+            while True:
+                inscritos = list(
+                    inscricao.objects.filter(evento_id=evento_obj.pk, id__gt=notificacao.ultimaInscricao)
+                    .exclude(participante__isnull=True)
+                    .order_by('id')
+                    .values_list('id', 'participante__email', 'participante__nome')[:lote]
+                )
+                if not inscritos:
+                    break
+
+                enviados, falhas = 0, []
+                for _, email, nome in inscritos:
+                    texto, html = email_evento.para(nome=nome)
+                    mensagem = EmailMultiAlternatives(
+                        subject=email_evento.assunto,
+                        body=texto,
+                        from_email=settings.DEFAULT_FROM_EMAIL,
+                        to=[email],
+                        connection=connection,
+                    )
+                    mensagem.attach_alternative(html, 'text/html')
+                    try:
+                        mensagem.send()
+                        enviados += 1
+                    except Exception as e:
+                        logger.warning('Falha ao avisar %s do cancelamento do evento %s: %s', email, evento_obj.pk, e)
+                        falhas.append(emailPendente(
+                            destinatario=email, assunto=email_evento.assunto, corpoTexto=texto,
+                            corpoHtml=html, ultimoErro=str(e)[:2000]
+                        ))
+
+                # Progresso gravado a cada lote (renovando a reserva): uma nova execução continua daqui.
+                # Condicional ao ponto de partida: se a reserva venceu e outra execução avançou, paramos.
+                emailPendente.objects.bulk_create(falhas)
+                agora = timezone.now()
+                reserva = agora + timedelta(seconds=RESERVA_NOTIFICACAO_SEGUNDOS)
+                avancou = notificacaoCancelamento.objects.filter(
+                    pk=notificacao.pk, ultimaInscricao=notificacao.ultimaInscricao
+                ).update(
+                    ultimaInscricao=inscritos[-1][0],
+                    enviados=F('enviados') + enviados,
+                    falhas=F('falhas') + len(falhas),
+                    reservadaAte=reserva,
+                    atualizadoEm=agora,
+                )
+                if not avancou:
+                    logger.warning('Aviso de cancelamento %s retomado por outra execução', notificacao.pk)
+                    return
+                notificacao.ultimaInscricao, notificacao.reservadaAte = inscritos[-1][0], reserva
+                if len(inscritos) < lote:
+                    break
+        finally:
+            connection.close()
+
+        notificacaoCancelamento.objects.filter(pk=notificacao.pk).update(
+            status='concluida', concluidoEm=timezone.now(), atualizadoEm=timezone.now()
+        )
+
+    @staticmethod
+    def notificar_pendentes(lote=500):
+        """Processa (ou retoma) todas as notificações não concluídas"""
+        processadas = []
+        pendentes = notificacaoCancelamento.objects.filter(status='pendente').order_by('id').values_list('id', flat=True)
+        for notificacao_id in pendentes:
+            try:
+                processadas.append(CancelamentoService.notificar(notificacao_id, lote=lote))
+            except Exception:
+                # Ex.: servidor SMTP indisponível; o progresso salvo é retomado na próxima execução
+                logger.exception('Erro ao avisar o cancelamento (notificação %s)', notificacao_id)
+        return processadas
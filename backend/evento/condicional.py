@@ -0,0 +1,42 @@
+import hashlib
+from calendar import timegm
+from datetime import datetime, time
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+def gerar_etag(*partes):
+    """ETag fraco a partir de valores já conhecidos (agregados, versões), sem serializar o corpo"""
+    resumo = hashlib.md5('|'.join(str(parte) for parte in partes).encode(), usedforsecurity=False).hexdigest()
+    return f'W/{quote_etag(resumo)}'
+
+
+def ultima_modificacao(atualizado_em):
+    """
+    Last-Modified de uma representação com campos calculados sobre a data de
+    hoje (ex.: isInscricaoAberta): nunca anterior à meia-noite local
+    """
+    inicio_do_dia = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+    if atualizado_em is None:
+        return inicio_do_dia
+    return max(atualizado_em, inicio_do_dia)
+
+
+def responder_condicional(request, gerar, etag, modificado_em=None, vary=()):
+    """
+    Responde 304 quando If-None-Match/If-Modified-Since conferem com os
+    validadores; senão chama gerar() e acrescenta ETag e Last-Modified.
+    """
+    last_modified = timegm(modificado_em.utctimetuple()) if modificado_em else None
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = gerar()
+        if response.status_code != 200:
+            return response
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    if vary:
+        patch_vary_headers(response, vary)
+    return response
@@ -0,0 +1,67 @@
+from django.template.loader import get_template, select_template
+from django.utils.safestring import mark_safe
+
+PASTA = 'evento/emails'
+
+# Ocupa o lugar do trecho de cada destinatário no layout renderizado uma única vez.
+# O layout o coloca antes do conteúdo, então só a primeira ocorrência é substituída.
+_MARCADOR = '\ue002destinatario\ue003'
+
+
+class EmailPreparado:
+    """
+    Email com o layout já renderizado para o contexto comum (evento etc.).
+    para() renderiza apenas o trecho do destinatário e o encaixa no layout.
+    """
+
+    def __init__(self, assunto, texto, html, trecho_texto, trecho_html):
+        self.assunto = assunto
+        self._texto = texto
+        self._html = html
+        self._trecho_texto = trecho_texto
+        self._trecho_html = trecho_html
+
+    def para(self, **destinatario):
+        """Retorna (texto, html) para um destinatário (ex.: nome=...)"""
+        return (
+            self._texto.replace(_MARCADOR, self._trecho_texto.render(destinatario).strip(), 1),
+            self._html.replace(_MARCADOR, self._trecho_html.render(destinatario), 1),
+        )
+
+
+class EmailTemplates:
+    """
+    Renderização dos emails a partir de evento/templates/evento/emails/<template>/:
+    assunto.txt, corpo.html e corpo.txt (estendendo base.html/base.txt) e,
+    opcionalmente, destinatario.html/.txt (padrão: saudacao.html/.txt).
+    Os templates são compilados uma vez e mantidos pelo cached loader.
+    """
+
+    @staticmethod
+    def preparar(template, contexto):
+        """Renderiza assunto e layout uma única vez para um lote de destinatários"""
+        contexto = dict(contexto, destinatario=mark_safe(_MARCADOR))
+        return EmailPreparado(
+            assunto=' '.join(get_template(f'{PASTA}/{template}/assunto.txt').render(contexto).split()),
+            texto=get_template(f'{PASTA}/{template}/corpo.txt').render(contexto).strip(),
+            html=get_template(f'{PASTA}/{template}/corpo.html').render(contexto),
+            trecho_texto=select_template([f'{PASTA}/{template}/destinatario.txt', f'{PASTA}/saudacao.txt']),
+            trecho_html=select_template([f'{PASTA}/{template}/destinatario.html', f'{PASTA}/saudacao.html']),
+        )
+
+    @staticmethod
+    def renderizar_lote(template, contexto, destinatarios):
+        """
+        Gera (destinatario, assunto, texto, html) para cada dict de destinatário,
+        renderizando o layout compartilhado só uma vez.
+        """
+        email = EmailTemplates.preparar(template, contexto)
+        for destinatario in destinatarios:
+            texto, html = email.para(**destinatario)
+            yield destinatario, email.assunto, texto, html
+
+    @staticmethod
+    def renderizar(template, contexto, **destinatario):
+        """Email de um único destinatário: retorna (assunto, texto, html)"""
+        email = EmailTemplates.preparar(template, contexto)
+        return (email.assunto, *email.para(**destinatario))
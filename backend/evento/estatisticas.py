@@ -0,0 +1,229 @@
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from inscricoes.models import inscricao
+from .models import deltaEstatistica, estatisticaEvento, evento
+from .painel import PainelOrganizador
+
+# Campos da inscrição que alimentam o rollup
+CAMPOS = ('evento_id', 'status', 'kit_id', 'categoria_id', 'criadoEm')
+
+# Deltas somados ao rollup por transação do consolida_estatisticas
+CONSOLIDACAO_LOTE = 5000
+
+_local = threading.local()
+
+
+class EstatisticasEvento:
+    """
+    Manutenção incremental do rollup estatisticaEvento.
+
+    Os sinais de inscrição (criação, mudança de status/kit/categoria/dia e
+    remoção) gravam a diferença em deltaEstatistica na mesma transação da
+    alteração, só com INSERT: as linhas do rollup (total, status, dia) seriam
+    disputadas por todas as inscrições simultâneas do evento, o mesmo ponto
+    quente que o contador distribuído de vagas evita. consolidar() soma os
+    deltas no rollup em segundo plano e totais() lê rollup + pendentes.
+    Caminhos em lote (bulk_create, QuerySet.update) chamam os métodos
+    explícitos abaixo; divergências são corrigidas com reconstruir().
+    """
+
+    @staticmethod
+    def valores(instance):
+        """Valores atuais da inscrição; None se algum campo foi adiado (.only/.defer)"""
+        if any(campo not in instance.__dict__ for campo in CAMPOS):
+            return None
+        return tuple(instance.__dict__[campo] for campo in CAMPOS)
+
+    @staticmethod
+    def chaves(valores):
+        """Linhas do rollup às quais uma inscrição pertence"""
+        evento_id, status, kit_id, categoria_id, criado_em = valores
+        return [
+            (evento_id, 'total', ''),
+            (evento_id, 'status', status),
+            (evento_id, 'kit', str(kit_id or '')),
+            (evento_id, 'categoria', str(categoria_id or '')),
+            (evento_id, 'dia', timezone.localdate(criado_em).isoformat() if criado_em else ''),
+        ]
+
+    @staticmethod
+    def diferenca(anterior, atual):
+        """Counter com o delta de cada linha ao passar de `anterior` para `atual`"""
+        deltas = Counter()
+        if anterior:
+            deltas.subtract(EstatisticasEvento.chaves(anterior))
+        if atual:
+            deltas.update(EstatisticasEvento.chaves(atual))
+        return deltas
+
+    @staticmethod
+    @contextmanager
+    def em_lote():
+        """
+        Acumula os deltas dos sinais disparados no bloco (ex.: exclusão de
+        milhares de inscrições) e os grava de uma vez, um delta por linha.
+        """
+        if getattr(_local, 'pendentes', None) is not None:
+            yield
+            return
+        _local.pendentes = Counter()
+        try:
+            yield
+            pendentes = _local.pendentes
+        finally:
+            _local.pendentes = None
+        EstatisticasEvento.aplicar(pendentes)
+
+    @staticmethod
+    def registrar(deltas):
+        """Aplica os deltas agora ou, dentro de em_lote(), ao final do bloco"""
+        pendentes = getattr(_local, 'pendentes', None)
+        if pendentes is not None:
+            pendentes.update(deltas)
+        else:
+            EstatisticasEvento.aplicar(deltas)
+
+    @staticmethod
+    def aplicar(deltas):
+        """
+        Grava os deltas não nulos em deltaEstatistica (um INSERT, sem locks
+        de linha). Toda mudança nas inscrições passa por aqui, então o painel
+        dos eventos afetados é invalidado junto.
+        """
+        pendentes = [
+            deltaEstatistica(evento_id=evento_id, dimensao=dimensao, chave=chave, delta=delta)
+            for (evento_id, dimensao, chave), delta in deltas.items() if delta
+        ]
+        deltaEstatistica.objects.bulk_create(pendentes)
+        for evento_id in {pendente.evento_id for pendente in pendentes}:
+            PainelOrganizador.invalidar_evento(evento_id)
+
+    @staticmethod
+    def totais(evento_id, dimensoes=None):
+        """
+        {(dimensao, chave): total} do evento: rollup mais os deltas ainda não
+        consolidados, numa única consulta (UNION ALL)
+        """
+        rollup = estatisticaEvento.objects.filter(evento_id=evento_id)
+        pendentes = deltaEstatistica.objects.filter(evento_id=evento_id)
+        if dimensoes is not None:
+            rollup = rollup.filter(dimensao__in=dimensoes)
+            pendentes = pendentes.filter(dimensao__in=dimensoes)
+        linhas = rollup.values_list('dimensao', 'chave', 'total').union(
+            pendentes.values_list('dimensao', 'chave').annotate(soma=Sum('delta')).values_list(
+                'dimensao', 'chave', 'soma'
+            ).order_by(),
+            all=True,
+        )
+        totais = Counter()
+        for dimensao, chave, total in linhas:
+            totais[(dimensao, chave)] += total
+        return dict(totais)
+
+    @staticmethod
+    def consolidar(lote=CONSOLIDACAO_LOTE):
+        """
+        Soma os deltas pendentes no rollup e os apaga, lote a lote, cada um
+        numa transação: a leitura nunca conta um delta duas vezes. Se outra
+        execução apagou parte do lote antes, a transação é desfeita e o lote
+        relido. Retorna a quantidade de deltas consolidados.
+        """
+        consolidados = 0
+        while True:
+            with transaction.atomic():
+                ids = list(deltaEstatistica.objects.order_by('id').values_list('id', flat=True)[:lote])
+                if not ids:
+                    return consolidados
+                somas = (
+                    deltaEstatistica.objects.filter(pk__in=ids)
+                    .values_list('evento_id', 'dimensao', 'chave').annotate(soma=Sum('delta')).order_by()
+                )
+                deltas = Counter({(evento_id, dimensao, chave): soma for evento_id, dimensao, chave, soma in somas})
+                if deltaEstatistica.objects.filter(pk__in=ids).delete()[0] != len(ids):
+                    transaction.set_rollback(True)
+                    continue
+                # Eventos já removidos: os deltas das inscrições apagadas em cascata são descartados
+                existentes = set(evento.objects.filter(
+                    pk__in={evento_id for evento_id, _, _ in deltas}
+                ).values_list('id', flat=True))
+                EstatisticasEvento._somar_no_rollup(
+                    Counter({linha: delta for linha, delta in deltas.items() if linha[0] in existentes})
+                )
+            consolidados += len(ids)
+
+    @staticmethod
+    def _somar_no_rollup(deltas):
+        """
+        Incrementa cada linha com UPDATE ... SET total = total + delta. Linhas
+        ausentes só são criadas para deltas positivos.
+        """
+        for (evento_id, dimensao, chave), delta in deltas.items():
+            if not delta:
+                continue
+            linhas = estatisticaEvento.objects.filter(evento_id=evento_id, dimensao=dimensao, chave=chave)
+            if linhas.update(total=F('total') + delta) or delta < 0:
+                continue
+            try:
+                with transaction.atomic():
+                    estatisticaEvento.objects.create(evento_id=evento_id, dimensao=dimensao, chave=chave, total=delta)
+            except IntegrityError:
+                # Outra transação criou a linha entre o UPDATE e o INSERT
+                linhas.update(total=F('total') + delta)
+
+    @staticmethod
+    def inscricoes_criadas(inscricoes):
+        """Para inscrições criadas com bulk_create (sem sinais)"""
+        deltas = Counter()
+        for inscricao_obj in inscricoes:
+            deltas.update(EstatisticasEvento.chaves(EstatisticasEvento.valores(inscricao_obj)))
+        EstatisticasEvento.registrar(deltas)
+
+    @staticmethod
+    def cancelar_evento(evento_id):
+        """Após inscricao.objects.filter(evento=...).update(status='cancelado')"""
+        ativas = [
+            (chave, total) for (_, chave), total in EstatisticasEvento.totais(evento_id, ['status']).items()
+            if chave != 'cancelado' and total
+        ]
+        deltas = Counter({(evento_id, 'status', chave): -total for chave, total in ativas})
+        deltas[(evento_id, 'status', 'cancelado')] += sum(total for _, total in ativas)
+        EstatisticasEvento.aplicar(deltas)
+
+    @staticmethod
+    def reconstruir(evento_id):
+        """
+        Recalcula o rollup do evento a partir das inscrições. As consultas
+        ocorrem na mesma transação que substitui as linhas e descarta os
+        deltas pendentes, já refletidos na contagem.
+        """
+        inscricoes = inscricao.objects.filter(evento_id=evento_id)
+        with transaction.atomic():
+            linhas = []
+            total = inscricoes.count()
+            if total:
+                linhas.append(('total', '', total))
+            dimensoes = (
+                ('status', F('status')), ('kit', F('kit_id')), ('categoria', F('categoria_id')),
+                ('dia', TruncDate('criadoEm')),
+            )
+            for dimensao, expressao in dimensoes:
+                for valor, quantidade in inscricoes.values_list(expressao).annotate(quantidade=Count('id')).order_by():
+                    if dimensao == 'dia':
+                        chave = valor.isoformat() if valor else ''
+                    else:
+                        chave = str(valor or '')
+                    linhas.append((dimensao, chave, quantidade))
+
+            estatisticaEvento.objects.filter(evento_id=evento_id).delete()
+            deltaEstatistica.objects.filter(evento_id=evento_id).delete()
+            estatisticaEvento.objects.bulk_create([
+                estatisticaEvento(evento_id=evento_id, dimensao=dimensao, chave=chave, total=quantidade)
+                for dimensao, chave, quantidade in linhas
+            ])
+        PainelOrganizador.invalidar_evento(evento_id)
+        return len(linhas)
@@ -0,0 +1,127 @@
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from .models import chaveIdempotencia
+
+CABECALHO = 'HTTP_IDEMPOTENCY_KEY'
+
+
+def _escopo(request):
+    user = getattr(request, 'user', None)
+    usuario = user.pk if user is not None and user.is_authenticated else '-'
+    return f'{request.method} {request.path} {usuario}'[:200]
+
+
+def _hash_corpo(request):
+    # Lê o corpo pelo HttpRequest: o DRF reaproveita o corpo já lido ao fazer o parse
+    http_request = getattr(request, '_request', request)
+    return hashlib.sha256(http_request.body).hexdigest()
+
+
+class IdempotenciaService:
+    """Registro e reprodução de respostas de requisições com Idempotency-Key"""
+
+    @staticmethod
+    def reservar(escopo, chave, hash_corpo):
+        """
+        Cria o registro da chave (em processamento). Retorna (registro, criado);
+        o registro é None se outra requisição acabou de descartar a chave.
+        """
+        chaveIdempotencia.objects.filter(escopo=escopo, chave=chave, expiraEm__lte=timezone.now()).delete()
+        try:
+            with transaction.atomic():
+                registro = chaveIdempotencia.objects.create(
+                    escopo=escopo, chave=chave, hashCorpo=hash_corpo,
+                    expiraEm=timezone.now() + timedelta(hours=settings.IDEMPOTENCIA_TTL_HORAS)
+                )
+            return registro, True
+        except IntegrityError:
+            return chaveIdempotencia.objects.filter(escopo=escopo, chave=chave).first(), False
+
+    @staticmethod
+    def registrar(registro, response):
+        """Guarda a resposta final: dados do DRF (ainda não renderizados) ou o conteúdo bruto"""
+        if isinstance(response, Response):
+            registro.dadosDrf = True
+            registro.corpo = json.dumps(response.data, cls=JSONEncoder).encode()
+        else:
+            registro.corpo = response.content
+            registro.contentType = response.get('Content-Type', '')
+        registro.statusCode = response.status_code
+        registro.save(update_fields=['dadosDrf', 'corpo', 'contentType', 'statusCode'])
+
+    @staticmethod
+    def reproduzir(registro):
+        if registro.dadosDrf:
+            response = Response(json.loads(bytes(registro.corpo)), status=registro.statusCode)
+        else:
+            response = HttpResponse(
+                bytes(registro.corpo), status=registro.statusCode, content_type=registro.contentType or None
+            )
+        response['Idempotent-Replayed'] = 'true'
+        return response
+
+    @staticmethod
+    def expirar(lote=1000):
+        """Remove as chaves vencidas em lotes. Retorna a quantidade removida."""
+        removidas = 0
+        while True:
+            ids = list(
+                chaveIdempotencia.objects.filter(expiraEm__lte=timezone.now()).values_list('id', flat=True)[:lote]
+            )
+            if not ids:
+                return removidas
+            removidas += chaveIdempotencia.objects.filter(pk__in=ids).delete()[0]
+
+
+def idempotente(view_func):
+    """
+    Torna uma view de POST idempotente pelo cabeçalho Idempotency-Key.
+
+    A primeira requisição executa a view e registra a resposta; repetições
+    com a mesma chave (mesma rota e usuário) recebem a resposta registrada
+    sem executar a view. Respostas 5xx e exceções descartam a chave para
+    permitir nova tentativa. Em views de classe, use method_decorator.
+    """
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        chave = request.META.get(CABECALHO)
+        if not chave:
+            return view_func(request, *args, **kwargs)
+        if len(chave) > 255:
+            return JsonResponse({'error': 'Idempotency-Key deve ter no máximo 255 caracteres.'}, status=400)
+
+        hash_corpo = _hash_corpo(request)
+        registro, criado = IdempotenciaService.reservar(_escopo(request), chave, hash_corpo)
+
+        if not criado:
+            if registro is not None and registro.hashCorpo != hash_corpo:
+                return JsonResponse(
+                    {'error': 'Idempotency-Key já utilizada com outro corpo de requisição.'}, status=422
+                )
+            if registro is None or registro.statusCode is None:
+                return JsonResponse(
+                    {'error': 'Uma requisição com esta Idempotency-Key ainda está em processamento.'}, status=409
+                )
+            return IdempotenciaService.reproduzir(registro)
+
+        try:
+            response = view_func(request, *args, **kwargs)
+        except Exception:
+            registro.delete()
+            raise
+
+        if response.status_code >= 500 or getattr(response, 'streaming', False):
+            registro.delete()
+        else:
+            IdempotenciaService.registrar(registro, response)
+        return response
+
+    return _wrapped_view
@@ -0,0 +1,83 @@
+from django.db import IntegrityError, transaction
+from inscricoes.models import inscricao, listaEspera
+from .email_service import EmailService
+from .estatisticas import EstatisticasEvento
+from .models import evento
+from .reservas import ReservaService
+from .vagas import ControleVagas
+
+# Máximo de participantes promovidos por transação
+PROMOCAO_LOTE = 500
+
+# Releituras da fila quando uma promoção concorrente já converteu as mesmas entradas
+PROMOCAO_TENTATIVAS = 3
+
+
+class ListaEsperaService:
+    """Promoção em lote da lista de espera quando vagas são liberadas"""
+
+    @staticmethod
+    def posicao(entrada):
+        """Posição (1-based) na fila do evento, contada pelo índice (evento, id)"""
+        return listaEspera.objects.filter(evento_id=entrada.evento_id, id__lte=entrada.id).count()
+
+    @staticmethod
+    def promover(evento_id, limite=PROMOCAO_LOTE):
+        """
+        Converte os próximos da fila em inscrições pendentes (com reserva de
+        vaga) enquanto houver vagas, numa única transação, junto com as
+        notificações no outbox. Retorna as inscrições criadas.
+
+        Cancelamentos, o sweep de reservas, o aumento do limite e a entrada
+        na fila podem promover ao mesmo tempo: a linha do evento é travada
+        antes de ler a fila e, onde o banco não trava (SQLite), a restrição
+        inscricao_participante_uniq desfaz a promoção que chegou depois,
+        com a reserva de vagas junto; ela então relê a fila.
+        """
+        for tentativa in range(PROMOCAO_TENTATIVAS):
+            try:
+                return ListaEsperaService._promover(evento_id, limite)
+            except IntegrityError:
+                if tentativa == PROMOCAO_TENTATIVAS - 1:
+                    raise
+
+    @staticmethod
+    def _proximos(evento_id, quantidade):
+        """Início da fila (índice evento/id), nunca a fila inteira, sem quem já se inscreveu"""
+        return list(
+            listaEspera.objects.filter(evento_id=evento_id)
+            .exclude(participante__inscricoes__evento_id=evento_id)
+            .select_related('participante')
+            .order_by('id')[:quantidade]
+        )
+
+    @staticmethod
+    def _promover(evento_id, limite):
+        with transaction.atomic():
+            evento_obj = evento.objects.select_for_update().filter(pk=evento_id, status='ativo').first()
+            if evento_obj is None:
+                return []
+
+            livres = max(evento_obj.limiteQuantInsc - ControleVagas.ocupacao(evento_obj), 0)
+            proximos = ListaEsperaService._proximos(evento_id, min(livres, limite))
+            if not proximos:
+                return []
+
+            reservadas = ControleVagas.reservar_lote(evento_obj, len(proximos))
+            promovidos = proximos[:reservadas]
+            if not promovidos:
+                return []
+
+            expiracao = ReservaService.calcular_expiracao()
+            inscricoes = inscricao.objects.bulk_create([
+                inscricao(
+                    evento=evento_obj, participante=entrada.participante, kit_id=entrada.kit_id,
+                    categoria_id=entrada.categoria_id, status='pendente', expiraEm=expiracao
+                )
+                for entrada in promovidos
+            ])
+            EstatisticasEvento.inscricoes_criadas(inscricoes)
+            listaEspera.objects.filter(pk__in=[entrada.pk for entrada in promovidos]).delete()
+
+            EmailService.enviar_emails_vaga_liberada(evento_obj, inscricoes)
+            return inscricoes
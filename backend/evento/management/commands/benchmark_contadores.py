@@ -0,0 +1,77 @@
+import threading
+import time
+from datetime import date
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, transaction
+from evento.models import evento
+from evento.vagas import ControleVagas
+from localidades.models import localidade
+from usuarios.models import participante, organizador
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara a vazão de reservas do contador único (linha do evento) com o '
+        'contador distribuído, variando o número de escritores concorrentes. '
+        'Use com o banco de produção (Postgres); o SQLite serializa todas as escritas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escritores', default='1,2,4,8,16', help='Lista de concorrências a testar')
+        parser.add_argument('--reservas', type=int, default=2000, help='Reservas por rodada')
+        parser.add_argument('--slots', type=int, default=16, help='Slots do contador distribuído')
+
+    def handle(self, *args, **options):
+        escritores = [int(valor) for valor in options['escritores'].split(',')]
+        reservas = options['reservas']
+
+        localidade_obj = localidade.objects.create(cidade='Benchmark', uf='XX')
+        participante_obj = participante.objects.create(
+            nome='Benchmark', cpf='bench-cont', email='benchmark@bypodium.com',
+            data_nascimento=date(2000, 1, 1), telefone='0', localidade=localidade_obj
+        )
+        organizador_obj = organizador.objects.create(participante=participante_obj)
+        try:
+            self.stdout.write(f'{"escritores":>10} {"linha (res/s)":>15} {"slots (res/s)":>15}')
+            for quantidade in escritores:
+                linha = self._rodada(organizador_obj, localidade_obj, quantidade, reservas, slots=0)
+                distribuido = self._rodada(organizador_obj, localidade_obj, quantidade, reservas, slots=options['slots'])
+                self.stdout.write(f'{quantidade:>10} {linha:>15.0f} {distribuido:>15.0f}')
+        finally:
+            localidade_obj.delete()
+
+    def _rodada(self, organizador_obj, localidade_obj, escritores, reservas, slots):
+        hoje = date.today()
+        evento_obj = evento.objects.create(
+            nome='Benchmark', descricao='benchmark', dataIni=hoje, dataFim=hoje,
+            dataIniInsc=hoje, dataFimInsc=hoje, limiteQuantInsc=reservas * 2, valorInsc=0,
+            status='pendente', organizador=organizador_obj, localidade=localidade_obj
+        )
+        if slots:
+            ControleVagas.habilitar_contador_distribuido(evento_obj, slots)
+
+        por_escritor = reservas // escritores
+
+        def escritor():
+            try:
+                for _ in range(por_escritor):
+                    while True:
+                        try:
+                            with transaction.atomic():
+                                ControleVagas.reservar(evento_obj)
+                            break
+                        except OperationalError:
+                            continue
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=escritor) for _ in range(escritores)]
+        inicio = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duracao = time.perf_counter() - inicio
+
+        evento_obj.delete()
+        return por_escritor * escritores / duracao
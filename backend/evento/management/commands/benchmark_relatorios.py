@@ -0,0 +1,96 @@
+import time
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from evento.estatisticas import EstatisticasEvento
+from evento.models import categoria, evento, kit
+from evento.reports import EventReports
+from inscricoes.models import inscricao
+from localidades.models import localidade
+from usuarios.models import participante, organizador
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara o resumo do evento servido pelo rollup (estatisticaEvento) com o '
+        'calculado ao vivo sobre as inscrições. Os dados são criados numa transação '
+        'desfeita ao final.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--inscricoes', type=int, default=100000, help='Inscrições do evento de teste')
+        parser.add_argument('--kits', type=int, default=5, help='Kits (e categorias) do evento')
+        parser.add_argument('--dias', type=int, default=60, help='Dias pelos quais as inscrições se espalham')
+        parser.add_argument('--repeticoes', type=int, default=20, help='Execuções de cada variante')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            evento_obj = self._popular(options)
+            self.stdout.write(f'{"variante":>10} {"consultas":>10} {"média (ms)":>12} {"máx (ms)":>10}')
+            variantes = (
+                ('rollup', {}),
+                ('ao vivo', {'ao_vivo': True}),
+                ('por hora', {'granularidade': 'hora'}),
+            )
+            for variante, parametros in variantes:
+                consultas, tempos = self._medir(evento_obj.pk, parametros, options['repeticoes'])
+                self.stdout.write(
+                    f'{variante:>10} {consultas:>10} {sum(tempos) / len(tempos):>12.2f} {max(tempos):>10.2f}'
+                )
+            transaction.set_rollback(True)
+
+    def _popular(self, options):
+        hoje = date.today()
+        localidade_obj = localidade.objects.create(cidade='Benchmark', uf='XX')
+        participante_obj = participante.objects.create(
+            nome='Benchmark', cpf='bench-rel', email='benchmark@bypodium.com',
+            data_nascimento=date(2000, 1, 1), telefone='0', localidade=localidade_obj
+        )
+        evento_obj = evento.objects.create(
+            nome='Benchmark', descricao='benchmark', dataIni=hoje, dataFim=hoje,
+            dataIniInsc=hoje, dataFimInsc=hoje, limiteQuantInsc=options['inscricoes'], valorInsc=0,
+            status='pendente', organizador=organizador.objects.create(participante=participante_obj),
+            localidade=localidade_obj
+        )
+        kits = kit.objects.bulk_create([
+            kit(evento=evento_obj, nome=f'Kit {i}') for i in range(options['kits'])
+        ])
+        categorias = categoria.objects.bulk_create([
+            categoria(evento=evento_obj, nome=f'Categoria {i}', sexo='M', idadeMax=99) for i in range(options['kits'])
+        ])
+        status_opcoes = ('confirmada', 'pendente', 'cancelado')
+
+        # Inscrições sem participante: o relatório não depende dele
+        inscricao.objects.bulk_create((
+            inscricao(
+                evento=evento_obj, kit=kits[i % len(kits)], categoria=categorias[i % len(categorias)],
+                status=status_opcoes[i % len(status_opcoes)]
+            )
+            for i in range(options['inscricoes'])
+        ), batch_size=5000)
+
+        # bulk_create grava criadoEm = agora; espalha pelas horas dos dias anteriores
+        ids = list(inscricao.objects.filter(evento=evento_obj).order_by('id').values_list('id', flat=True))
+        agora = timezone.now()
+        horas = options['dias'] * 24
+        por_hora = -(-len(ids) // horas)
+        for hora in range(horas):
+            faixa = ids[hora * por_hora:(hora + 1) * por_hora]
+            if faixa:
+                inscricao.objects.filter(id__gte=faixa[0], id__lte=faixa[-1]).update(
+                    criadoEm=agora - timedelta(hours=hora)
+                )
+
+        EstatisticasEvento.reconstruir(evento_obj.pk)
+        return evento_obj
+
+    def _medir(self, evento_id, parametros, repeticoes):
+        tempos = []
+        with CaptureQueriesContext(connection) as consultas:
+            for _ in range(repeticoes):
+                inicio = time.perf_counter()
+                EventReports.get_event_summary(evento_id, **parametros)
+                tempos.append((time.perf_counter() - inicio) * 1000)
+        return len(consultas) // repeticoes, tempos
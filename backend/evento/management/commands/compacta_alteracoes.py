@@ -0,0 +1,21 @@
+import time
+from django.core.management.base import BaseCommand
+from evento.alteracoes import AlteracoesCatalogo
+
+
+class Command(BaseCommand):
+    help = 'Compacta o log de alterações do catálogo além de ALTERACOES_RETENCAO_DIAS'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help='Alterações removidas por DELETE')
+        parser.add_argument('--loop', action='store_true', help='Executa continuamente')
+        parser.add_argument('--intervalo', type=int, default=3600, help='Segundos entre execuções com --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            removidas = AlteracoesCatalogo.compactar(lote=options['lote'])
+            if removidas:
+                self.stdout.write(f'{removidas} alterações do catálogo compactadas.')
+            if not options['loop']:
+                break
+            time.sleep(options['intervalo'])
@@ -0,0 +1,44 @@
+import time
+from django.core.management.base import BaseCommand
+from evento.models import evento
+from evento.vagas import ControleVagas
+
+
+class Command(BaseCommand):
+    help = (
+        'Compacta os contadores distribuídos de inscrições em evento.quantInscAtual '
+        'e redistribui as cotas dos slots. Também habilita/desabilita o contador distribuído.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--evento', type=int, help='Processa apenas este evento')
+        parser.add_argument('--habilitar', type=int, metavar='SLOTS',
+                            help='Habilita o contador distribuído com N slots (requer --evento)')
+        parser.add_argument('--desabilitar', action='store_true',
+                            help='Volta ao contador único na linha do evento (requer --evento)')
+        parser.add_argument('--loop', action='store_true', help='Executa continuamente')
+        parser.add_argument('--intervalo', type=int, default=30, help='Segundos entre execuções com --loop')
+
+    def handle(self, *args, **options):
+        if options['habilitar'] or options['desabilitar']:
+            if not options['evento']:
+                self.stderr.write('Informe --evento.')
+                return
+            evento_obj = evento.objects.get(pk=options['evento'])
+            if options['habilitar']:
+                ControleVagas.habilitar_contador_distribuido(evento_obj, options['habilitar'])
+                self.stdout.write(f'Contador distribuído habilitado com {options["habilitar"]} slots.')
+            else:
+                ControleVagas.desabilitar_contador_distribuido(evento_obj)
+                self.stdout.write('Contador distribuído desabilitado.')
+            return
+
+        while True:
+            eventos = evento.objects.filter(slotsContador__gt=0)
+            if options['evento']:
+                eventos = eventos.filter(pk=options['evento'])
+            for evento_id in eventos.values_list('id', flat=True):
+                ControleVagas.compactar(evento_id)
+            if not options['loop']:
+                break
+            time.sleep(options['intervalo'])
@@ -0,0 +1,21 @@
+import time
+from django.core.management.base import BaseCommand
+from evento.estatisticas import CONSOLIDACAO_LOTE, EstatisticasEvento
+
+
+class Command(BaseCommand):
+    help = 'Soma os deltas pendentes (deltaEstatistica) no rollup de estatísticas dos relatórios'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=CONSOLIDACAO_LOTE, help='Deltas consolidados por transação')
+        parser.add_argument('--loop', action='store_true', help='Executa continuamente')
+        parser.add_argument('--intervalo', type=int, default=10, help='Segundos entre execuções com --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            consolidados = EstatisticasEvento.consolidar(lote=options['lote'])
+            if consolidados:
+                self.stdout.write(f'{consolidados} deltas de estatísticas consolidados.')
+            if not options['loop']:
+                break
+            time.sleep(options['intervalo'])
@@ -0,0 +1,25 @@
+import time
+from django.core.management.base import BaseCommand
+from evento.outbox import OutboxEmails
+
+
+class Command(BaseCommand):
+    help = 'Envia os emails do outbox em lotes, com uma conexão SMTP por lote'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=100, help='Emails enviados por conexão')
+        parser.add_argument('--loop', action='store_true', help='Executa continuamente')
+        parser.add_argument('--intervalo', type=int, default=10, help='Segundos entre execuções com --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            # Drena a fila enquanto houver lotes cheios
+            while True:
+                enviados, falhas = OutboxEmails.enviar_pendentes(lote=options['lote'])
+                if enviados or falhas:
+                    self.stdout.write(f'{enviados} emails enviados, {falhas} com falha.')
+                if enviados + falhas < options['lote']:
+                    break
+            if not options['loop']:
+                break
+            time.sleep(options['intervalo'])
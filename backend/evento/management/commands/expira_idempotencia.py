@@ -0,0 +1,21 @@
+import time
+from django.core.management.base import BaseCommand
+from evento.idempotencia import IdempotenciaService
+
+
+class Command(BaseCommand):
+    help = 'Remove as respostas registradas de Idempotency-Key que já expiraram'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help='Chaves removidas por DELETE')
+        parser.add_argument('--loop', action='store_true', help='Executa continuamente')
+        parser.add_argument('--intervalo', type=int, default=3600, help='Segundos entre execuções com --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            removidas = IdempotenciaService.expirar(lote=options['lote'])
+            if removidas:
+                self.stdout.write(f'{removidas} chaves de idempotência expiradas removidas.')
+            if not options['loop']:
+                break
+            time.sleep(options['intervalo'])
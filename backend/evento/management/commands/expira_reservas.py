@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand
+from evento.reservas import ReservaService
+
+
+class Command(BaseCommand):
+    help = 'Expira inscrições pendentes cuja reserva de vaga venceu e devolve as vagas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help='Inscrições processadas por transação')
+        parser.add_argument('--loop', action='store_true', help='Executa continuamente')
+        parser.add_argument('--intervalo', type=int, default=60, help='Segundos entre execuções com --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            liberadas = ReservaService.expirar_pendentes(lote=options['lote'])
+            if liberadas:
+                self.stdout.write(
+                    f'{sum(liberadas.values())} reservas expiradas em {len(liberadas)} eventos.'
+                )
+            if not options['loop']:
+                break
+            time.sleep(options['intervalo'])
@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand
+from evento.cancelamento import CancelamentoService
+
+
+class Command(BaseCommand):
+    help = 'Avisa os inscritos dos eventos cancelados, retomando avisos interrompidos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=500, help='Inscritos lidos e avisados por lote')
+        parser.add_argument('--loop', action='store_true', help='Executa continuamente')
+        parser.add_argument('--intervalo', type=int, default=30, help='Segundos entre execuções com --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            for notificacao in CancelamentoService.notificar_pendentes(lote=options['lote']):
+                self.stdout.write(
+                    f'Evento {notificacao.evento_id}: {notificacao.enviados} avisos enviados, '
+                    f'{notificacao.falhas} enviados ao outbox para nova tentativa.'
+                )
+            if not options['loop']:
+                break
+            time.sleep(options['intervalo'])
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from evento.estatisticas import EstatisticasEvento
+from evento.models import evento
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula o rollup de estatísticas (estatisticaEvento) a partir das inscrições, '
+        'corrigindo divergências da manutenção incremental.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--evento', type=int, help='Processa apenas este evento')
+
+    def handle(self, *args, **options):
+        eventos = evento.objects.order_by('id')
+        if options['evento']:
+            eventos = eventos.filter(pk=options['evento'])
+        quantidade = 0
+        for evento_id in eventos.values_list('id', flat=True).iterator():
+            EstatisticasEvento.reconstruir(evento_id)
+            quantidade += 1
+        self.stdout.write(f'Estatísticas reconstruídas para {quantidade} evento(s).')
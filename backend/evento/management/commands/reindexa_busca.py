@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from evento.search import EventSearch
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o índice de busca textual dos eventos ativos'
+
+    def handle(self, *args, **kwargs):
+        with transaction.atomic():
+            EventSearch.reconstruir()
+        self.stdout.write(self.style.SUCCESS('Índice de busca reconstruído.'))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evento', '0010_remove_pagamento_inscricao_alter_evento_localidade_and_more'),
+        ('localidades', '0001_initial'),
+        ('usuarios', '0002_participante_user'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['status', 'dataIni', 'id'], name='evento_status_dataini_idx'),
+        ),
+    ]
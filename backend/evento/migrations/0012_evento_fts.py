@@ -0,0 +1,60 @@
+from django.db import migrations
+
+FTS_TABLE = 'evento_evento_fts'
+
+
+def criar_indice_busca(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            "nome, descricao, cidade, uf, tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f"""
+            INSERT INTO {FTS_TABLE} (rowid, nome, descricao, cidade, uf)
+            SELECT e.id, COALESCE(e.nome, ''), e.descricao, l.cidade, l.uf
+            FROM evento_evento e JOIN localidades_localidade l ON l.id = e.localidade_id
+            WHERE e.status = 'ativo'
+            """
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            f"""
+            CREATE TABLE {FTS_TABLE} (
+                evento_id bigint PRIMARY KEY REFERENCES evento_evento (id) ON DELETE CASCADE,
+                documento tsvector NOT NULL
+            )
+            """
+        )
+        schema_editor.execute(
+            f'CREATE INDEX {FTS_TABLE}_documento_idx ON {FTS_TABLE} USING GIN (documento)'
+        )
+        schema_editor.execute(
+            f"""
+            INSERT INTO {FTS_TABLE} (evento_id, documento)
+            SELECT e.id,
+                   setweight(to_tsvector('portuguese', COALESCE(e.nome, '')), 'A') ||
+                   setweight(to_tsvector('portuguese', l.cidade || ' ' || l.uf), 'B') ||
+                   setweight(to_tsvector('portuguese', e.descricao), 'C')
+            FROM evento_evento e JOIN localidades_localidade l ON l.id = e.localidade_id
+            WHERE e.status = 'ativo'
+            """
+        )
+
+
+def remover_indice_busca(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evento', '0011_evento_status_dataini_idx'),
+        ('localidades', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice_busca, remover_indice_busca),
+    ]
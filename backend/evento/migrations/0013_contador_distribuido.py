@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evento', '0012_evento_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evento',
+            name='slotsContador',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='slotVagas',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('indice', models.PositiveSmallIntegerField()),
+                ('vagas', models.PositiveIntegerField(default=0)),
+                ('usadas', models.PositiveIntegerField(default=0)),
+                ('evento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slotsVagas', to='evento.evento')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('evento', 'indice'), name='slotvagas_evento_indice_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evento', '0013_contador_distribuido'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='chaveIdempotencia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('escopo', models.CharField(max_length=200)),
+                ('chave', models.CharField(max_length=255)),
+                ('hashCorpo', models.CharField(max_length=64)),
+                ('statusCode', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('corpo', models.BinaryField(blank=True, null=True)),
+                ('contentType', models.CharField(blank=True, default='', max_length=100)),
+                ('dadosDrf', models.BooleanField(default=False)),
+                ('expiraEm', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('escopo', 'chave'), name='chaveidempotencia_escopo_chave_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:36
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evento', '0014_chaveidempotencia'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='emailPendente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('destinatario', models.EmailField(max_length=254)),
+                ('assunto', models.CharField(max_length=255)),
+                ('corpoTexto', models.TextField()),
+                ('corpoHtml', models.TextField(blank=True, default='')),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('enviado', 'Enviado'), ('falhou', 'Falhou')], default='pendente', max_length=10)),
+                ('tentativas', models.PositiveSmallIntegerField(default=0)),
+                ('proximaTentativa', models.DateTimeField(default=django.utils.timezone.now)),
+                ('ultimoErro', models.TextField(blank=True, default='')),
+                ('criadoEm', models.DateTimeField(auto_now_add=True)),
+                ('enviadoEm', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'proximaTentativa'], name='emailpendente_fila_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evento', '0015_emailpendente'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='notificacaoCancelamento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('concluida', 'Concluída')], default='pendente', max_length=10)),
+                ('ultimaInscricao', models.BigIntegerField(default=0)),
+                ('enviados', models.PositiveIntegerField(default=0)),
+                ('falhas', models.PositiveIntegerField(default=0)),
+                ('criadoEm', models.DateTimeField(auto_now_add=True)),
+                ('atualizadoEm', models.DateTimeField(auto_now=True)),
+                ('concluidoEm', models.DateTimeField(blank=True, null=True)),
+                ('evento', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='notificacaoCancelamento', to='evento.evento')),
+            ],
+        ),
+    ]
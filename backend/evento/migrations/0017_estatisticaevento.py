@@ -0,0 +1,47 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def popular_estatisticas(apps, schema_editor):
+    """Rollup inicial a partir das inscrições existentes"""
+    inscricao = apps.get_model('inscricoes', 'inscricao')
+    estatisticaEvento = apps.get_model('evento', 'estatisticaEvento')
+
+    linhas = [
+        estatisticaEvento(evento_id=evento_id, dimensao='total', chave='', total=quantidade)
+        for evento_id, quantidade in inscricao.objects.values_list('evento_id').annotate(quantidade=Count('id')).order_by()
+    ]
+    for dimensao, campo in (('status', 'status'), ('kit', 'kit_id'), ('categoria', 'categoria_id'), ('dia', 'dataInsc')):
+        agrupado = inscricao.objects.values_list('evento_id', campo).annotate(quantidade=Count('id')).order_by()
+        for evento_id, valor, quantidade in agrupado.iterator():
+            chave = valor.isoformat() if dimensao == 'dia' else str(valor or '')
+            linhas.append(estatisticaEvento(evento_id=evento_id, dimensao=dimensao, chave=chave, total=quantidade))
+    estatisticaEvento.objects.bulk_create(linhas, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evento', '0016_notificacaocancelamento'),
+        ('inscricoes', '0004_pagamento_processando'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='estatisticaEvento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimensao', models.CharField(choices=[('total', 'Total'), ('status', 'Status'), ('kit', 'Kit'), ('categoria', 'Categoria'), ('dia', 'Dia')], max_length=10)),
+                ('chave', models.CharField(blank=True, default='', max_length=20)),
+                ('total', models.IntegerField(default=0)),
+                ('evento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='estatisticas', to='evento.evento')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('evento', 'dimensao', 'chave'), name='estatisticaevento_chave_uniq')],
+            },
+        ),
+        migrations.RunPython(popular_estatisticas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evento', '0017_estatisticaevento'),
+    ]
+
+    operations = [
+        # Eventos existentes ficam com a data da migração; na fila o desempate é pelo id
+        migrations.AddField(
+            model_name='evento',
+            name='criadoEm',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['status', 'criadoEm', 'id'], name='evento_status_criado_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-18 15:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evento', '0018_evento_criadoem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evento',
+            name='atualizadoEm',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['status', 'atualizadoEm'], name='evento_status_atualizado_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def popular_alteracoes(apps, schema_editor):
+    """Uma alteração por evento ativo: since=0 devolve o catálogo atual inteiro"""
+    evento = apps.get_model('evento', 'evento')
+    alteracaoEvento = apps.get_model('evento', 'alteracaoEvento')
+    ids = evento.objects.filter(status='ativo').order_by('id').values_list('id', flat=True)
+    alteracaoEvento.objects.bulk_create(
+        (alteracaoEvento(evento_id=evento_id) for evento_id in ids.iterator()), batch_size=1000
+    )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evento', '0019_evento_atualizadoem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='alteracaoEvento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('criadoEm', models.DateTimeField(auto_now_add=True)),
+                ('evento', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='alteracoes', to='evento.evento')),
+            ],
+        ),
+        migrations.RunPython(popular_alteracoes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evento', '0020_alteracaoevento'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificacaocancelamento',
+            name='reservadaAte',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evento', '0021_notificacaocancelamento_reservadaate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='compactacaoAlteracoes',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('corte', models.BigIntegerField(default=0)),
+                ('atualizadoEm', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evento', '0022_compactacaoalteracoes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='deltaEstatistica',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimensao', models.CharField(choices=[('total', 'Total'), ('status', 'Status'), ('kit', 'Kit'), ('categoria', 'Categoria'), ('dia', 'Dia')], max_length=10)),
+                ('chave', models.CharField(blank=True, default='', max_length=20)),
+                ('delta', models.IntegerField()),
+                ('evento', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='deltasEstatistica', to='evento.evento')),
+            ],
+        ),
+    ]
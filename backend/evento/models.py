@@ -1,6 +1,23 @@
 from django.db import models
+from django.utils import timezone
 
 class MC:
+    email_status = (
+        ('pendente', 'Pendente'),
+        ('enviado', 'Enviado'),
+        ('falhou', 'Falhou'),
+    )
+    notificacao_status = (
+        ('pendente', 'Pendente'),
+        ('concluida', 'Concluída'),
+    )
+    estatistica_dimensao = (
+        ('total', 'Total'),
+        ('status', 'Status'),
+        ('kit', 'Kit'),
+        ('categoria', 'Categoria'),
+        ('dia', 'Dia'),
+    )
     evento_status = (
         ('pendente', 'Pendente'),
         ('ativo', 'Ativo'),
@@ -34,6 +51,19 @@ class evento(models.Model):
     organizador = models.ForeignKey('usuarios.organizador', on_delete=models.CASCADE, related_name='eventos')
     localidade = models.ForeignKey('localidades.localidade', on_delete=models.CASCADE, related_name='eventos', default=1)
     imagem = models.ImageField(upload_to='', null=True, blank=True)
+    # Quantidade de slots do contador distribuído de inscrições (0 = contador único na linha do evento)
+    slotsContador = models.PositiveSmallIntegerField(default=0)
+    # Envio do evento para aprovação; ordena a fila de moderação
+    criadoEm = models.DateTimeField(auto_now_add=True)
+    # Última alteração do evento, kits ou categorias; base dos validadores HTTP (ETag/Last-Modified)
+    atualizadoEm = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'dataIni', 'id'], name='evento_status_dataini_idx'),
+            models.Index(fields=['status', 'criadoEm', 'id'], name='evento_status_criado_idx'),
+            models.Index(fields=['status', 'atualizadoEm'], name='evento_status_atualizado_idx'),
+        ]
 
 class categoria(models.Model):
     nome = models.CharField(max_length=20, null=False, blank=True)
@@ -51,3 +81,140 @@ class item(models.Model):
     nome = models.CharField(max_length=30, null=True, blank=True)
     tamanho = models.CharField(choices=MC().tamanhos, max_length=2, null=True, blank=True)
     kit = models.ManyToManyField(kit, related_name='itens')
+
+class slotVagas(models.Model):
+    """
+    Fatia do contador distribuído de inscrições de um evento.
+
+    Cada slot recebe uma cota (vagas) da capacidade restante do evento e
+    conta as inscrições feitas nela (usadas); a compactação devolve as
+    usadas para evento.quantInscAtual e redistribui as cotas.
+    """
+    evento = models.ForeignKey(evento, on_delete=models.CASCADE, related_name='slotsVagas')
+    indice = models.PositiveSmallIntegerField()
+    vagas = models.PositiveIntegerField(default=0)
+    usadas = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['evento', 'indice'], name='slotvagas_evento_indice_uniq'),
+        ]
+
+class chaveIdempotencia(models.Model):
+    """
+    Resposta registrada para um cabeçalho Idempotency-Key.
+
+    O escopo (método, rota e usuário) impede que a mesma chave seja
+    reaproveitada em outra rota ou por outro usuário.
+    """
+    escopo = models.CharField(max_length=200)
+    chave = models.CharField(max_length=255)
+    hashCorpo = models.CharField(max_length=64)
+    # Sem statusCode a requisição original ainda está em processamento
+    statusCode = models.PositiveSmallIntegerField(null=True, blank=True)
+    corpo = models.BinaryField(null=True, blank=True)
+    contentType = models.CharField(max_length=100, blank=True, default='')
+    dadosDrf = models.BooleanField(default=False)
+    expiraEm = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['escopo', 'chave'], name='chaveidempotencia_escopo_chave_uniq'),
+        ]
+
+class emailPendente(models.Model):
+    """
+    Outbox de emails: gravado na mesma transação da mudança que o originou
+    e enviado em segundo plano (comando envia_emails). Emails que esgotam
+    as tentativas ficam com status 'falhou' (dead-letter) para análise.
+    """
+    destinatario = models.EmailField()
+    assunto = models.CharField(max_length=255)
+    corpoTexto = models.TextField()
+    corpoHtml = models.TextField(blank=True, default='')
+    status = models.CharField(choices=MC().email_status, max_length=10, default='pendente')
+    tentativas = models.PositiveSmallIntegerField(default=0)
+    proximaTentativa = models.DateTimeField(default=timezone.now)
+    ultimoErro = models.TextField(blank=True, default='')
+    criadoEm = models.DateTimeField(auto_now_add=True)
+    enviadoEm = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'proximaTentativa'], name='emailpendente_fila_idx'),
+        ]
+
+class notificacaoCancelamento(models.Model):
+    """
+    Progresso do aviso de cancelamento aos inscritos de um evento.
+
+    Os inscritos são percorridos em ordem de id; ultimaInscricao guarda o
+    último id já processado, então uma execução interrompida continua de
+    onde parou (comando notifica_cancelamentos). reservadaAte marca a
+    execução em andamento, para que outra não envie os mesmos avisos.
+    """
+    evento = models.OneToOneField(evento, on_delete=models.CASCADE, related_name='notificacaoCancelamento')
+    status = models.CharField(choices=MC().notificacao_status, max_length=10, default='pendente')
+    ultimaInscricao = models.BigIntegerField(default=0)
+    enviados = models.PositiveIntegerField(default=0)
+    falhas = models.PositiveIntegerField(default=0)
+    reservadaAte = models.DateTimeField(null=True, blank=True)
+    criadoEm = models.DateTimeField(auto_now_add=True)
+    atualizadoEm = models.DateTimeField(auto_now=True)
+    concluidoEm = models.DateTimeField(null=True, blank=True)
+
+class estatisticaEvento(models.Model):
+    """
+    Rollup das inscrições de um evento: uma linha por (dimensão, chave),
+    ex.: ('status', 'confirmada'), ('kit', '<id>'), ('dia', '2025-01-31').
+    Mantido incrementalmente a partir de deltaEstatistica (comando
+    consolida_estatisticas) e reconstruído pelo comando reconstroi_estatisticas.
+    """
+    evento = models.ForeignKey(evento, on_delete=models.CASCADE, related_name='estatisticas')
+    dimensao = models.CharField(choices=MC().estatistica_dimensao, max_length=10)
+    chave = models.CharField(max_length=20, blank=True, default='')
+    total = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['evento', 'dimensao', 'chave'], name='estatisticaevento_chave_uniq'),
+        ]
+
+class deltaEstatistica(models.Model):
+    """
+    Variação pendente de uma linha do rollup, gravada pelos sinais de
+    inscrição só com INSERT: inscrições simultâneas no mesmo evento não
+    disputam o lock das linhas de estatisticaEvento. O comando
+    consolida_estatisticas soma os deltas no rollup e os apaga; a leitura
+    soma rollup + deltas pendentes. Sem restrição de FK: deltas das
+    inscrições apagadas junto com o evento são descartados na consolidação.
+    """
+    evento = models.ForeignKey(
+        evento, on_delete=models.DO_NOTHING, db_constraint=False, related_name='deltasEstatistica'
+    )
+    dimensao = models.CharField(choices=MC().estatistica_dimensao, max_length=10)
+    chave = models.CharField(max_length=20, blank=True, default='')
+    delta = models.IntegerField()
+
+class alteracaoEvento(models.Model):
+    """
+    Log de alterações do catálogo (eventos ativos): uma linha cada vez que um
+    evento entra, muda ou sai de 'ativo'. O id é o token do sync incremental
+    (/eventos/changes/?since=); o estado atual do evento é lido na consulta,
+    e eventos que saíram do catálogo ou foram removidos viram tombstones.
+    Sem restrição de FK: a linha sobrevive à remoção do evento.
+    """
+    evento = models.ForeignKey(
+        evento, on_delete=models.DO_NOTHING, db_constraint=False, related_name='alteracoes'
+    )
+    criadoEm = models.DateTimeField(auto_now_add=True)
+
+class compactacaoAlteracoes(models.Model):
+    """
+    Ponto até onde o log alteracaoEvento foi compactado (comando
+    compacta_alteracoes): abaixo de `corte` restam apenas a última alteração
+    de cada evento ativo, então tokens menores que ele perderam tombstones
+    e precisam refazer o sync. Uma única linha, atualizada a cada execução.
+    """
+    corte = models.BigIntegerField(default=0)
+    atualizadoEm = models.DateTimeField(auto_now=True)
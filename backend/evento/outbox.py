@@ -0,0 +1,105 @@
+import logging
+import smtplib
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+from .models import emailPendente
+
+logger = logging.getLogger(__name__)
+
+# Tempo (s) que um lote fica reservado para um remetente antes de voltar à fila
+RESERVA_LOTE_SEGUNDOS = 300
+
+
+class OutboxEmails:
+    """
+    Envio em segundo plano dos emails do outbox.
+
+    Cada lote é reservado numa transação curta (adiando proximaTentativa) e
+    enviado fora dela por uma única conexão SMTP. Falhas voltam à fila com
+    backoff exponencial; após OUTBOX_MAX_TENTATIVAS o email fica 'falhou'.
+    """
+
+    @staticmethod
+    def atraso(tentativas):
+        base = getattr(settings, 'OUTBOX_BACKOFF_SEGUNDOS', 30)
+        return timedelta(seconds=min(base * 2 ** (tentativas - 1), 6 * 60 * 60))
+
+    @staticmethod
+    def reservar_lote(lote):
+        agora = timezone.now()
+        with transaction.atomic():
+            ids = list(
+                emailPendente.objects.select_for_update(skip_locked=True)
+                .filter(status='pendente', proximaTentativa__lte=agora)
+                .order_by('proximaTentativa', 'id')
+                .values_list('id', flat=True)[:lote]
+            )
+            emailPendente.objects.filter(pk__in=ids).update(
+                proximaTentativa=agora + timedelta(seconds=RESERVA_LOTE_SEGUNDOS)
+            )
+        return list(emailPendente.objects.filter(pk__in=ids).order_by('id'))
+
+    @staticmethod
+    def enviar_pendentes(lote=100, connection=None):
+        """Envia um lote. Retorna (enviados, com falha)."""
+        emails = OutboxEmails.reservar_lote(lote)
+        if not emails:
+            return 0, 0
+
+        max_tentativas = getattr(settings, 'OUTBOX_MAX_TENTATIVAS', 5)
+        connection = connection or get_connection(fail_silently=False)
+        enviados, falhas = [], 0
+        try:
+            connection.open()
+        except Exception as e:
+            # Servidor indisponível: o lote inteiro volta à fila com backoff
+            for email in emails:
+                OutboxEmails._registrar_falha(email, e, max_tentativas)
+            return 0, len(emails)
+
+        try:
+            for email in emails:
+                mensagem = EmailMultiAlternatives(
+                    subject=email.assunto,
+                    body=email.corpoTexto,
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    to=[email.destinatario],
+                    connection=connection,
+                )
+                if email.corpoHtml:
+                    mensagem.attach_alternative(email.corpoHtml, 'text/html')
+                try:
+                    try:
+                        mensagem.send()
+                    except smtplib.SMTPServerDisconnected:
+                        # Conexão derrubada pelo servidor no meio do lote: reabre uma vez
+                        connection.close()
+                        connection.open()
+                        mensagem.send()
+                except Exception as e:
+                    falhas += 1
+                    OutboxEmails._registrar_falha(email, e, max_tentativas)
+                else:
+                    enviados.append(email.pk)
+        finally:
+            connection.close()
+
+        emailPendente.objects.filter(pk__in=enviados).update(
+            status='enviado', enviadoEm=timezone.now(), ultimoErro=''
+        )
+        return len(enviados), falhas
+
+    @staticmethod
+    def _registrar_falha(email, erro, max_tentativas):
+        email.tentativas += 1
+        email.ultimoErro = f'{type(erro).__name__}: {erro}'[:2000]
+        if email.tentativas >= max_tentativas:
+            email.status = 'falhou'
+            logger.error('Email %s para %s descartado após %s tentativas: %s',
+                         email.pk, email.destinatario, email.tentativas, email.ultimoErro)
+        else:
+            email.proximaTentativa = timezone.now() + OutboxEmails.atraso(email.tentativas)
+        email.save(update_fields=['tentativas', 'ultimoErro', 'status', 'proximaTentativa'])
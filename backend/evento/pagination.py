@@ -0,0 +1,25 @@
+from rest_framework.pagination import CursorPagination
+
+
+class EventoCursorPagination(CursorPagination):
+    """Paginação por cursor (keyset) dos eventos, ordenada por dataIni e id"""
+    ordering = ('dataIni', 'id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class InscricaoCursorPagination(CursorPagination):
+    """Paginação por cursor das inscrições de um relatório, na ordem de inscrição"""
+    ordering = 'id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class ModeracaoCursorPagination(CursorPagination):
+    """Paginação por cursor da fila de moderação, dos envios mais antigos aos mais novos"""
+    ordering = ('criadoEm', 'id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -0,0 +1,103 @@
+import uuid
+from decimal import Decimal
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from .models import evento
+
+
+def _chave_painel(organizador_id):
+    return f'painel:organizador:{organizador_id}'
+
+
+def _chave_versao(evento_id):
+    return f'painel:evento:{evento_id}'
+
+
+class PainelOrganizador:
+    """
+    Painel com os números de todos os eventos de um organizador.
+
+    Calculado com uma consulta agregada (mais a dos ids) e guardado em cache por
+    organizador, junto com a versão de cada evento. Mudanças nas inscrições
+    apagam a versão do evento (após o commit), sem consultar o banco para
+    descobrir o organizador; o painel com alguma versão divergente é
+    recalculado na leitura seguinte.
+
+    Painel e versões ficam no CACHES 'default', compartilhado pelos workers
+    (settings): a invalidação feita por um processo vale para todos.
+    """
+
+    @staticmethod
+    def obter(organizador_id):
+        painel = cache.get(_chave_painel(organizador_id))
+        if painel is not None:
+            versoes = cache.get_many([_chave_versao(evento_id) for evento_id in painel['versoes']])
+            if all(versoes.get(_chave_versao(evento_id)) == versao for evento_id, versao in painel['versoes'].items()):
+                return painel['dados']
+
+        # Versões lidas antes do cálculo: uma mudança durante o cálculo deixa o resultado já vencido
+        evento_ids = list(evento.objects.filter(organizador_id=organizador_id).values_list('id', flat=True))
+        versoes = PainelOrganizador._versoes(evento_ids)
+        dados = PainelOrganizador.calcular(organizador_id)
+        cache.set(
+            _chave_painel(organizador_id), {'dados': dados, 'versoes': versoes}, settings.PAINEL_CACHE_SEGUNDOS
+        )
+        return dados
+
+    @staticmethod
+    def calcular(organizador_id):
+        """Números de cada evento do organizador numa única consulta agregada"""
+        eventos = list(
+            evento.objects.filter(organizador_id=organizador_id)
+            .annotate(
+                inscricoes_total=Count('inscricoes', filter=~Q(inscricoes__status='cancelado')),
+                confirmadas=Count('inscricoes', filter=Q(inscricoes__status='confirmada')),
+                receita=Sum('inscricoes__pagamentos__valor', filter=Q(inscricoes__pagamentos__status='pago')),
+            )
+            .order_by('-dataIni', '-id')
+            .values(
+                'id', 'nome', 'status', 'dataIni', 'limiteQuantInsc',
+                'inscricoes_total', 'confirmadas', 'receita',
+            )
+        )
+
+        totais = {'eventos': len(eventos), 'inscricoes': 0, 'confirmadas': 0, 'receita': Decimal('0')}
+        for item in eventos:
+            item['receita'] = item['receita'] or Decimal('0')
+            limite = item['limiteQuantInsc']
+            item['vagas_disponiveis'] = max(limite - item['inscricoes_total'], 0)
+            item['taxa_ocupacao'] = round(item['inscricoes_total'] / limite * 100, 1) if limite > 0 else 0
+            totais['inscricoes'] += item['inscricoes_total']
+            totais['confirmadas'] += item['confirmadas']
+            totais['receita'] += item['receita']
+
+        dados = {
+            'eventos': eventos,
+            'totais': totais,
+            'data_geracao': timezone.localtime().strftime("%d/%m/%Y %H:%M"),
+        }
+        return dados
+
+    @staticmethod
+    def _versoes(evento_ids):
+        """Versão atual de cada evento, criando as que não existem"""
+        chaves = {evento_id: _chave_versao(evento_id) for evento_id in evento_ids}
+        existentes = cache.get_many(chaves.values())
+        novas = {chave: uuid.uuid4().hex for chave in chaves.values() if chave not in existentes}
+        if novas:
+            cache.set_many(novas, None)
+            existentes.update(novas)
+        return {evento_id: existentes[chave] for evento_id, chave in chaves.items()}
+
+    @staticmethod
+    def invalidar_evento(evento_id):
+        """Inscrições ou pagamentos do evento mudaram"""
+        transaction.on_commit(lambda: cache.delete(_chave_versao(evento_id)), robust=True)
+
+    @staticmethod
+    def invalidar_organizador(organizador_id):
+        """Eventos criados, editados ou removidos"""
+        transaction.on_commit(lambda: cache.delete(_chave_painel(organizador_id)), robust=True)
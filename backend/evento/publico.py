@@ -0,0 +1,122 @@
+import uuid
+from datetime import date
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.http import Http404
+from django.utils import timezone
+from inscricoes.models import inscricao
+from .models import evento
+from .serializers import EventoPublicoSerializer, aplicar_plano
+
+
+def _chave_evento(evento_id):
+    return f'evento:publico:{evento_id}'
+
+
+def _chave_versao(evento_id):
+    return f'evento:publico:{evento_id}:versao'
+
+
+def situacao_inscricoes(data_ini, data_fim):
+    """(isInscricaoAberta, inscricaoEvento) para o dia de hoje"""
+    hoje = date.today()
+    if data_ini <= hoje <= data_fim:
+        return True, 'Inscrições Abertas'
+    if hoje > data_fim:
+        return False, 'Inscrições Encerradas'
+    return False, 'Inscrições Fechadas'
+
+
+class EventoPublico:
+    """
+    Detalhes públicos do evento (os mesmos para qualquer usuário), em cache
+    compartilhado por id e versão. Salvar ou remover o evento apaga a versão
+    após o commit; uma leitura com versão divergente recalcula o payload.
+    Os campos pessoais (isInscrito, isOrganizador) vêm de flags().
+
+    Depende do CACHES compartilhado entre os workers (settings): a versão
+    apagada por um processo precisa sumir para todos, e o ETag do detalhe
+    é gerado a partir dela.
+    """
+
+    @staticmethod
+    def obter(evento_id, request=None):
+        """
+        Payload público do evento; Http404 se não existir. Com cache válido, uma
+        leitura do cache (no DatabaseCache, uma consulta à tabela do cache) e
+        nenhuma consulta aos modelos
+        """
+        return EventoPublico.montar(EventoPublico.entrada(evento_id), request)
+
+    @staticmethod
+    def entrada(evento_id):
+        """Entrada do cache: {'versao', 'dados', 'atualizadoEm'}, recalculada se a versão mudou"""
+        chave, chave_versao = _chave_evento(evento_id), _chave_versao(evento_id)
+        valores = cache.get_many([chave, chave_versao])
+        entrada, versao = valores.get(chave), valores.get(chave_versao)
+        if entrada is None or versao is None or entrada['versao'] != versao:
+            if versao is None:
+                # add(): duas leituras simultâneas acabam com a mesma versão
+                cache.add(chave_versao, uuid.uuid4().hex, None)
+                versao = cache.get(chave_versao)
+            # Versão lida antes do cálculo: uma mudança durante o cálculo deixa o resultado já vencido
+            dados, atualizado_em = EventoPublico.calcular(evento_id)
+            entrada = {'versao': versao, 'dados': dados, 'atualizadoEm': atualizado_em}
+            cache.set(chave, entrada, settings.EVENTO_CACHE_SEGUNDOS)
+        return entrada
+
+    @staticmethod
+    def montar(entrada, request=None):
+        dados = dict(entrada['dados'])
+        # Abertura das inscrições muda com a data, não com o evento: calculada a cada leitura
+        dados['isInscricaoAberta'], dados['inscricaoEvento'] = situacao_inscricoes(
+            date.fromisoformat(dados['dataIniInsc']), date.fromisoformat(dados['dataFimInsc'])
+        )
+        # A imagem fica em cache com a URL relativa; o host vem da requisição
+        if request is not None and dados['imagem']:
+            dados['imagem'] = request.build_absolute_uri(dados['imagem'])
+        return dados
+
+    @staticmethod
+    def calcular(evento_id):
+        """(payload, atualizadoEm) do evento"""
+        try:
+            evento_obj = aplicar_plano(evento.objects.all(), EventoPublicoSerializer).get(pk=evento_id)
+        except evento.DoesNotExist:
+            raise Http404
+        return dict(EventoPublicoSerializer(evento_obj).data), evento_obj.atualizadoEm
+
+    @staticmethod
+    def flags(evento_ids, participante_id, organizador_id):
+        """
+        {evento_id: {'isInscrito', 'isOrganizador'}} numa única consulta.
+        Ids inexistentes ficam de fora.
+        """
+        eventos = evento.objects.filter(pk__in=evento_ids).annotate(
+            inscrito=Exists(inscricao.objects.filter(evento=OuterRef('pk'), participante_id=participante_id))
+        ).values_list('id', 'organizador_id', 'inscrito')
+        return {
+            evento_id: {
+                'isInscrito': inscrito,
+                'isOrganizador': organizador_id is not None and dono_id == organizador_id,
+            }
+            for evento_id, dono_id, inscrito in eventos
+        }
+
+    @staticmethod
+    def tocar(evento_ids):
+        """
+        Kits, categorias ou itens mudaram: avança o atualizadoEm dos eventos
+        (QuerySet.update, sem post_save) e invalida o cache de cada um
+        """
+        evento_ids = set(evento_ids)
+        evento.objects.filter(pk__in=evento_ids).update(atualizadoEm=timezone.now())
+        for evento_id in evento_ids:
+            EventoPublico.invalidar(evento_id)
+
+    @staticmethod
+    def invalidar(evento_id):
+        # robust: o commit já aconteceu; uma falha do cache é registrada no log em vez de virar erro 500
+        transaction.on_commit(lambda: cache.delete(_chave_versao(evento_id)), robust=True)
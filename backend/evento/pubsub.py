@@ -0,0 +1,81 @@
+import asyncio
+import queue
+import threading
+from collections import defaultdict
+
+
+class Assinatura:
+    """
+    Caixa de entrada de um assinante. Com um event loop, as mensagens são
+    entregues pelo loop (call_soon_threadsafe); sem loop, por uma fila de threads.
+    """
+
+    def __init__(self, topico, loop=None):
+        self.topico = topico
+        self._loop = loop
+        self._fila = asyncio.Queue() if loop is not None else queue.Queue()
+
+    def entregar(self, mensagem):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._fila.put_nowait, mensagem)
+        else:
+            self._fila.put_nowait(mensagem)
+
+    def aguardar(self, timeout):
+        """Próxima mensagem ou None se o tempo acabar (assinante síncrono)"""
+        try:
+            return self._fila.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    async def aguardar_async(self, timeout):
+        """Próxima mensagem ou None se o tempo acabar (assinante com event loop)"""
+        try:
+            return await asyncio.wait_for(self._fila.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class PubSub:
+    """
+    Publicação/assinatura em memória, por processo.
+
+    Serve para acordar conexões abertas neste processo; quem assina deve
+    ler o estado atual do banco ao conectar e relê-lo periodicamente, já
+    que mensagens publicadas em outros processos não chegam aqui.
+    """
+
+    _lock = threading.Lock()
+    _assinaturas = defaultdict(set)
+
+    @classmethod
+    def assinar(cls, topico, loop=None):
+        assinatura = Assinatura(topico, loop)
+        with cls._lock:
+            cls._assinaturas[topico].add(assinatura)
+        return assinatura
+
+    @classmethod
+    def cancelar(cls, assinatura):
+        with cls._lock:
+            assinaturas = cls._assinaturas.get(assinatura.topico)
+            if assinaturas is not None:
+                assinaturas.discard(assinatura)
+                if not assinaturas:
+                    del cls._assinaturas[assinatura.topico]
+
+    @classmethod
+    def tem_assinantes(cls, topico):
+        return topico in cls._assinaturas
+
+    @classmethod
+    def publicar(cls, topico, mensagem):
+        with cls._lock:
+            assinaturas = list(cls._assinaturas.get(topico, ()))
+        for assinatura in assinaturas:
+            assinatura.entregar(mensagem)
+        return len(assinaturas)
+
+
+def topico_inscricao(inscricao_id):
+    return f'inscricao:{inscricao_id}'
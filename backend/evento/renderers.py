@@ -0,0 +1,175 @@
+import csv
+import io
+import re
+import zipfile
+from xml.sax.saxutils import escape
+from rest_framework.renderers import BaseRenderer
+
+# Linhas acumuladas antes de cada envio ao cliente
+LINHAS_POR_PARTE = 500
+
+# Caracteres de controle que não podem aparecer em XML
+_CONTROLE_XML = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+# Início de célula que Excel/Sheets interpretam como fórmula (CSV injection)
+_INICIO_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _texto_seguro(valor):
+    """Texto vindo do usuário (nome, email...) com o apóstrofo que impede a leitura como fórmula"""
+    if isinstance(valor, str) and valor.startswith(_INICIO_FORMULA):
+        return "'" + valor
+    return valor
+
+
+def _tabela(data):
+    """(cabeçalho, linhas) a partir de um dict ou lista de dicts (ex.: respostas de erro)"""
+    if isinstance(data, dict):
+        data = [data]
+    if not data:
+        return [], []
+    cabecalho = list(data[0])
+    return cabecalho, ([item.get(coluna) for coluna in cabecalho] for item in data)
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    CSV (?format=csv). gerar() produz o arquivo em partes para
+    StreamingHttpResponse; render() atende respostas comuns da API.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return b''.join(self.gerar(*_tabela(data)))
+
+    def gerar(self, cabecalho, linhas):
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        # BOM: o Excel só reconhece UTF-8 (acentos) com ele
+        buffer.write('\ufeff')
+        escritor.writerow(cabecalho)
+        for indice, linha in enumerate(linhas, 1):
+            escritor.writerow(['' if valor is None else _texto_seguro(valor) for valor in linha])
+            if indice % LINHAS_POR_PARTE == 0:
+                yield buffer.getvalue().encode(self.charset)
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode(self.charset)
+
+
+class _SaidaZip:
+    """Destino sem seek para o ZipFile: os bytes escritos são retirados a cada parte"""
+
+    def __init__(self):
+        self._partes = []
+
+    def write(self, dados):
+        self._partes.append(bytes(dados))
+        return len(dados)
+
+    def flush(self):
+        pass
+
+    def retirar(self):
+        dados = b''.join(self._partes)
+        self._partes.clear()
+        return dados
+
+
+def _coluna(indice):
+    """0 -> A, 25 -> Z, 26 -> AA"""
+    letras = ''
+    indice += 1
+    while indice:
+        indice, resto = divmod(indice - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+class XLSXRenderer(BaseRenderer):
+    """
+    Planilha XLSX (?format=xlsx) gerada com zipfile, sem dependências. A
+    planilha é escrita em fluxo (strings inline, sem sharedStrings) e o ZIP
+    é enviado à medida que é comprimido, com memória constante.
+    """
+    media_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    format = 'xlsx'
+    charset = None
+    render_style = 'binary'
+
+    ARQUIVOS = {
+        '[Content_Types].xml': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/worksheets/sheet1.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            '</Types>'
+        ),
+        '_rels/.rels': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="xl/workbook.xml"/>'
+            '</Relationships>'
+        ),
+        'xl/workbook.xml': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            '<sheets><sheet name="Relatorio" sheetId="1" r:id="rId1"/></sheets>'
+            '</workbook>'
+        ),
+        'xl/_rels/workbook.xml.rels': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            'Target="worksheets/sheet1.xml"/>'
+            '</Relationships>'
+        ),
+    }
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return b''.join(self.gerar(*_tabela(data)))
+
+    def gerar(self, cabecalho, linhas):
+        saida = _SaidaZip()
+        with zipfile.ZipFile(saida, 'w', compression=zipfile.ZIP_DEFLATED) as arquivo:
+            for nome, conteudo in self.ARQUIVOS.items():
+                arquivo.writestr(nome, conteudo)
+            yield saida.retirar()
+
+            with arquivo.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as planilha:
+                planilha.write(
+                    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                    b'<sheetData>'
+                )
+                planilha.write(self._linha(1, cabecalho))
+                for numero, linha in enumerate(linhas, 2):
+                    planilha.write(self._linha(numero, linha))
+                    if numero % LINHAS_POR_PARTE == 0:
+                        yield saida.retirar()
+                planilha.write(b'</sheetData></worksheet>')
+        yield saida.retirar()
+
+    @staticmethod
+    def _linha(numero, valores):
+        celulas = []
+        for indice, valor in enumerate(valores):
+            referencia = f'{_coluna(indice)}{numero}'
+            if valor is None:
+                continue
+            if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+                celulas.append(f'<c r="{referencia}"><v>{valor}</v></c>')
+            else:
+                texto = escape(_CONTROLE_XML.sub('', _texto_seguro(str(valor))))
+                celulas.append(f'<c r="{referencia}" t="inlineStr"><is><t xml:space="preserve">{texto}</t></is></c>')
+        return f'<row r="{numero}">{"".join(celulas)}</row>'.encode('utf-8')
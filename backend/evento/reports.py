@@ -1,101 +1,228 @@
+from .estatisticas import EstatisticasEvento
 from .models import evento, categoria, kit
 from inscricoes.models import inscricao
-from django.db.models import Count, Sum, Avg
-from datetime import datetime, timedelta
-from collections import defaultdict
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Coalesce, TruncDate, TruncHour
+from django.utils import timezone
+from datetime import date, datetime, timedelta
+
+# Colunas do relatório de participantes (JSON e exportações)
+PARTICIPANTES_COLUNAS = (
+    'nome', 'email', 'kit', 'categoria', 'status', 'data_inscricao', 'pagamento', 'metodo_pagamento'
+)
+
 
 class EventReports:
     @staticmethod
-    def get_event_summary(event_id):
+    def get_event_summary(event_id, ao_vivo=False, granularidade='dia'):
+        """
+        Resumo do evento. Por padrão lido do rollup estatisticaEvento somado
+        aos deltas pendentes (4 consultas, independente do número de inscrições); com ao_vivo=True é
+        calculado a partir das inscrições (5 consultas, custo proporcional
+        ao volume). granularidade='hora' acrescenta a série por hora
+        (inscricoes_por_hora), agregada no banco pelo índice (evento, criadoEm).
+        """
         try:
-            event = evento.objects.get(id=event_id)
-            inscricoes = inscricao.objects.filter(evento=event)
-            
-            # Calcular inscrições por dia
-            inscricoes_por_dia = defaultdict(int)
-            
-            # Obter todas as inscrições com suas datas
-            from django.db.models import DateTimeField, DateField
-            from django.db.models.functions import Cast, TruncDate
-            
-            inscricoes_com_data = inscricoes.annotate(
-                data_inscricao_date=Cast('dataInsc', DateField())
-            ).values('data_inscricao_date').annotate(
-                count=Count('id')
-            ).order_by('data_inscricao_date')
-            
-            # Criar lista de datas desde a primeira inscrição até hoje
-            if inscricoes_com_data:
-                primeira_data = inscricoes_com_data[0]['data_inscricao_date']
-                ultima_data = datetime.now().date()
-                
-                # Inicializar todas as datas com 0
-                data_atual = primeira_data
-                while data_atual <= ultima_data:
-                    inscricoes_por_dia[data_atual.strftime('%Y-%m-%d')] = 0
-                    data_atual += timedelta(days=1)
-                
-                # Preencher com os dados reais
-                for item in inscricoes_com_data:
-                    if item['data_inscricao_date']:
-                        data_str = item['data_inscricao_date'].strftime('%Y-%m-%d')
-                        inscricoes_por_dia[data_str] = item['count']
-            
-            # Converter para listas ordenadas para o gráfico
-            datas_ordenadas = sorted(inscricoes_por_dia.keys())
-            inscricoes_ordenadas = [inscricoes_por_dia[data] for data in datas_ordenadas]
-            
-            return {
-                'evento': {
-                    'nome': event.nome,
-                    'data': event.dataIni,
-                    'local': f"{event.localidade.cidade}/{event.localidade.uf}",
-                    'capacidade': event.limiteQuantInsc,
-                },
-                'estatisticas': {
-                    'total_inscritos': inscricoes.count(),
-                    'vagas_disponiveis': event.limiteQuantInsc - inscricoes.count(),
-                    'taxa_ocupacao': (inscricoes.count() / event.limiteQuantInsc * 100) if event.limiteQuantInsc > 0 else 0,
-                },
-                'status_inscricoes': {
-                    'confirmadas': inscricoes.filter(status='confirmada').count(),
-                    'pendentes': inscricoes.filter(status='pendente').count(),
-                    'canceladas': inscricoes.filter(status='cancelado').count(),
-                },
-                'kits': {
-                    kit.nome: inscricoes.filter(kit=kit).count() 
-                    for kit in event.kits.all()
-                },
-                'categorias': {
-                    cat.nome: inscricoes.filter(categoria=cat).count()
-                    for cat in event.categorias.all()
-                },
-                'inscricoes_por_dia': {
-                    'datas': datas_ordenadas,
-                    'inscricoes_diarias': inscricoes_ordenadas
-                },
-                'data_geracao': datetime.now().strftime("%d/%m/%Y %H:%M")
-            }
+            event = evento.objects.select_related('localidade').get(id=event_id)
         except evento.DoesNotExist:
             return None
 
+        if ao_vivo:
+            contagens, kits, categorias, por_dia = EventReports._contagens_ao_vivo(event)
+        else:
+            contagens, kits, categorias, por_dia = EventReports._contagens_rollup(event)
+        resumo = EventReports._montar_resumo(event, contagens, kits, categorias, por_dia)
+        if granularidade == 'hora':
+            horas, quantidades = EventReports._preencher(
+                EventReports.registration_series(event.pk, 'hora'), timedelta(hours=1), '%Y-%m-%dT%H:00'
+            )
+            resumo['inscricoes_por_hora'] = {'horas': horas, 'inscricoes_horarias': quantidades}
+        return resumo
+
+    @staticmethod
+    def registration_series(event_id, granularidade='dia'):
+        """
+        {período: inscrições} agrupado no banco por TruncDate/TruncHour de
+        criadoEm (horário imutável da inscrição), no fuso atual.
+        """
+        truncar = TruncHour('criadoEm') if granularidade == 'hora' else TruncDate('criadoEm')
+        return dict(
+            inscricao.objects.filter(evento_id=event_id)
+            .annotate(periodo=truncar)
+            .values_list('periodo')
+            .annotate(quantidade=Count('id'))
+            .order_by('periodo')
+        )
+
+    @staticmethod
+    def _preencher(contagens, passo, formato, ate=None):
+        """Série contínua do primeiro período até o último (ou `ate`), com 0 nos períodos vazios"""
+        periodos, quantidades = [], []
+        if not contagens:
+            return periodos, quantidades
+        periodo = min(contagens)
+        ultimo = max(max(contagens), ate) if ate is not None else max(contagens)
+        while periodo <= ultimo:
+            periodos.append(periodo.strftime(formato))
+            quantidades.append(contagens.get(periodo, 0))
+            periodo += passo
+        return periodos, quantidades
+
+    @staticmethod
+    def _contagens_ao_vivo(event):
+        inscricoes = inscricao.objects.filter(evento=event)
+
+        # Total e status numa única passada
+        contagens = inscricoes.aggregate(
+            total=Count('id'),
+            confirmadas=Count('id', filter=Q(status='confirmada')),
+            pendentes=Count('id', filter=Q(status='pendente')),
+            canceladas=Count('id', filter=Q(status='cancelado')),
+        )
+
+        # Kits e categorias sem inscrições aparecem com 0
+        kits = kit.objects.filter(evento=event).annotate(total=Count('inscricoes')).order_by('id')
+        categorias = categoria.objects.filter(evento=event).annotate(total=Count('inscricoes')).order_by('id')
+
+        por_dia = EventReports.registration_series(event.pk, 'dia')
+        return (
+            contagens,
+            [(kit_obj.nome, kit_obj.total) for kit_obj in kits],
+            [(cat.nome, cat.total) for cat in categorias],
+            por_dia,
+        )
+
+    @staticmethod
+    def _contagens_rollup(event):
+        linhas = EstatisticasEvento.totais(event.pk)
+        contagens = {
+            'total': linhas.get(('total', ''), 0),
+            'confirmadas': linhas.get(('status', 'confirmada'), 0),
+            'pendentes': linhas.get(('status', 'pendente'), 0),
+            'canceladas': linhas.get(('status', 'cancelado'), 0),
+        }
+        kits = [
+            (nome, linhas.get(('kit', str(kit_id)), 0))
+            for kit_id, nome in kit.objects.filter(evento=event).order_by('id').values_list('id', 'nome')
+        ]
+        categorias = [
+            (nome, linhas.get(('categoria', str(categoria_id)), 0))
+            for categoria_id, nome in categoria.objects.filter(evento=event).order_by('id').values_list('id', 'nome')
+        ]
+        por_dia = {
+            date.fromisoformat(chave): total
+            for (dimensao, chave), total in linhas.items()
+            if dimensao == 'dia' and chave and total > 0
+        }
+        return contagens, kits, categorias, por_dia
+
+    @staticmethod
+    def _montar_resumo(event, contagens, kits, categorias, por_dia):
+        total = contagens['total']
+
+        # Preenche os dias sem inscrições, da primeira inscrição até hoje
+        datas_ordenadas, inscricoes_ordenadas = EventReports._preencher(
+            por_dia, timedelta(days=1), '%Y-%m-%d', ate=timezone.localdate()
+        )
+
+        return {
+            'evento': {
+                'nome': event.nome,
+                'data': event.dataIni,
+                'local': f"{event.localidade.cidade}/{event.localidade.uf}",
+                'capacidade': event.limiteQuantInsc,
+            },
+            'estatisticas': {
+                'total_inscritos': total,
+                'vagas_disponiveis': event.limiteQuantInsc - total,
+                'taxa_ocupacao': (total / event.limiteQuantInsc * 100) if event.limiteQuantInsc > 0 else 0,
+            },
+            'status_inscricoes': {
+                'confirmadas': contagens['confirmadas'],
+                'pendentes': contagens['pendentes'],
+                'canceladas': contagens['canceladas'],
+            },
+            'kits': dict(kits),
+            'categorias': dict(categorias),
+            'inscricoes_por_dia': {
+                'datas': datas_ordenadas,
+                'inscricoes_diarias': inscricoes_ordenadas
+            },
+            'data_geracao': datetime.now().strftime("%d/%m/%Y %H:%M")
+        }
+
     @staticmethod
     def get_participant_report(event_id):
         try:
             event = evento.objects.get(id=event_id)
-            inscricoes = inscricao.objects.filter(evento=event).select_related('participante')
-            
-            return {
-                'evento': event.nome,
-                'participantes': [{
-                    'nome': insc.participante.nome,
-                    'email': insc.participante.email,
-                    'kit': insc.kit.nome if insc.kit else 'Sem kit',
-                    'status': insc.status,
-                    'data_inscricao': insc.dataInsc.strftime("%d/%m/%Y")
-                } for insc in inscricoes],
-                'total_participantes': inscricoes.count(),
-                'data_geracao': datetime.now().strftime("%d/%m/%Y %H:%M")
-            }
         except evento.DoesNotExist:
-            return None
\ No newline at end of file
+            return None
+
+        participantes = [
+            dict(zip(PARTICIPANTES_COLUNAS, linha)) for linha in EventReports.participant_rows(event.pk)
+        ]
+        return {
+            'evento': event.nome,
+            'participantes': participantes,
+            'total_participantes': len(participantes),
+            'data_geracao': datetime.now().strftime("%d/%m/%Y %H:%M")
+        }
+
+    @staticmethod
+    def participant_queryset(event_id):
+        """
+        Inscrições do evento com os dados de participante, kit, categoria e
+        pagamento anotados (uma consulta com joins, sem objetos relacionados).
+        """
+        return inscricao.objects.filter(evento_id=event_id).annotate(
+            nome=Coalesce(F('participante__nome'), Value('')),
+            email=Coalesce(F('participante__email'), Value('')),
+            kit_nome=F('kit__nome'),
+            categoria_nome=F('categoria__nome'),
+            pagamento_status=F('pagamentos__status'),
+            pagamento_metodo=F('pagamentos__metodoPagamento'),
+        )
+
+    @staticmethod
+    def participant_totals(event_id, status=None, kit_id=None, categoria_id=None):
+        """
+        Totais lidos do rollup estatisticaEvento com os deltas pendentes (uma
+        consulta, sem varrer as inscrições): o total do evento e o total do filtro quando ele se
+        resume a uma dimensão (None caso contrário).
+        """
+        filtros = [
+            (dimensao, str(valor))
+            for dimensao, valor in (('status', status), ('kit', kit_id), ('categoria', categoria_id))
+            if valor is not None
+        ]
+        chaves = [('total', '')] + filtros[:1]
+        linhas = EstatisticasEvento.totais(event_id, [dimensao for dimensao, _ in chaves])
+        total = linhas.get(('total', ''), 0)
+        if not filtros:
+            return total, total
+        if len(filtros) > 1:
+            return total, None
+        return total, linhas.get(filtros[0], 0)
+
+    @staticmethod
+    def participant_rows(event_id, chunk_size=2000):
+        """
+        Linhas do relatório de participantes (na ordem de PARTICIPANTES_COLUNAS)
+        lidas numa única consulta com os joins de participante, kit, categoria
+        e pagamento, em blocos (cursor do servidor no Postgres). Usado pelas
+        exportações CSV/XLSX sem carregar o evento inteiro em memória.
+        """
+        linhas = (
+            inscricao.objects.filter(evento_id=event_id)
+            .order_by('id')
+            .values_list(
+                'participante__nome', 'participante__email', 'kit__nome', 'categoria__nome',
+                'status', 'criadoEm', 'pagamentos__status', 'pagamentos__metodoPagamento'
+            )
+            .iterator(chunk_size=chunk_size)
+        )
+        for nome, email, kit_nome, categoria_nome, status, criado_em, pagamento_status, metodo in linhas:
+            yield (
+                nome or '', email or '', kit_nome or 'Sem kit', categoria_nome or '', status,
+                timezone.localtime(criado_em).strftime("%d/%m/%Y"), pagamento_status or '', metodo or '',
+            )
@@ -0,0 +1,64 @@
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from inscricoes.models import inscricao, pagamento
+from .estatisticas import EstatisticasEvento
+from .vagas import ControleVagas
+
+
+class ReservaService:
+    """Reservas temporárias de vaga para inscrições aguardando pagamento"""
+
+    @staticmethod
+    def calcular_expiracao():
+        return timezone.now() + timedelta(minutes=settings.INSCRICAO_RESERVA_MINUTOS)
+
+    @staticmethod
+    def expirar_pendentes(lote=1000):
+        """
+        Remove, em lotes, as inscrições pendentes com reserva vencida,
+        devolve as vagas com um UPDATE agrupado por lote e promove a lista
+        de espera dos eventos afetados.
+        Retorna {evento_id: vagas liberadas}.
+        """
+        # Import tardio: gateway.jobs não é dependência dos demais módulos de evento
+        from gateway.jobs import ProcessadorPagamentos
+        # Jobs perdidos (restart do worker) são concluídos antes: a reserva deles não fica presa
+        ProcessadorPagamentos.recuperar_parados()
+
+        agora = timezone.now()
+        limite_processando = agora - timedelta(seconds=settings.GATEWAY_JOB_TIMEOUT_SEGUNDOS)
+        liberadas = Counter()
+        while True:
+            with transaction.atomic():
+                # skip_locked permite vários varredores (e ignora pagamentos em andamento) no Postgres
+                vencidas = list(
+                    inscricao.objects.select_for_update(skip_locked=True)
+                    .filter(status='pendente', expiraEm__lte=agora)
+                    # Pagamentos em processamento seguram a reserva até a resposta do gateway,
+                    # mas só até o timeout do job: um job que não pôde ser recuperado não a prende para sempre
+                    .exclude(Exists(pagamento.objects.filter(
+                        inscricao=OuterRef('pk'), status='processando', processandoDesde__gt=limite_processando
+                    )))
+                    .values_list('id', 'evento_id')[:lote]
+                )
+                if not vencidas:
+                    break
+
+                with EstatisticasEvento.em_lote():
+                    inscricao.objects.filter(pk__in=[inscricao_id for inscricao_id, _ in vencidas]).delete()
+                contagens = Counter(evento_id for _, evento_id in vencidas)
+                ControleVagas.liberar_em_lote(contagens)
+                liberadas.update(contagens)
+
+            if len(vencidas) < lote:
+                break
+
+        # Import tardio: lista_espera depende deste módulo
+        from .lista_espera import ListaEsperaService
+        for evento_id in liberadas:
+            ListaEsperaService.promover(evento_id)
+        return dict(liberadas)
@@ -0,0 +1,219 @@
+import re
+from django.db import connection
+from django.utils.html import escape
+
+FTS_TABLE = 'evento_evento_fts'
+
+# Marcadores temporários de destaque: o texto é escapado antes de virarem <mark>
+_INICIO_DESTAQUE = '\ue000'
+_FIM_DESTAQUE = '\ue001'
+
+
+def _termos(consulta):
+    """Quebra a consulta em termos alfanuméricos, descartando operadores"""
+    return re.findall(r'\w+', consulta or '')[:10]
+
+
+def _destacar(texto):
+    """Escapa o texto e converte os marcadores de destaque em <mark>"""
+    if not texto:
+        return ''
+    return escape(texto).replace(_INICIO_DESTAQUE, '<mark>').replace(_FIM_DESTAQUE, '</mark>')
+
+
+class _SQLiteBackend:
+    """Índice FTS5 (rowid = id do evento)"""
+
+    @staticmethod
+    def indexar(cursor, evento_obj):
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [evento_obj.pk])
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, nome, descricao, cidade, uf) VALUES (%s, %s, %s, %s, %s)',
+            [evento_obj.pk, evento_obj.nome or '', evento_obj.descricao,
+             evento_obj.localidade.cidade, evento_obj.localidade.uf]
+        )
+
+    @staticmethod
+    def remover(cursor, evento_id):
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [evento_id])
+
+    @staticmethod
+    def reconstruir(cursor):
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f"""
+            INSERT INTO {FTS_TABLE} (rowid, nome, descricao, cidade, uf)
+            SELECT e.id, COALESCE(e.nome, ''), e.descricao, l.cidade, l.uf
+            FROM evento_evento e JOIN localidades_localidade l ON l.id = e.localidade_id
+            WHERE e.status = 'ativo'
+            """
+        )
+
+    @staticmethod
+    def buscar(cursor, termos, limite, offset):
+        consulta = ' '.join(f'"{termo}"*' for termo in termos)
+        cursor.execute(
+            f"""
+            SELECT rowid,
+                   highlight({FTS_TABLE}, 0, %s, %s),
+                   snippet({FTS_TABLE}, 1, %s, %s, '…', 24),
+                   bm25({FTS_TABLE}, 10.0, 1.0, 4.0, 4.0) AS rank
+            FROM {FTS_TABLE}
+            WHERE {FTS_TABLE} MATCH %s
+            ORDER BY rank
+            LIMIT %s OFFSET %s
+            """,
+            [_INICIO_DESTAQUE, _FIM_DESTAQUE, _INICIO_DESTAQUE, _FIM_DESTAQUE, consulta, limite, offset]
+        )
+        # bm25 é negativo: quanto menor, mais relevante
+        return [(row[0], row[1], row[2], -row[3]) for row in cursor.fetchall()]
+
+
+class _PostgresBackend:
+    """Tabela auxiliar com tsvector ponderado e índice GIN"""
+
+    DOCUMENTO = """
+        setweight(to_tsvector('portuguese', COALESCE(%s::text, '')), 'A') ||
+        setweight(to_tsvector('portuguese', %s::text || ' ' || %s::text), 'B') ||
+        setweight(to_tsvector('portuguese', %s::text), 'C')
+    """
+
+    @classmethod
+    def indexar(cls, cursor, evento_obj):
+        cursor.execute(
+            f"""
+            INSERT INTO {FTS_TABLE} (evento_id, documento) VALUES (%s, {cls.DOCUMENTO})
+            ON CONFLICT (evento_id) DO UPDATE SET documento = EXCLUDED.documento
+            """,
+            [evento_obj.pk, evento_obj.nome, evento_obj.localidade.cidade,
+             evento_obj.localidade.uf, evento_obj.descricao]
+        )
+
+    @staticmethod
+    def remover(cursor, evento_id):
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE evento_id = %s', [evento_id])
+
+    @staticmethod
+    def reconstruir(cursor):
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f"""
+            INSERT INTO {FTS_TABLE} (evento_id, documento)
+            SELECT e.id,
+                   setweight(to_tsvector('portuguese', COALESCE(e.nome, '')), 'A') ||
+                   setweight(to_tsvector('portuguese', l.cidade || ' ' || l.uf), 'B') ||
+                   setweight(to_tsvector('portuguese', e.descricao), 'C')
+            FROM evento_evento e JOIN localidades_localidade l ON l.id = e.localidade_id
+            WHERE e.status = 'ativo'
+            """
+        )
+
+    @staticmethod
+    def buscar(cursor, termos, limite, offset):
+        consulta = ' & '.join(f'{termo}:*' for termo in termos)
+        opcoes = f'StartSel={_INICIO_DESTAQUE}, StopSel={_FIM_DESTAQUE}'
+        # ts_headline só é calculado para a página já ranqueada
+        cursor.execute(
+            f"""
+            SELECT r.evento_id,
+                   ts_headline('portuguese', COALESCE(e.nome, ''), r.query, %s),
+                   ts_headline('portuguese', e.descricao, r.query, %s),
+                   r.rank
+            FROM (
+                SELECT f.evento_id, q.query, ts_rank_cd(f.documento, q.query) AS rank
+                FROM {FTS_TABLE} f, to_tsquery('portuguese', %s) AS q(query)
+                WHERE f.documento @@ q.query
+                ORDER BY rank DESC
+                LIMIT %s OFFSET %s
+            ) r
+            JOIN evento_evento e ON e.id = r.evento_id
+            ORDER BY r.rank DESC
+            """,
+            [opcoes + ', HighlightAll=true', opcoes + ', MaxWords=30, MinWords=10, MaxFragments=2',
+             consulta, limite, offset]
+        )
+        return cursor.fetchall()
+
+
+_BACKENDS = {
+    'sqlite': _SQLiteBackend,
+    'postgresql': _PostgresBackend,
+}
+
+
+class EventSearch:
+    """Busca textual de eventos ativos (nome, descrição, cidade e UF)"""
+
+    @staticmethod
+    def disponivel():
+        return connection.vendor in _BACKENDS
+
+    @staticmethod
+    def indexar(evento_obj):
+        """Inclui/atualiza o evento no índice; eventos não ativos são removidos"""
+        if not EventSearch.disponivel():
+            return
+        if evento_obj.status != 'ativo':
+            EventSearch.remover(evento_obj.pk)
+            return
+        with connection.cursor() as cursor:
+            _BACKENDS[connection.vendor].indexar(cursor, evento_obj)
+
+    @staticmethod
+    def remover(evento_id):
+        if not EventSearch.disponivel():
+            return
+        with connection.cursor() as cursor:
+            _BACKENDS[connection.vendor].remover(cursor, evento_id)
+
+    @staticmethod
+    def reconstruir():
+        """Reconstrói o índice inteiro a partir dos eventos ativos"""
+        if not EventSearch.disponivel():
+            return
+        with connection.cursor() as cursor:
+            _BACKENDS[connection.vendor].reconstruir(cursor)
+
+    @staticmethod
+    def buscar(consulta, limite=20, offset=0):
+        """
+        Retorna uma lista de dicts ordenada por relevância com
+        id, relevancia, nome_destacado e trecho (HTML com <mark>).
+        """
+        termos = _termos(consulta)
+        if not termos:
+            return []
+
+        if EventSearch.disponivel():
+            with connection.cursor() as cursor:
+                linhas = _BACKENDS[connection.vendor].buscar(cursor, termos, limite, offset)
+        else:
+            linhas = EventSearch._buscar_sem_indice(termos, limite, offset)
+
+        return [
+            {
+                'id': evento_id,
+                'relevancia': float(rank),
+                'nome_destacado': _destacar(nome),
+                'trecho': _destacar(trecho),
+            }
+            for evento_id, nome, trecho, rank in linhas
+        ]
+
+    @staticmethod
+    def _buscar_sem_indice(termos, limite, offset):
+        """Fallback para bancos sem suporte: filtra apenas nome/cidade/UF"""
+        from django.db.models import Q
+        from .models import evento
+
+        filtro = Q()
+        for termo in termos:
+            filtro &= (
+                Q(nome__icontains=termo) | Q(localidade__cidade__icontains=termo) | Q(localidade__uf__iexact=termo)
+            )
+        eventos = (
+            evento.objects.filter(filtro, status='ativo')
+            .order_by('dataIni', 'id')
+            .values_list('id', 'nome')[offset:offset + limite]
+        )
+        return [(evento_id, nome, '', 0.0) for evento_id, nome in eventos]
@@ -3,18 +3,41 @@ from rest_framework import serializers
 from .models import evento, categoria, kit, item
 from localidades.models import localidade
 from usuarios.models import participante, organizador
-from inscricoes.models import inscricao
+from inscricoes.models import inscricao, listaEspera
+from .reservas import ReservaService
+from authentication.identity import (
+    get_current_participante, get_current_organizador,
+    get_current_participante_id, get_current_organizador_id
+)
+
+def aplicar_plano(queryset, serializer_class):
+    """
+    Carrega junto as relações que o serializer declara usar (atributos
+    select_related e prefetch_related), com custo fixo de consultas
+    independente da quantidade de objetos serializados.
+    """
+    return queryset.select_related(*getattr(serializer_class, 'select_related', ())).prefetch_related(
+        *getattr(serializer_class, 'prefetch_related', ())
+    )
+
 
 def get_current_participante_from_context(context):
-    """Obtém o participante atual do contexto ou fallback para pk=1"""
+    """Obtém o participante atual (memoizado na requisição) ou fallback para pk=1"""
+    request = context.get('request')
+    if request is not None:
+        return get_current_participante(request)
+    return participante.objects.get(pk=1)
+
+
+def get_current_organizador_from_context(context):
+    """Obtém o organizador atual do contexto ou None"""
     request = context.get('request')
-    if request and request.user.is_authenticated:
-        try:
-            return participante.objects.get(user=request.user)
-        except participante.DoesNotExist:
-            return participante.objects.get(pk=1)
-    else:
-        return participante.objects.get(pk=1)
+    if request is not None:
+        return get_current_organizador(request)
+    try:
+        return get_current_participante_from_context(context).organizadores
+    except organizador.DoesNotExist:
+        return None
 
 class SafeDateField(serializers.DateField):
     """Campo de data que converte datetime para date se necessário"""
@@ -56,6 +79,8 @@ class kitSerializer(serializers.ModelSerializer):
         fields = ('nome', 'precoExtra', 'itens')
 
 class eventoSerializer(serializers.ModelSerializer):
+    select_related = ('localidade', 'organizador__participante')
+
     localidade = localidadeSerializer(read_only=True)
     kits = kitSerializer(many=True, write_only=True, required=False)
     categorias = categoriaSerializer(many=True, write_only=True, required=False)
@@ -73,8 +98,12 @@ class eventoSerializer(serializers.ModelSerializer):
         return obj.organizador.participante.email
     
     def get_isInscrito(self, obj):
-        current_participante = get_current_participante_from_context(self.context)
-        return inscricao.objects.filter(evento=obj, participante=current_participante).exists()
+        request = self.context.get('request')
+        if request is not None:
+            participante_id = get_current_participante_id(request)
+        else:
+            participante_id = get_current_participante_from_context(self.context).pk
+        return inscricao.objects.filter(evento=obj, participante_id=participante_id).exists()
     
     def get_inscricaoEvento(self, obj):
         if obj.dataIniInsc <= date.today() <= obj.dataFimInsc:
@@ -87,8 +116,13 @@ class eventoSerializer(serializers.ModelSerializer):
         return obj.dataIniInsc <= date.today() <= obj.dataFimInsc
 
     def get_isOrganizador(self, obj):
-        current_participante = get_current_participante_from_context(self.context)
-        return obj.organizador.participante == current_participante
+        request = self.context.get('request')
+        if request is not None:
+            organizador_id = get_current_organizador_id(request)
+        else:
+            organizador_obj = get_current_organizador_from_context(self.context)
+            organizador_id = organizador_obj.pk if organizador_obj is not None else None
+        return organizador_id is not None and obj.organizador_id == organizador_id
     
     def create(self, validated_data):
         kits_data = validated_data.pop('kits', [])
@@ -108,7 +142,25 @@ class eventoSerializer(serializers.ModelSerializer):
         
         return evento_obj
 
+class EventoPublicoSerializer(eventoSerializer):
+    """
+    Parte do eventoSerializer igual para qualquer usuário (vai para o cache
+    compartilhado): sem os campos pessoais nem os que dependem da data de hoje
+    """
+    isInscrito = None
+    isOrganizador = None
+    isInscricaoAberta = None
+    inscricaoEvento = None
+
+    class Meta(eventoSerializer.Meta):
+        fields = tuple(
+            campo for campo in eventoSerializer.Meta.fields
+            if campo not in ('isInscrito', 'isOrganizador', 'isInscricaoAberta', 'inscricaoEvento')
+        )
+
 class eventoSerializerList(serializers.ModelSerializer):
+    select_related = ('localidade',)
+
     localidade = localidadeSerializer(read_only=True)
     photo_url = serializers.SerializerMethodField()
     imagem = serializers.ImageField(read_only=True)
@@ -134,6 +186,8 @@ class eventoSerializerList(serializers.ModelSerializer):
         return date.today() > obj.dataFim
     
 class inscricaoSerializer(serializers.ModelSerializer):
+    select_related = ('categoria', 'kit') + tuple(f'evento__{campo}' for campo in eventoSerializerList.select_related)
+
     evento = eventoSerializerList(read_only=True)
     categoria = serializers.SerializerMethodField()
     kit = serializers.SerializerMethodField()
@@ -169,18 +223,28 @@ class InscricaoCreateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         current_participante = get_current_participante_from_context(self.context)
         
-        inscricao_obj = inscricao.objects.create(
+        # A vaga já foi reservada atomicamente pela view (ControleVagas.reservar)
+        # e fica retida até o pagamento ou o fim da reserva
+        return inscricao.objects.create(
             participante=current_participante,
+            expiraEm=ReservaService.calcular_expiracao(),
             **validated_data
         )
 
-        evento_obj = validated_data['evento']
-        evento_obj.quantInscAtual += 1
-        evento_obj.save()
-        
-        return inscricao_obj
+class ListaEsperaCreateSerializer(serializers.ModelSerializer):
+    kit = serializers.PrimaryKeyRelatedField(queryset=kit.objects.all(), required=False, allow_null=True)
+
+    class Meta:
+        model = listaEspera
+        fields = ('categoria', 'kit')
+
+    def create(self, validated_data):
+        current_participante = get_current_participante_from_context(self.context)
+        return listaEspera.objects.create(participante=current_participante, **validated_data)
 
 class InscricaoResponseSerializer(serializers.ModelSerializer):
+    select_related = ('participante', 'evento', 'categoria', 'kit')
+
     participante_nome = serializers.CharField(source='participante.nome', read_only=True)
     evento_nome = serializers.CharField(source='evento.nome', read_only=True)
     categoria_nome = serializers.CharField(source='categoria.nome', read_only=True)
@@ -190,7 +254,26 @@ class InscricaoResponseSerializer(serializers.ModelSerializer):
         model = inscricao
         fields = ('id', 'dataInsc', 'status', 'participante_nome', 'evento_nome', 'categoria_nome', 'kit_nome')
 
+class ParticipanteRelatorioSerializer(serializers.ModelSerializer):
+    """Linha do relatório de participantes (campos anotados por EventReports.participant_queryset)"""
+    nome = serializers.CharField(read_only=True)
+    email = serializers.CharField(read_only=True)
+    kit_nome = serializers.CharField(read_only=True, allow_null=True)
+    categoria_nome = serializers.CharField(read_only=True, allow_null=True)
+    pagamento_status = serializers.CharField(read_only=True, allow_null=True)
+    pagamento_metodo = serializers.CharField(read_only=True, allow_null=True)
+    dataInsc = SafeDateField(read_only=True)
+
+    class Meta:
+        model = inscricao
+        fields = (
+            'id', 'nome', 'email', 'status', 'kit', 'kit_nome', 'categoria', 'categoria_nome',
+            'dataInsc', 'criadoEm', 'pagamento_status', 'pagamento_metodo'
+        )
+
 class DetalhesParticipanteSerializer(serializers.ModelSerializer):
+    select_related = ('localidade',)
+
     localidade = localidadeSerializer(read_only=True)
     eventos_organizados = serializers.SerializerMethodField()
     class Meta:
@@ -199,7 +282,9 @@ class DetalhesParticipanteSerializer(serializers.ModelSerializer):
 
     def get_eventos_organizados(self, obj):
         current_participante = get_current_participante_from_context(self.context)
-        eventos = evento.objects.filter(organizador__participante=current_participante)
+        eventos = aplicar_plano(
+            evento.objects.filter(organizador__participante=current_participante), eventoSerializerList
+        )
         return eventoSerializerList(eventos, many=True, context=self.context).data
 
 
@@ -215,6 +300,38 @@ class EventoPendenteSerializer(serializers.ModelSerializer):
         return super().to_representation(instance)
 
 
+class EventoModeracaoSerializer(serializers.ModelSerializer):
+    """Item da fila de moderação: sem a descrição, que pode ter até 50 mil caracteres"""
+    select_related = ('localidade', 'organizador__participante')
+    organizador_nome = serializers.CharField(source='organizador.participante.nome', read_only=True)
+    organizador_email = serializers.CharField(source='organizador.participante.email', read_only=True)
+    localidade_nome = serializers.CharField(source='localidade.cidade', read_only=True)
+    localidade_uf = serializers.CharField(source='localidade.uf', read_only=True)
+
+    class Meta:
+        model = evento
+        fields = (
+            'id', 'nome', 'status', 'dataIni', 'valorInsc', 'imagem', 'criadoEm',
+            'organizador_nome', 'organizador_email', 'localidade_nome', 'localidade_uf',
+        )
+
+
+class EventoModeracaoLoteSerializer(serializers.Serializer):
+    """Aprovação/negação em lote de eventos pendentes"""
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), min_length=1, max_length=500)
+    status = serializers.ChoiceField(choices=['ativo', 'negado'])
+    feedback_admin = serializers.CharField(required=False, allow_blank=True, default='')
+    confirmacao = serializers.BooleanField(required=False, default=False)
+
+    def validate(self, attrs):
+        attrs['feedback_admin'] = attrs['feedback_admin'].strip()
+        if attrs['status'] == 'negado' and not attrs['feedback_admin']:
+            raise serializers.ValidationError(
+                {'feedback_admin': 'Para negar eventos, é obrigatório fornecer um feedback explicando o motivo da negação.'}
+            )
+        return attrs
+
+
 class EventoStatusUpdateSerializer(serializers.ModelSerializer):
     
     class Meta:
@@ -0,0 +1,128 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save
+from django.dispatch import receiver
+from inscricoes.models import inscricao, pagamento
+from localidades.models import localidade
+from .alteracoes import AlteracoesCatalogo
+from .estatisticas import EstatisticasEvento
+from .models import evento, categoria, item, kit
+from .painel import PainelOrganizador
+from .publico import EventoPublico
+from .pubsub import PubSub, topico_inscricao
+from .search import EventSearch
+from .status_pagamento import StatusPagamento
+
+
+@receiver(post_init, sender=evento)
+def guardar_status_evento(sender, instance, **kwargs):
+    """Status carregado do banco, para saber se o save tira o evento do catálogo"""
+    instance._status_catalogo = instance.__dict__.get('status') if instance.pk else None
+
+
+@receiver(post_save, sender=evento)
+def atualizar_indice_busca(sender, instance, created, **kwargs):
+    """Mantém o índice de busca sincronizado com o evento salvo"""
+    EventSearch.indexar(instance)
+    PainelOrganizador.invalidar_organizador(instance.organizador_id)
+    EventoPublico.invalidar(instance.pk)
+
+    anterior = None if created else instance._status_catalogo
+    atual = instance.__dict__.get('status')
+    if AlteracoesCatalogo.afeta_catalogo(anterior, atual, created):
+        AlteracoesCatalogo.registrar([instance.pk])
+    instance._status_catalogo = atual
+
+
+@receiver(post_delete, sender=evento)
+def remover_indice_busca(sender, instance, **kwargs):
+    EventSearch.remover(instance.pk)
+    PainelOrganizador.invalidar_organizador(instance.organizador_id)
+    EventoPublico.invalidar(instance.pk)
+    if instance._status_catalogo in ('ativo', None):
+        AlteracoesCatalogo.registrar([instance.pk])
+
+
+@receiver(post_save, sender=localidade)
+def reindexar_eventos_localidade(sender, instance, created, **kwargs):
+    """Cidade e UF fazem parte do documento indexado e do payload dos eventos da localidade"""
+    if created:
+        return
+    eventos = list(evento.objects.filter(localidade=instance).select_related('localidade'))
+    ativos = [evento_obj for evento_obj in eventos if evento_obj.status == 'ativo']
+    # Eventos não ativos já estão fora do índice e do catálogo
+    for evento_obj in ativos:
+        EventSearch.indexar(evento_obj)
+    EventoPublico.tocar([evento_obj.pk for evento_obj in eventos])
+    AlteracoesCatalogo.registrar([evento_obj.pk for evento_obj in ativos])
+
+
+@receiver(post_save, sender=kit)
+@receiver(post_delete, sender=kit)
+@receiver(post_save, sender=categoria)
+@receiver(post_delete, sender=categoria)
+def atualizar_versao_evento(sender, instance, **kwargs):
+    """Kits e categorias fazem parte da versão do evento (atualizadoEm)"""
+    EventoPublico.tocar([instance.evento_id])
+
+
+@receiver(m2m_changed, sender=item.kit.through)
+def atualizar_versao_evento_itens(sender, instance, action, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if isinstance(instance, kit):
+        EventoPublico.tocar([instance.evento_id])
+    elif pk_set:
+        EventoPublico.tocar(kit.objects.filter(pk__in=pk_set).values_list('evento_id', flat=True))
+
+
+def _publicar_status_pagamento(inscricao_id):
+    """Após o commit, envia o status atual aos streams abertos da inscrição"""
+    topico = topico_inscricao(inscricao_id)
+    # Sem conexões abertas neste processo não há consulta nem publicação
+    if not PubSub.tem_assinantes(topico):
+        return
+
+    def publicar():
+        try:
+            payment_data = StatusPagamento.montar(StatusPagamento.carregar(inscricao_id))
+        except inscricao.DoesNotExist:
+            return
+        PubSub.publicar(topico, payment_data)
+
+    transaction.on_commit(publicar)
+
+
+@receiver(post_save, sender=inscricao)
+def publicar_status_inscricao(sender, instance, **kwargs):
+    _publicar_status_pagamento(instance.pk)
+
+
+@receiver(post_save, sender=pagamento)
+def publicar_status_pagamento(sender, instance, **kwargs):
+    _publicar_status_pagamento(instance.inscricao_id)
+
+
+@receiver(post_init, sender=inscricao)
+def guardar_estatisticas_inscricao(sender, instance, **kwargs):
+    """Guarda os valores carregados do banco para calcular o delta do rollup"""
+    instance._estatisticas = EstatisticasEvento.valores(instance) if instance.pk else None
+
+
+@receiver(post_save, sender=inscricao)
+def atualizar_estatisticas_inscricao(sender, instance, created, **kwargs):
+    anterior = None if created else instance._estatisticas
+    atual = EstatisticasEvento.valores(instance)
+    if atual is None or (anterior is None and not created):
+        # Instância com campos adiados: não há como calcular o delta
+        EstatisticasEvento.reconstruir(instance.evento_id)
+    else:
+        EstatisticasEvento.registrar(EstatisticasEvento.diferenca(anterior, atual))
+    instance._estatisticas = atual
+
+
+@receiver(post_delete, sender=inscricao)
+def remover_estatisticas_inscricao(sender, instance, **kwargs):
+    if instance._estatisticas is None:
+        EstatisticasEvento.reconstruir(instance.evento_id)
+    else:
+        EstatisticasEvento.registrar(EstatisticasEvento.diferenca(instance._estatisticas, None))
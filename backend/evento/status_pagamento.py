@@ -0,0 +1,56 @@
+from inscricoes.models import inscricao, pagamento
+
+
+class StatusPagamento:
+    """Monta o status de pagamento de uma inscrição (PaymentStatus e stream)"""
+
+    @staticmethod
+    def carregar(inscricao_id):
+        """Inscrição com o pagamento numa única consulta (DoesNotExist se não houver)"""
+        return inscricao.objects.select_related('pagamentos').get(id=inscricao_id)
+
+    @staticmethod
+    def atual(inscricao_id):
+        """Status lido agora do banco, ou None se a inscrição não existe mais"""
+        try:
+            return StatusPagamento.montar(StatusPagamento.carregar(inscricao_id))
+        except inscricao.DoesNotExist:
+            return None
+
+    @staticmethod
+    def montar(inscricao_obj):
+        try:
+            pagamento_obj = inscricao_obj.pagamentos
+        except pagamento.DoesNotExist:
+            pagamento_obj = None
+
+        if pagamento_obj is not None:
+            payment_date = pagamento_obj.dataPagamento
+            if hasattr(payment_date, 'date'):
+                payment_date = payment_date.date()
+
+            payment_data = {
+                'has_payment': True,
+                'payment_job_id': str(pagamento_obj.jobId),
+                'payment_status': pagamento_obj.status,
+                'payment_method': pagamento_obj.metodoPagamento,
+                'payment_amount': str(pagamento_obj.valor),
+                'payment_date': payment_date.strftime('%d/%m/%Y'),
+                'inscription_status': inscricao_obj.status,
+            }
+        else:
+            payment_data = {
+                'has_payment': False,
+                'payment_status': 'pendente',
+                'inscription_status': inscricao_obj.status,
+                'payment_url': f"/gateway/payment/{inscricao_obj.id}/",
+            }
+
+        # Identifica o estado para o long-poll e para descartar eventos repetidos
+        payment_data['estado'] = f"{payment_data['payment_status']}:{payment_data['inscription_status']}"
+        return payment_data
+
+    @staticmethod
+    def finalizado(payment_data):
+        """Pagamento aprovado: nenhuma mudança de status é esperada depois disso"""
+        return payment_data['payment_status'] == 'pago'
@@ -1,3 +1,1941 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import smtplib
+import threading
+import time
+import zipfile
+from xml.etree import ElementTree
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache, caches
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.mail.backends.locmem import EmailBackend as LocmemEmailBackend
+from django.db import OperationalError, connection, transaction
+from django.template import loader
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .alteracoes import AlteracoesCatalogo
+from .cancelamento import CancelamentoService
+from .email_service import EmailService
+from .email_templates import EmailTemplates
+from .estatisticas import EstatisticasEvento
+from .idempotencia import IdempotenciaService
+from .lista_espera import ListaEsperaService
+from .models import (
+    evento, categoria, kit, alteracaoEvento, chaveIdempotencia, deltaEstatistica, emailPendente,
+    estatisticaEvento, notificacaoCancelamento
+)
+from .outbox import OutboxEmails
+from .painel import PainelOrganizador
+from .pubsub import PubSub, topico_inscricao
+from .reports import EventReports
+from .reservas import ReservaService
+from .search import EventSearch
+from .status_pagamento import StatusPagamento
+from .vagas import CAS_TENTATIVAS, ControleVagas
+from localidades.models import localidade
+from usuarios.models import participante, organizador
+from inscricoes.models import inscricao, listaEspera, pagamento
+from gateway.jobs import ProcessadorPagamentos
+from authentication.backends import ClaimsJWTAuthentication, ClaimsUser
+from authentication.identity import (
+    get_current_organizador, get_current_organizador_id, get_current_participante, get_current_participante_id
+)
+from authentication.tokens import ParticipanteRefreshToken
+
+
+def criar_evento(organizador_obj, localidade_obj, **kwargs):
+    hoje = date.today()
+    dados = {
+        'nome': 'Corrida de Teste',
+        'descricao': 'Evento de teste',
+        'dataIni': hoje + timedelta(days=30),
+        'dataFim': hoje + timedelta(days=30),
+        'dataIniInsc': hoje - timedelta(days=1),
+        'dataFimInsc': hoje + timedelta(days=10),
+        'limiteQuantInsc': 100,
+        'valorInsc': 50,
+        'status': 'ativo',
+    }
+    dados.update(kwargs)
+    return evento.objects.create(organizador=organizador_obj, localidade=localidade_obj, **dados)
+
+
+def criar_participantes(localidade_obj, quantidade):
+    """Cria usuários e participantes em lote (sem hash de senha)"""
+    users = User.objects.bulk_create(
+        [User(username=f'user{i}@teste.com', email=f'user{i}@teste.com') for i in range(quantidade)]
+    )
+    participante.objects.bulk_create([
+        participante(
+            user=user, nome=f'Participante {i}', cpf=f'{i:011d}', email=user.email,
+            data_nascimento=date(1990, 1, 1), telefone='35999999999', localidade=localidade_obj
+        )
+        for i, user in enumerate(users)
+    ])
+    return list(User.objects.filter(pk__in=[user.pk for user in users]).order_by('pk'))
+
+
+def consultas_sem_cache(consultas):
+    """
+    SQL capturado, sem as idas à tabela do DatabaseCache nem os savepoints
+    das suas escritas (no Redis elas nem passam pelo banco)
+    """
+    tabela = f'"{settings.CACHES["default"]["LOCATION"]}"'
+    return [
+        consulta['sql'] for consulta in consultas.captured_queries
+        if tabela not in consulta['sql'] and not consulta['sql'].startswith(('SAVEPOINT', 'RELEASE SAVEPOINT'))
+    ]
+
+
+class CapacidadeConcorrenteTests(TransactionTestCase):
+    """Inscrições simultâneas não podem ultrapassar o limite nem perder contagens"""
+
+    INSCRICOES_SIMULTANEAS = 200
+    LIMITE = 50
+
+    SLOTS = 0
+
+    def setUp(self):
+        # A tabela do cache não é esvaziada pelo TransactionTestCase
+        cache.clear()
+        caches['local'].clear()
+        self.localidade = localidade.objects.create(cidade='Lavras', uf='MG')
+        self.users = criar_participantes(self.localidade, self.INSCRICOES_SIMULTANEAS + 1)
+        organizador_obj = organizador.objects.create(participante=self.users[-1].participante)
+        self.evento = criar_evento(organizador_obj, self.localidade, limiteQuantInsc=self.LIMITE)
+        if self.SLOTS:
+            ControleVagas.habilitar_contador_distribuido(self.evento, self.SLOTS)
+
+    def _disparar(self, user, resultados):
+        # Sem relançar a exceção: o client guarda exceções de requisições de qualquer thread
+        # (sinal got_request_exception) e acusaria nesta uma falha que foi de outra
+        client = APIClient(raise_request_exception=False)
+        client.force_authenticate(user)
+        try:
+            for _ in range(50):
+                response = client.post(f'/api/eventos/{self.evento.pk}/criar', {}, format='json')
+                if response.status_code == 500:
+                    # Timeout de lock do SQLite sob contenção (OperationalError); o Postgres enfileira
+                    time.sleep(0.01)
+                    continue
+                resultados.append(response.status_code)
+                return
+        finally:
+            connection.close()
+
+    def test_inscricoes_paralelas_respeitam_o_limite(self):
+        resultados = []
+        threads = [
+            threading.Thread(target=self._disparar, args=(user, resultados))
+            for user in self.users[:self.INSCRICOES_SIMULTANEAS]
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(resultados), self.INSCRICOES_SIMULTANEAS)
+        self.assertEqual(resultados.count(201), self.LIMITE)
+        self.assertEqual(resultados.count(400), self.INSCRICOES_SIMULTANEAS - self.LIMITE)
+        self.assertEqual(ControleVagas.ocupacao(self.evento), self.LIMITE)
+        self.assertEqual(inscricao.objects.filter(evento=self.evento).count(), self.LIMITE)
+        self.assertEqual(
+            EventReports.get_event_summary(self.evento.pk)['estatisticas']['total_inscritos'], self.LIMITE
+        )
+
+    def test_rollup_consolidado_durante_inscricoes_paralelas(self):
+        resultados = []
+        threads = [
+            threading.Thread(target=self._disparar, args=(user, resultados))
+            for user in self.users[:self.INSCRICOES_SIMULTANEAS]
+        ]
+        encerrar = threading.Event()
+
+        def consolidar():
+            try:
+                while not encerrar.is_set():
+                    try:
+                        EstatisticasEvento.consolidar(lote=10)
+                    except OperationalError:
+                        # Timeout de lock do SQLite sob contenção
+                        time.sleep(0.01)
+            finally:
+                connection.close()
+
+        consolidador = threading.Thread(target=consolidar)
+        consolidador.start()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        encerrar.set()
+        consolidador.join()
+
+        self.assertEqual(resultados.count(201), self.LIMITE)
+        self.assertEqual(EventReports.participant_totals(self.evento.pk, status='pendente'), (self.LIMITE, self.LIMITE))
+        EstatisticasEvento.consolidar()
+        self.assertFalse(deltaEstatistica.objects.exists())
+        self.assertEqual(
+            dict(estatisticaEvento.objects.filter(evento=self.evento, dimensao__in=['total', 'status'])
+                 .values_list('dimensao', 'total')),
+            {'total': self.LIMITE, 'status': self.LIMITE}
+        )
+
+
+class CapacidadeConcorrenteDistribuidaTests(CapacidadeConcorrenteTests):
+    """Mesmo cenário com o contador distribuído em slots"""
+
+    SLOTS = 8
+
+
+class ControleVagasTests(TestCase):
+
+    def setUp(self):
+        self.localidade = localidade.objects.create(cidade='Lavras', uf='MG')
+        user = criar_participantes(self.localidade, 1)[0]
+        organizador_obj = organizador.objects.create(participante=user.participante)
+        self.evento = criar_evento(organizador_obj, self.localidade, limiteQuantInsc=1)
+
+    def test_reserva_recusada_quando_lotado(self):
+        self.assertTrue(ControleVagas.reservar(self.evento))
+        self.assertFalse(ControleVagas.reservar(self.evento))
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.quantInscAtual, 1)
+
+    def test_liberar_nao_fica_negativo(self):
+        self.assertFalse(ControleVagas.liberar(self.evento))
+        self.assertTrue(ControleVagas.reservar(self.evento))
+        self.assertTrue(ControleVagas.liberar(self.evento))
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.quantInscAtual, 0)
+
+    def test_lote_sob_disputa_continua_reserva_vaga_a_vaga(self):
+        evento.objects.filter(pk=self.evento.pk).update(limiteQuantInsc=5, quantInscAtual=2)
+        # Leitura sempre vencida: todo compare-and-swap falha, como se outra escrita vencesse cada vez
+        with mock.patch.object(ControleVagas, '_ler_contador', return_value=(0, 5)) as leitura:
+            self.assertEqual(ControleVagas.reservar_lote(self.evento, 2), 2)
+            self.assertEqual(ControleVagas.reservar_lote(self.evento, 4), 1)
+        self.assertEqual(leitura.call_count, 2 * CAS_TENTATIVAS)
+        self.assertEqual(ControleVagas.ocupacao(self.evento), 5)
+
+
+class ContadorDistribuidoTests(TestCase):
+
+    def setUp(self):
+        caches['local'].clear()
+        self.localidade = localidade.objects.create(cidade='Lavras', uf='MG')
+        user = criar_participantes(self.localidade, 1)[0]
+        organizador_obj = organizador.objects.create(participante=user.participante)
+        self.evento = criar_evento(organizador_obj, self.localidade, limiteQuantInsc=10)
+        ControleVagas.habilitar_contador_distribuido(self.evento, 4)
+
+    def test_cotas_somam_a_capacidade(self):
+        self.assertEqual(sum(self.evento.slotsVagas.values_list('vagas', flat=True)), 10)
+        for _ in range(10):
+            self.assertTrue(ControleVagas.reservar(self.evento))
+        self.assertFalse(ControleVagas.reservar(self.evento))
+        self.assertEqual(ControleVagas.ocupacao(self.evento), 10)
+
+    def test_compactacao_leva_contagens_para_o_evento(self):
+        for _ in range(3):
+            ControleVagas.reservar(self.evento)
+        self.assertEqual(ControleVagas.compactar(self.evento.pk), 7)
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.quantInscAtual, 3)
+        self.assertFalse(self.evento.slotsVagas.filter(usadas__gt=0).exists())
+
+    def test_vaga_liberada_volta_a_ser_reservavel(self):
+        for _ in range(10):
+            ControleVagas.reservar(self.evento)
+        ControleVagas.compactar(self.evento.pk)
+        ControleVagas.liberar(self.evento)
+        self.assertTrue(ControleVagas.reservar(self.evento))
+        self.assertFalse(ControleVagas.reservar(self.evento))
+
+
+class ExpiracaoReservasTests(TestCase):
+
+    def setUp(self):
+        self.localidade = localidade.objects.create(cidade='Lavras', uf='MG')
+        self.users = criar_participantes(self.localidade, 4)
+        organizador_obj = organizador.objects.create(participante=self.users[-1].participante)
+        self.eventos = [criar_evento(organizador_obj, self.localidade, limiteQuantInsc=3) for _ in range(2)]
+
+    def _inscrever(self, evento_obj, user, expira_em, status='pendente'):
+        ControleVagas.reservar(evento_obj)
+        return inscricao.objects.create(
+            evento=evento_obj, participante=user.participante, status=status, expiraEm=expira_em
+        )
+
+    def test_expira_pendentes_vencidas_e_devolve_vagas(self):
+        passado = timezone.now() - timedelta(minutes=1)
+        futuro = timezone.now() + timedelta(hours=1)
+        for user in self.users[:3]:
+            self._inscrever(self.eventos[0], user, passado)
+        self._inscrever(self.eventos[1], self.users[0], passado)
+        self._inscrever(self.eventos[1], self.users[1], futuro)
+        self._inscrever(self.eventos[1], self.users[2], None, status='confirmada')
+
+        liberadas = ReservaService.expirar_pendentes(lote=2)
+
+        self.assertEqual(liberadas, {self.eventos[0].pk: 3, self.eventos[1].pk: 1})
+        self.assertEqual(ControleVagas.ocupacao(self.eventos[0]), 0)
+        self.assertEqual(ControleVagas.ocupacao(self.eventos[1]), 2)
+        self.assertEqual(inscricao.objects.count(), 2)
+
+
+class ListaEsperaTests(TestCase):
+
+    def setUp(self):
+        self.localidade = localidade.objects.create(cidade='Lavras', uf='MG')
+        self.users = criar_participantes(self.localidade, 5)
+        organizador_obj = organizador.objects.create(participante=self.users[-1].participante)
+        self.evento = criar_evento(organizador_obj, self.localidade, limiteQuantInsc=1)
+        self.client = APIClient()
+
+    def _entrar(self, user):
+        self.client.force_authenticate(user)
+        return self.client.post(f'/api/eventos/{self.evento.pk}/lista-espera/', {}, format='json')
+
+    def test_entrada_apenas_com_evento_lotado(self):
+        self.assertEqual(self._entrar(self.users[0]).status_code, 400)
+
+        self.client.post(f'/api/eventos/{self.evento.pk}/criar', {}, format='json')
+        response = self._entrar(self.users[1])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['posicao'], 1)
+        self.assertEqual(self._entrar(self.users[2]).data['posicao'], 2)
+
+    def test_inscricao_repetida_nao_consome_vaga(self):
+        evento.objects.filter(pk=self.evento.pk).update(limiteQuantInsc=2)
+        self.client.force_authenticate(self.users[0])
+        self.assertEqual(self.client.post(f'/api/eventos/{self.evento.pk}/criar', {}, format='json').status_code, 201)
+
+        response = self.client.post(f'/api/eventos/{self.evento.pk}/criar', {}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(inscricao.objects.filter(evento=self.evento).count(), 1)
+        self.assertEqual(ControleVagas.ocupacao(self.evento), 1)
+
+    def test_cancelamento_promove_o_primeiro_da_fila(self):
+        self.client.force_authenticate(self.users[0])
+        self.client.post(f'/api/eventos/{self.evento.pk}/criar', {}, format='json')
+        for user in self.users[1:4]:
+            self._entrar(user)
+
+        self.client.force_authenticate(self.users[0])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/eventos/{self.evento.pk}/criar')
+
+        promovida = inscricao.objects.get(evento=self.evento)
+        self.assertEqual(promovida.participante_id, self.users[1].participante.pk)
+        self.assertIsNotNone(promovida.expiraEm)
+        self.assertEqual(ControleVagas.ocupacao(self.evento), 1)
+        self.assertEqual(
+            list(listaEspera.objects.filter(evento=self.evento).order_by('id').values_list('participante_id', flat=True)),
+            [self.users[2].participante.pk, self.users[3].participante.pk]
+        )
+
+    def test_aumento_do_limite_promove_em_lote(self):
+        ControleVagas.reservar(self.evento)
+        listaEspera.objects.bulk_create([
+            listaEspera(evento=self.evento, participante=user.participante) for user in self.users[:4]
+        ])
+        evento.objects.filter(pk=self.evento.pk).update(limiteQuantInsc=3)
+
+        promovidas = ListaEsperaService.promover(self.evento.pk)
+
+        self.assertEqual(
+            [obj.participante_id for obj in promovidas],
+            [user.participante.pk for user in self.users[:2]]
+        )
+        self.assertEqual(ControleVagas.ocupacao(self.evento), 3)
+        self.assertEqual(listaEspera.objects.filter(evento=self.evento).count(), 2)
+
+    def test_promocoes_concorrentes_nao_duplicam_inscricoes(self):
+        ControleVagas.reservar(self.evento)
+        listaEspera.objects.bulk_create([
+            listaEspera(evento=self.evento, participante=user.participante) for user in self.users[:2]
+        ])
+        evento.objects.filter(pk=self.evento.pk).update(limiteQuantInsc=2)
+        # Início da fila lido por uma promoção antes de a outra confirmar
+        fila_vista = ListaEsperaService._proximos(self.evento.pk, 1)
+        ListaEsperaService.promover(self.evento.pk)
+        # Outra vaga liberada: a promoção atrasada tem vaga para reservar
+        evento.objects.filter(pk=self.evento.pk).update(limiteQuantInsc=3)
+
+        leituras = iter([fila_vista])
+        proximos = ListaEsperaService._proximos
+        with mock.patch.object(
+            ListaEsperaService, '_proximos',
+            side_effect=lambda evento_id, quantidade: next(leituras, None) or proximos(evento_id, quantidade)
+        ):
+            promovidas = ListaEsperaService.promover(self.evento.pk)
+
+        # A promoção atrasada esbarra na restrição, é desfeita (vaga inclusa) e relê a fila
+        self.assertEqual([obj.participante_id for obj in promovidas], [self.users[1].participante.pk])
+        self.assertEqual(
+            sorted(inscricao.objects.filter(evento=self.evento).values_list('participante_id', flat=True)),
+            [self.users[0].participante.pk, self.users[1].participante.pk]
+        )
+        self.assertEqual(ControleVagas.ocupacao(self.evento), 3)
+        self.assertFalse(listaEspera.objects.filter(evento=self.evento).exists())
+
+    def test_promocao_nao_para_quando_o_compare_and_swap_falha(self):
+        ControleVagas.reservar(self.evento)
+        listaEspera.objects.bulk_create([
+            listaEspera(evento=self.evento, participante=user.participante) for user in self.users[:4]
+        ])
+        evento.objects.filter(pk=self.evento.pk).update(limiteQuantInsc=3)
+
+        with mock.patch.object(ControleVagas, '_ler_contador', return_value=(0, 3)):
+            promovidas = ListaEsperaService.promover(self.evento.pk)
+
+        self.assertEqual(len(promovidas), 2)
+        self.assertEqual(ControleVagas.ocupacao(self.evento), 3)
+        self.assertEqual(listaEspera.objects.filter(evento=self.evento).count(), 2)
+
+
+class IdempotenciaTests(TestCase):
+
+    def setUp(self):
+        self.localidade = localidade.objects.create(cidade='Lavras', uf='MG')
+        self.user = criar_participantes(self.localidade, 1)[0]
+        organizador_obj = organizador.objects.create(participante=self.user.participante)
+        self.evento = criar_evento(organizador_obj, self.localidade, limiteQuantInsc=10)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/eventos/{self.evento.pk}/criar'
+
+    def test_repeticao_devolve_a_resposta_registrada(self):
+        primeira = self.client.post(self.url, {}, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        segunda = self.client.post(self.url, {}, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+
+        self.assertEqual(primeira.status_code, 201)
+        self.assertEqual(segunda.status_code, 201)
+        self.assertEqual(segunda.json()['id'], primeira.json()['id'])
+        self.assertEqual(segunda['Idempotent-Replayed'], 'true')
+        self.assertEqual(inscricao.objects.filter(evento=self.evento).count(), 1)
+        self.assertEqual(ControleVagas.ocupacao(self.evento), 1)
+
+    def test_chave_reutilizada_com_outro_corpo(self):
+        self.client.post(self.url, {}, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        response = self.client.post(self.url, {'kit': None}, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertEqual(response.status_code, 422)
+
+    def test_chaves_expiradas_sao_removidas(self):
+        self.client.post(self.url, {}, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        chaveIdempotencia.objects.update(expiraEm=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(IdempotenciaService.expirar(), 1)
+        self.assertFalse(chaveIdempotencia.objects.exists())
+
+
+class PagamentoAssincronoTests(TestCase):
+
+    def setUp(self):
+        self.localidade = localidade.objects.create(cidade='Lavras', uf='MG')
+        user = criar_participantes(self.localidade, 1)[0]
+        organizador_obj = organizador.objects.create(participante=user.participante)
+        evento_obj = criar_evento(organizador_obj, self.localidade)
+        self.inscricao = inscricao.objects.create(
+            evento=evento_obj, participante=user.participante, expiraEm=timezone.now() + timedelta(hours=1)
+        )
+
+    def _processar(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(
+                f'/gateway/process/{self.inscricao.pk}/', {'metodo_pagamento': 'pix'}, content_type='application/json'
+            )
+        self.assertEqual(len(callbacks), 1)
+        return response
+
+    def test_post_enfileira_e_responde_202(self):
+        response = self._processar()
+
+        self.assertEqual(response.status_code, 202)
+        pagamento_obj = pagamento.objects.get(jobId=response.json()['job_id'])
+        self.assertEqual(pagamento_obj.status, 'processando')
+        self.assertIsNotNone(pagamento_obj.processandoDesde)
+        self.assertIsNone(self.client.get(f'/gateway/status/{pagamento_obj.jobId}/').json()['success'])
+
+    def test_status_do_job_nao_aceita_id_sequencial(self):
+        self._processar()
+        pagamento_obj = pagamento.objects.get()
+
+        self.assertEqual(self.client.get(f'/gateway/status/{pagamento_obj.pk}/').status_code, 404)
+
+    def test_job_confirma_a_inscricao(self):
+        job_id = self._processar().json()['job_id']
+        pagamento_id = pagamento.objects.get(jobId=job_id).pk
+
+        with mock.patch('gateway.jobs.random.random', return_value=0):
+            self.assertEqual(ProcessadorPagamentos.processar(pagamento_id), 'pago')
+        # Um job repetido não reprocessa o pagamento
+        self.assertIsNone(ProcessadorPagamentos.processar(pagamento_id))
+
+        self.inscricao.refresh_from_db()
+        self.assertEqual(self.inscricao.status, 'confirmada')
+        self.assertIsNone(self.inscricao.expiraEm)
+        self.assertTrue(self.client.get(f'/gateway/status/{job_id}/').json()['success'])
+
+    def _job_perdido(self, **kwargs):
+        """Pagamento em 'processando' cujo job sumiu do heap (restart do worker)"""
+        self._processar()
+        pagamento.objects.update(processandoDesde=timezone.now() - timedelta(hours=1))
+        inscricao.objects.filter(pk=self.inscricao.pk).update(expiraEm=timezone.now() - timedelta(minutes=1), **kwargs)
+
+    def test_varredor_conclui_jobs_parados(self):
+        self._job_perdido()
+
+        with mock.patch('gateway.jobs.random.random', return_value=0):
+            ReservaService.expirar_pendentes()
+
+        self.assertEqual(pagamento.objects.get().status, 'pago')
+        self.inscricao.refresh_from_db()
+        self.assertEqual(self.inscricao.status, 'confirmada')
+
+    def test_job_parado_que_falha_nao_prende_a_vaga(self):
+        self._job_perdido()
+
+        with mock.patch('gateway.jobs.random.random', return_value=1):
+            ReservaService.expirar_pendentes()
+
+        self.assertFalse(inscricao.objects.filter(pk=self.inscricao.pk).exists())
+
+    def test_processando_recente_segura_a_reserva(self):
+        self._processar()
+        inscricao.objects.filter(pk=self.inscricao.pk).update(expiraEm=timezone.now() - timedelta(minutes=1))
+
+        self.assertEqual(ReservaService.expirar_pendentes(), {})
+        self.assertEqual(pagamento.objects.get().status, 'processando')
+
+
+class StatusPagamentoStreamTests(TestCase):
+
+    def setUp(self):
+        self.localidade = localidade.objects.create(cidade='Lavras', uf='MG')
+        user = criar_participantes(self.localidade, 1)[0]
+        organizador_obj = organizador.objects.create(participante=user.participante)
+        evento_obj = criar_evento(organizador_obj, self.localidade)
+        self.inscricao = inscricao.objects.create(evento=evento_obj, participante=user.participante)
+        token = ParticipanteRefreshToken.for_user(user).access_token
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+        self.url = f'/api/payment/status/{self.inscricao.pk}/stream/'
+
+    def test_long_poll_responde_quando_o_estado_mudou(self):
+        response = self.client.get(self.url, {'estado': 'pago:confirmada'}, **self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['estado'], 'pendente:pendente')
+
+    def test_long_poll_acorda_com_a_publicacao(self):
+        mensagem = {'payment_status': 'pago', 'inscription_status': 'confirmada', 'estado': 'pago:confirmada'}
+
+        def publicar():
+            while not PubSub.tem_assinantes(topico_inscricao(self.inscricao.pk)):
+                time.sleep(0.01)
+            PubSub.publicar(topico_inscricao(self.inscricao.pk), mensagem)
+
+        thread = threading.Thread(target=publicar)
+        thread.start()
+        inicio = time.monotonic()
+        response = self.client.get(self.url, {'estado': 'pendente:pendente'}, **self.auth)
+        thread.join()
+
+        self.assertLess(time.monotonic() - inicio, 5)
+        self.assertEqual(response.json()['estado'], 'pago:confirmada')
+        self.assertFalse(PubSub.tem_assinantes(topico_inscricao(self.inscricao.pk)))
+
+    def _pago_em_outro_processo(self):
+        """StatusPagamento.atual que antes aprova o pagamento sem publicar (como outro worker faria)"""
+        atual = StatusPagamento.atual
+
+        def aprovar_e_ler(inscricao_id):
+            if not pagamento.objects.filter(inscricao_id=inscricao_id).exists():
+                with mock.patch.object(PubSub, 'publicar'):
+                    pagamento.objects.create(inscricao_id=inscricao_id, status='pago', metodoPagamento='pix')
+                    inscricao.objects.filter(pk=inscricao_id).update(status='confirmada')
+            return atual(inscricao_id)
+        return mock.patch.object(StatusPagamento, 'atual', side_effect=aprovar_e_ler)
+
+    @mock.patch('evento.views.STREAM_KEEPALIVE', 0.05)
+    def test_long_poll_rele_o_banco_sem_publicacao(self):
+        with self._pago_em_outro_processo():
+            inicio = time.monotonic()
+            response = self.client.get(self.url, {'estado': 'pendente:pendente'}, **self.auth)
+
+        self.assertLess(time.monotonic() - inicio, 5)
+        self.assertEqual(response.json()['estado'], 'pago:confirmada')
+
+    @mock.patch('evento.views.LONG_POLL_TIMEOUT', 0.2)
+    @mock.patch('evento.views.STREAM_KEEPALIVE', 0.05)
+    def test_long_poll_sem_mudanca_responde_o_estado_do_banco(self):
+        response = self.client.get(self.url, {'estado': 'pendente:pendente'}, **self.auth)
+        self.assertEqual(response.json()['estado'], 'pendente:pendente')
+
+    @mock.patch('evento.views.STREAM_KEEPALIVE', 0.05)
+    async def test_stream_rele_o_banco_a_cada_keep_alive(self):
+        with self._pago_em_outro_processo():
+            response = await self.async_client.get(self.url, headers={'Authorization': self.auth['HTTP_AUTHORIZATION']})
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            eventos = [parte async for parte in response.streaming_content]
+
+        dados = [json.loads(evento.split('data: ', 1)[1]) for evento in map(bytes.decode, eventos)]
+        self.assertEqual([item['estado'] for item in dados], ['pendente:pendente', 'pago:confirmada'])
+
+    def test_salvar_o_pagamento_publica_apos_o_commit(self):
+        assinatura = PubSub.assinar(topico_inscricao(self.inscricao.pk))
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                pagamento.objects.create(inscricao=self.inscricao, status='processando', metodoPagamento='pix')
+            self.assertEqual(assinatura.aguardar(1)['estado'], 'processando:pendente')
+        finally:
+            PubSub.cancelar(assinatura)
+
+    def test_exige_autenticacao(self):
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+
+class ClaimsIdentidadeTests(TestCase):
+    """Claims de identidade no JWT: conteúdo, renovação e autenticação sem consultas"""
+
+    def setUp(self):
+        self.localidade = localidade.objects.create(cidade='Lavras', uf='MG')
+        self.user, self.organizador_user = criar_participantes(self.localidade, 2)
+        self.organizador = organizador.objects.create(participante=self.organizador_user.participante)
+
+    def _refresh(self, refresh):
+        return self.client.post('/api/auth/token/refresh/', {'refresh': str(refresh)}, content_type='application/json')
+
+    def _autenticar(self, access, metodo='get'):
+        request = getattr(APIRequestFactory(), metodo)('/api/perfil/', HTTP_AUTHORIZATION=f'Bearer {access}')
+        return ClaimsJWTAuthentication().authenticate(request)
+
+    def test_claims_do_participante_e_do_organizador(self):
+        access = ParticipanteRefreshToken.for_user(self.user).access_token
+        self.assertEqual(
+            (access['participante_id'], access['organizador_id'], access['is_staff']),
+            (self.user.participante.pk, None, False)
+        )
+        access = ParticipanteRefreshToken.for_user(self.organizador_user).access_token
+        self.assertEqual(
+            (access['participante_id'], access['organizador_id']),
+            (self.organizador_user.participante.pk, self.organizador.pk)
+        )
+
+    def test_refresh_reemite_as_claims_atuais(self):
+        refresh = ParticipanteRefreshToken.for_user(self.user)
+        self.assertIsNone(refresh.access_token['organizador_id'])
+        novo_organizador = organizador.objects.create(participante=self.user.participante)
+
+        response = self._refresh(refresh)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(AccessToken(response.data['access'])['organizador_id'], novo_organizador.pk)
+        self.assertEqual(ParticipanteRefreshToken(response.data['refresh'])['organizador_id'], novo_organizador.pk)
+
+    def test_leitura_autenticada_sem_consultas(self):
+        access = ParticipanteRefreshToken.for_user(self.organizador_user).access_token
+
+        with self.assertNumQueries(0):
+            user, _ = self._autenticar(access)
+            self.assertEqual((user.participante_id, user.organizador_id), (
+                self.organizador_user.participante.pk, self.organizador.pk
+            ))
+        self.assertIsInstance(user, ClaimsUser)
+
+        with self.assertNumQueries(1):
+            user, _ = self._autenticar(access, 'post')
+        self.assertEqual(user.pk, self.organizador_user.pk)
+
+    def test_participante_consultado_uma_vez_por_requisicao(self):
+        http_request = APIRequestFactory().get('/api/perfil/')
+        http_request.user = self.organizador_user
+        request = Request(http_request)
+        request.user = self.organizador_user
+
+        with self.assertNumQueries(1):
+            participante_obj = get_current_participante(request)
+            # O organizador vem no mesmo select_related; o HttpRequest compartilha a memoização
+            self.assertEqual(get_current_organizador(request), self.organizador)
+            self.assertIs(get_current_participante(http_request), participante_obj)
+            self.assertEqual(get_current_participante_id(request), self.organizador_user.participante.pk)
+            self.assertEqual(get_current_organizador_id(request), self.organizador.pk)
+
+        # Outra requisição consulta de novo
+        outra = APIRequestFactory().get('/api/perfil/')
+        outra.user = self.organizador_user
+        with self.assertNumQueries(1):
+            get_current_participante(outra)
+
+    def test_claim_nula_de_organizador_dispensa_consulta(self):
+        request = APIRequestFactory().get('/api/eventos/')
+        request.user = ClaimsUser(ParticipanteRefreshToken.for_user(self.user).access_token)
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_current_organizador_id(request))
+
+    def test_primeiro_evento_reemite_os_tokens(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        hoje = date.today()
+        dados = {
+            'nome': 'Primeiro', 'descricao': 'Evento', 'valorInsc': 10, 'horarioIni': '08:00',
+            'dataIni': hoje + timedelta(days=30), 'dataFim': hoje + timedelta(days=30),
+            'dataIniInsc': hoje, 'dataFimInsc': hoje + timedelta(days=10), 'limiteQuantInsc': 10,
+        }
+
+        response = client.post('/api/eventos/criar/', dados, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        organizador_obj = organizador.objects.get(participante=self.user.participante)
+        self.assertEqual(AccessToken(response.data['tokens']['access'])['organizador_id'], organizador_obj.pk)
+        self.assertNotIn('tokens', client.post('/api/eventos/criar/', dados, format='json').data)
+
+    def test_refresh_recusa_usuario_inativo_ou_removido(self):
+        refresh = ParticipanteRefreshToken.for_user(self.user)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self._refresh(refresh).status_code, 401)
+
+        refresh = ParticipanteRefreshToken.for_user(self.organizador_user)
+        self.organizador_user.delete()
+        self.assertEqual(self._refresh(refresh).status_code, 401)
+
+    def test_rotas_de_staff_consultam_o_usuario(self):
+        admin = User.objects.create(username='admin', is_staff=True)
+        access = ParticipanteRefreshToken.for_user(admin).access_token
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {access}'}
+        self.assertEqual(self.client.get('/api/eventos/pendentes/fila/', **auth).status_code, 200)
+
+        User.objects.filter(pk=admin.pk).update(is_staff=False)
+        self.assertEqual(self.client.get('/api/eventos/pendentes/fila/', **auth).status_code, 403)
+        User.objects.filter(pk=admin.pk).update(is_active=False)
+        self.assertEqual(self.client.get('/api/eventos/pendentes/fila/', **auth).status_code, 401)
+
+
+class BackendSMTPIndisponivel(LocmemEmailBackend):
+    def send_messages(self, messages):
+        raise smtplib.SMTPException('Servidor indisponível')
+
+
+@override_settings(OUTBOX_MAX_TENTATIVAS=2)
+class OutboxEmailsTests(TestCase):
+
+    def setUp(self):
+        self.localidade = localidade.objects.create(cidade='Lavras', uf='MG')
+        self.user = criar_participantes(self.localidade, 1)[0]
+        organizador_obj = organizador.objects.create(participante=self.user.participante)
+        self.evento = criar_evento(organizador_obj, self.localidade, status='pendente')
+
+    def _aprovar(self):
+        admin = User.objects.create(username='admin', is_staff=True)
+        client = APIClient()
+        client.force_authenticate(admin)
+        return client.patch(
+            f'/api/eventos/pendentes/{self.evento.pk}/', {'status': 'ativo', 'confirmacao': True}, format='json'
+        )
+
+    def test_aprovacao_grava_no_outbox_sem_enviar(self):
+        response = self._aprovar()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+        email = emailPendente.objects.get()
+        self.assertEqual(email.destinatario, self.user.email)
+
+        self.assertEqual(OutboxEmails.enviar_pendentes(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].alternatives[0][1], 'text/html')
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'enviado')
+
+    def test_falhas_usam_backoff_e_dead_letter(self):
+        self._aprovar()
+
+        self.assertEqual(OutboxEmails.enviar_pendentes(connection=BackendSMTPIndisponivel()), (0, 1))
+        email = emailPendente.objects.get()
+        self.assertEqual((email.status, email.tentativas), ('pendente', 1))
+        self.assertGreater(email.proximaTentativa, timezone.now())
+        # Ainda no backoff: nada a enviar
+        self.assertEqual(OutboxEmails.enviar_pendentes(), (0, 0))
+
+        emailPendente.objects.update(proximaTentativa=timezone.now())
+        with self.assertLogs('evento.outbox', 'ERROR'):
+            OutboxEmails.enviar_pendentes(connection=BackendSMTPIndisponivel())
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.tentativas), ('falhou', 2))
+        self.assertIn('Servidor indisponível', email.ultimoErro)
+
+
+class ProcessoInterrompido(BaseException):
+    pass
+
+
+class FalhaNoTerceiroEnvio(LocmemEmailBackend):
+    """Simula queda do processo após dois envios"""
+    enviados = 0
+
+    def send_messages(self, messages):
+        if FalhaNoTerceiroEnvio.enviados == 2:
+            raise ProcessoInterrompido()
+        FalhaNoTerceiroEnvio.enviados += 1
+        return super().send_messages(messages)
+
+
+class NotificacaoCancelamentoTests(TestCase):
+
+    def setUp(self):
+        self.localidade = localidade.objects.create(cidade='Lavras', uf='MG')
+        self.users = criar_participantes(self.localidade, 6)
+        organizador_obj = organizador.objects.create(participante=self.users[-1].participante)
+        self.evento = criar_evento(organizador_obj, self.localidade, nome='Corrida <Noturna>')
+        inscricao.objects.bulk_create([
+            inscricao(evento=self.evento, participante=user.participante) for user in self.users[:5]
+        ])
+
+    def _cancelar(self):
+        client = APIClient()
+        client.force_authenticate(self.users[-1])
+        client.delete(f'/api/eventos/gerenciar/{self.evento.pk}/')
+        return notificacaoCancelamento.objects.get(evento=self.evento)
+
+    def test_avisa_todos_os_inscritos_em_lotes(self):
+        notificacao = self._cancelar()
+        self.assertEqual(len(mail.outbox), 0)
+
+        notificacao = CancelamentoService.notificar(notificacao.pk, lote=2)
+
+        self.assertEqual((notificacao.status, notificacao.enviados), ('concluida', 5))
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), sorted(u.email for u in self.users[:5]))
+        self.assertIn('Participante 0', mail.outbox[0].body)
+        self.assertIn('Corrida &lt;Noturna&gt;', mail.outbox[0].alternatives[0][0])
+
+    def test_retoma_de_onde_parou(self):
+        notificacao = self._cancelar()
+        FalhaNoTerceiroEnvio.enviados = 0
+
+        with self.assertRaises(ProcessoInterrompido):
+            CancelamentoService.notificar(notificacao.pk, lote=2, connection=FalhaNoTerceiroEnvio())
+        notificacao.refresh_from_db()
+        self.assertEqual((notificacao.status, notificacao.enviados), ('pendente', 2))
+
+        mail.outbox = []
+        CancelamentoService.notificar_pendentes(lote=2)
+        notificacao.refresh_from_db()
+        self.assertEqual((notificacao.status, notificacao.enviados), ('concluida', 5))
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_execucao_simultanea_nao_repete_avisos(self):
+        notificacao = self._cancelar()
+        concorrentes = []
+
+        class OutraExecucaoNoMeio(LocmemEmailBackend):
+            def send_messages(self, messages):
+                if not concorrentes:
+                    concorrentes.append(CancelamentoService.notificar(notificacao.pk, lote=2))
+                return super().send_messages(messages)
+
+        notificacao = CancelamentoService.notificar(notificacao.pk, lote=2, connection=OutraExecucaoNoMeio())
+
+        self.assertEqual(concorrentes[0].enviados, 0)
+        self.assertEqual((notificacao.status, notificacao.enviados, notificacao.reservadaAte), ('concluida', 5, None))
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), sorted(u.email for u in self.users[:5]))
+
+    def test_reserva_vencida_e_retomada(self):
+        notificacao = self._cancelar()
+        notificacaoCancelamento.objects.filter(pk=notificacao.pk).update(
+            reservadaAte=timezone.now() + timedelta(minutes=1)
+        )
+        self.assertEqual(CancelamentoService.notificar_pendentes(lote=2)[0].enviados, 0)
+
+        notificacaoCancelamento.objects.filter(pk=notificacao.pk).update(
+            reservadaAte=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(CancelamentoService.notificar_pendentes(lote=2)[0].enviados, 5)
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_apenas_organizador_ou_admin_cancela(self):
+        client = APIClient()
+        client.force_authenticate(self.users[0])
+        response = client.delete(f'/api/eventos/gerenciar/{self.evento.pk}/')
+
+        self.assertEqual(response.status_code, 403)
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.status, 'ativo')
+        self.assertFalse(notificacaoCancelamento.objects.exists())
+
+        client.force_authenticate(User.objects.create(username='admin', is_staff=True))
+        self.assertEqual(client.delete(f'/api/eventos/gerenciar/{self.evento.pk}/').status_code, 200)
+        self.assertTrue(notificacaoCancelamento.objects.filter(evento=self.evento).exists())
+
+
+class EmailTemplatesTests(TestCase):
+
+    def setUp(self):
+        self.localidade = localidade.objects.create(cidade='Lavras', uf='MG')
+        user = criar_participantes(self.localidade, 1)[0]
+        organizador_obj = organizador.objects.create(participante=user.participante)
+        self.evento = criar_evento(organizador_obj, self.localidade)
+
+    def test_lote_renderiza_o_layout_uma_vez(self):
+        destinatarios = [
+            {'nome': f'Ana <{i}>', 'link_pagamento': f'https://bypodium.test/gateway/payment/{i}/'} for i in range(50)
+        ]
+        with mock.patch('evento.email_templates.get_template', wraps=loader.get_template) as get_template:
+            emails = list(EmailTemplates.renderizar_lote('vaga_liberada', {'evento': self.evento}, destinatarios))
+
+        self.assertEqual(get_template.call_count, 3)
+        self.assertEqual(len(emails), 50)
+        _, assunto, texto, html = emails[7]
+        self.assertEqual(assunto, 'Abriu uma vaga no evento "Corrida de Teste"!')
+        self.assertIn('Olá, Ana <7>!', texto)
+        self.assertIn('https://bypodium.test/gateway/payment/7/', texto)
+        self.assertIn('Ana &lt;7&gt;', html)
+        self.assertNotIn('Ana <7>', html)
+
+    @override_settings(SITE_URL='https://bypodium.com.br')
+    def test_vaga_liberada_com_link_absoluto(self):
+        inscricao_obj = inscricao.objects.create(evento=self.evento, participante=participante.objects.get())
+
+        EmailService.enviar_emails_vaga_liberada(self.evento, [inscricao_obj])
+
+        email = emailPendente.objects.get()
+        link = f'https://bypodium.com.br/gateway/payment/{inscricao_obj.pk}/'
+        self.assertIn(f'Página de pagamento: {link}', email.corpoTexto)
+        self.assertIn(f'href="{link}"', email.corpoHtml)
+
+
+class ResumoEventoTests(TestCase):
+
+    def setUp(self):
+        self.localidade = localidade.objects.create(cidade='Lavras', uf='MG')
+        self.users = criar_participantes(self.localidade, 20)
+        self.organizador = organizador.objects.create(participante=self.users[-1].participante)
+
+    def _evento_com(self, quantidade):
+        evento_obj = criar_evento(self.organizador, self.localidade)
+        kits = [kit.objects.create(evento=evento_obj, nome=f'Kit {i}') for i in range(quantidade)]
+        categorias = [
+            categoria.objects.create(evento=evento_obj, nome=f'Cat {i}', sexo='M', idadeMax=99)
+            for i in range(quantidade)
+        ]
+        for i, user in enumerate(self.users[:quantidade * 2]):
+            inscricao.objects.create(
+                evento=evento_obj, participante=user.participante, kit=kits[i % quantidade],
+                categoria=categorias[i % quantidade], status='confirmada' if i % 2 else 'pendente'
+            )
+        return evento_obj
+
+    def test_numero_de_consultas_nao_depende_de_kits_e_categorias(self):
+        pequeno, grande = self._evento_com(1), self._evento_com(10)
+
+        with self.assertNumQueries(5):
+            EventReports.get_event_summary(pequeno.pk, ao_vivo=True)
+        with self.assertNumQueries(5):
+            resumo = EventReports.get_event_summary(grande.pk, ao_vivo=True)
+
+        self.assertEqual(resumo['estatisticas']['total_inscritos'], 20)
+        self.assertEqual(resumo['status_inscricoes'], {'confirmadas': 10, 'pendentes': 10, 'canceladas': 0})
+        self.assertEqual(resumo['kits'], {f'Kit {i}': 2 for i in range(10)})
+        self.assertEqual(resumo['categorias'], {f'Cat {i}': 2 for i in range(10)})
+
+    def test_dias_sem_inscricao_sao_preenchidos(self):
+        evento_obj = self._evento_com(1)
+        tres_dias = date.today() - timedelta(days=3)
+        inscricao.objects.filter(pk=inscricao.objects.filter(evento=evento_obj).first().pk).update(
+            criadoEm=timezone.now() - timedelta(days=3)
+        )
+
+        por_dia = EventReports.get_event_summary(evento_obj.pk, ao_vivo=True)['inscricoes_por_dia']
+
+        self.assertEqual(len(por_dia['datas']), 4)
+        self.assertEqual(por_dia['datas'][0], tres_dias.strftime('%Y-%m-%d'))
+        self.assertEqual(por_dia['inscricoes_diarias'], [1, 0, 0, 1])
+
+    def test_serie_por_hora(self):
+        evento_obj = self._evento_com(1)
+        primeira, segunda = inscricao.objects.filter(evento=evento_obj).order_by('id')
+        agora = timezone.now().replace(minute=30)
+        inscricao.objects.filter(pk=primeira.pk).update(criadoEm=agora - timedelta(hours=3))
+        inscricao.objects.filter(pk=segunda.pk).update(criadoEm=agora)
+
+        with self.assertNumQueries(5):
+            resumo = EventReports.get_event_summary(evento_obj.pk, granularidade='hora')
+
+        por_hora = resumo['inscricoes_por_hora']
+        self.assertEqual(por_hora['inscricoes_horarias'], [1, 0, 0, 1])
+        self.assertEqual(por_hora['horas'][-1], agora.strftime('%Y-%m-%dT%H:00'))
+
+    def test_data_de_criacao_nao_muda_ao_confirmar(self):
+        evento_obj = self._evento_com(1)
+        inscricao_obj = inscricao.objects.filter(evento=evento_obj).first()
+        ontem = timezone.now() - timedelta(days=1)
+        inscricao.objects.filter(pk=inscricao_obj.pk).update(criadoEm=ontem)
+
+        inscricao_obj.refresh_from_db()
+        inscricao_obj.status = 'confirmada'
+        inscricao_obj.save()
+
+        inscricao_obj.refresh_from_db()
+        self.assertEqual(inscricao_obj.criadoEm, ontem)
+
+
+class EstatisticasEventoTests(TestCase):
+    """O rollup acompanha as inscrições e o resumo servido por ele coincide com o cálculo ao vivo"""
+
+    def setUp(self):
+        self.localidade = localidade.objects.create(cidade='Lavras', uf='MG')
+        self.users = criar_participantes(self.localidade, 12)
+        self.organizador = organizador.objects.create(participante=self.users[-1].participante)
+        self.evento = criar_evento(self.organizador, self.localidade, limiteQuantInsc=6)
+        self.kits = [kit.objects.create(evento=self.evento, nome=f'Kit {i}') for i in range(2)]
+        self.categoria = categoria.objects.create(evento=self.evento, nome='Geral', sexo='M', idadeMax=99)
+        self.inscricoes = [
+            inscricao.objects.create(
+                evento=self.evento, participante=user.participante, kit=self.kits[i % 2],
+                categoria=self.categoria, status='pendente', expiraEm=timezone.now() + timedelta(minutes=15)
+            )
+            for i, user in enumerate(self.users[:6])
+        ]
+        ControleVagas.reservar_lote(self.evento, 6)
+
+    def _assert_rollup_igual_ao_vivo(self):
+        rollup = EventReports.get_event_summary(self.evento.pk)
+        ao_vivo = EventReports.get_event_summary(self.evento.pk, ao_vivo=True)
+        for chave in ('estatisticas', 'status_inscricoes', 'kits', 'categorias', 'inscricoes_por_dia'):
+            self.assertEqual(rollup[chave], ao_vivo[chave], chave)
+        return rollup
+
+    def test_resumo_do_rollup_usa_consultas_fixas(self):
+        with self.assertNumQueries(4):
+            resumo = EventReports.get_event_summary(self.evento.pk)
+        self.assertEqual(resumo['estatisticas']['total_inscritos'], 6)
+        self.assertEqual(resumo['kits'], {'Kit 0': 3, 'Kit 1': 3})
+        self._assert_rollup_igual_ao_vivo()
+
+    def test_mudanca_de_status_kit_e_remocao(self):
+        confirmada = inscricao.objects.get(pk=self.inscricoes[0].pk)
+        confirmada.status = 'confirmada'
+        confirmada.kit = self.kits[1]
+        confirmada.save()
+        inscricao.objects.get(pk=self.inscricoes[1].pk).delete()
+
+        resumo = self._assert_rollup_igual_ao_vivo()
+        self.assertEqual(resumo['status_inscricoes'], {'confirmadas': 1, 'pendentes': 4, 'canceladas': 0})
+        self.assertEqual(resumo['kits'], {'Kit 0': 2, 'Kit 1': 3})
+
+    def test_expiracao_em_lote_e_promocao_da_lista_de_espera(self):
+        listaEspera.objects.bulk_create([
+            listaEspera(evento=self.evento, participante=user.participante, kit=self.kits[0])
+            for user in self.users[6:8]
+        ])
+        inscricao.objects.filter(pk__in=[obj.pk for obj in self.inscricoes[:3]]).update(
+            expiraEm=timezone.now() - timedelta(seconds=1)
+        )
+
+        ReservaService.expirar_pendentes()
+
+        resumo = self._assert_rollup_igual_ao_vivo()
+        self.assertEqual(resumo['estatisticas']['total_inscritos'], 5)
+
+    def test_cancelamento_do_evento(self):
+        client = APIClient()
+        client.force_authenticate(self.users[-1])
+        response = client.delete(f'/api/eventos/gerenciar/{self.evento.pk}/')
+        self.assertEqual(response.status_code, 200)
+
+        resumo = self._assert_rollup_igual_ao_vivo()
+        self.assertEqual(resumo['status_inscricoes'], {'confirmadas': 0, 'pendentes': 0, 'canceladas': 6})
+
+    def test_inscricao_nao_atualiza_as_linhas_do_rollup(self):
+        with CaptureQueriesContext(connection) as consultas:
+            inscricao.objects.create(
+                evento=self.evento, participante=self.users[6].participante, kit=self.kits[0], status='pendente'
+            )
+        self.assertFalse([c['sql'] for c in consultas.captured_queries if 'evento_estatisticaevento' in c['sql']])
+        self.assertEqual(deltaEstatistica.objects.filter(evento=self.evento, dimensao='total').count(), 7)
+
+    def test_consolidacao_preserva_o_resumo(self):
+        inscricao.objects.get(pk=self.inscricoes[1].pk).delete()
+        antes = self._assert_rollup_igual_ao_vivo()
+        pendentes = deltaEstatistica.objects.count()
+
+        self.assertEqual(EstatisticasEvento.consolidar(lote=7), pendentes)
+
+        self.assertFalse(deltaEstatistica.objects.exists())
+        self.assertEqual(self._assert_rollup_igual_ao_vivo(), antes)
+        self.assertEqual(estatisticaEvento.objects.get(evento=self.evento, dimensao='total').total, 5)
+
+    def test_reconstrucao_corrige_divergencias(self):
+        EstatisticasEvento.consolidar()
+        estatisticaEvento.objects.filter(evento=self.evento, dimensao='status').update(total=99)
+        inscricao.objects.filter(evento=self.evento).update(status='confirmada')
+
+        EstatisticasEvento.reconstruir(self.evento.pk)
+
+        resumo = self._assert_rollup_igual_ao_vivo()
+        self.assertEqual(resumo['status_inscricoes']['confirmadas'], 6)
+
+    def test_exclusao_do_evento_nao_recria_o_rollup(self):
+        self.evento.delete()
+        EstatisticasEvento.consolidar()
+        self.assertFalse(estatisticaEvento.objects.exists())
+        self.assertFalse(deltaEstatistica.objects.exists())
+
+
+class ExportacaoParticipantesTests(TestCase):
+    """Relatório de participantes em JSON, CSV e XLSX, com número fixo de consultas"""
+
+    def setUp(self):
+        self.localidade = localidade.objects.create(cidade='Lavras', uf='MG')
+        self.users = criar_participantes(self.localidade, 8)
+        self.organizador = organizador.objects.create(participante=self.users[-1].participante)
+        self.evento = criar_evento(self.organizador, self.localidade)
+        kits = [kit.objects.create(evento=self.evento, nome=f'Kit {i}') for i in range(3)]
+        for i, user in enumerate(self.users[:6]):
+            inscricao_obj = inscricao.objects.create(
+                evento=self.evento, participante=user.participante, kit=kits[i % 3] if i else None,
+                status='confirmada' if i % 2 else 'pendente'
+            )
+            if i % 2:
+                pagamento.objects.create(inscricao=inscricao_obj, status='pago', metodoPagamento='pix', valor=50)
+        self.client = APIClient()
+        self.client.force_authenticate(self.users[-1])
+        self.url = f'/api/eventos/{self.evento.pk}/report/?type=participants'
+
+    def test_relatorio_json_sem_consulta_por_inscricao(self):
+        with self.assertNumQueries(2):
+            relatorio = EventReports.get_participant_report(self.evento.pk)
+        self.assertEqual(relatorio['total_participantes'], 6)
+        self.assertEqual(relatorio['participantes'][0]['kit'], 'Sem kit')
+        self.assertEqual(relatorio['participantes'][1]['pagamento'], 'pago')
+
+    def test_exportacao_csv_em_fluxo(self):
+        response = self.client.get(self.url + '&format=csv')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn('participantes-evento', response['Content-Disposition'])
+        linhas = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode('utf-8-sig'))))
+        self.assertEqual(linhas[0][:3], ['nome', 'email', 'kit'])
+        self.assertEqual(len(linhas), 7)
+        self.assertEqual(linhas[2][6:], ['pago', 'pix'])
+
+    def test_exportacao_xlsx_em_fluxo(self):
+        response = self.client.get(self.url + '&format=xlsx')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        with zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content))) as arquivo:
+            self.assertIsNone(arquivo.testzip())
+            planilha = ElementTree.fromstring(arquivo.read('xl/worksheets/sheet1.xml'))
+        ns = {'s': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+        linhas = planilha.findall('s:sheetData/s:row', ns)
+        self.assertEqual(len(linhas), 7)
+        self.assertEqual(linhas[1].find('s:c/s:is/s:t', ns).text, 'Participante 0')
+
+    def test_exportacao_neutraliza_formulas(self):
+        participante.objects.filter(pk=self.users[0].participante.pk).update(nome='=HYPERLINK("http://x.invalid","ok")')
+        participante.objects.filter(pk=self.users[1].participante.pk).update(nome='@SUM(1+1)', email='-2+3@teste.com')
+
+        linhas = list(csv.reader(io.StringIO(
+            b''.join(self.client.get(self.url + '&format=csv').streaming_content).decode('utf-8-sig')
+        )))
+        self.assertEqual(linhas[1][:2], ['\'=HYPERLINK("http://x.invalid","ok")', 'user0@teste.com'])
+        self.assertEqual(linhas[2][:2], ["'@SUM(1+1)", "'-2+3@teste.com"])
+
+        response = self.client.get(self.url + '&format=xlsx')
+        with zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content))) as arquivo:
+            planilha = ElementTree.fromstring(arquivo.read('xl/worksheets/sheet1.xml'))
+        ns = {'s': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+        self.assertEqual(
+            planilha.findall('s:sheetData/s:row', ns)[1].find('s:c/s:is/s:t', ns).text,
+            '\'=HYPERLINK("http://x.invalid","ok")'
+        )
+
+    def test_exportacao_apenas_do_relatorio_de_participantes(self):
+        response = self.client.get(f'/api/eventos/{self.evento.pk}/report/?type=summary&format=csv')
+        self.assertEqual(response.status_code, 400)
+
+
+class RelatorioParticipantesPaginadoTests(TestCase):
+    """Relatório de participantes paginado por cursor, com filtros, busca e totais do rollup"""
+
+    def setUp(self):
+        self.localidade = localidade.objects.create(cidade='Lavras', uf='MG')
+        self.users = criar_participantes(self.localidade, 13)
+        self.organizador = organizador.objects.create(participante=self.users[-1].participante)
+        self.evento = criar_evento(self.organizador, self.localidade)
+        self.kits = [kit.objects.create(evento=self.evento, nome=f'Kit {i}') for i in range(2)]
+        for i, user in enumerate(self.users[:12]):
+            inscricao.objects.create(
+                evento=self.evento, participante=user.participante, kit=self.kits[i % 2],
+                status='confirmada' if i < 4 else 'pendente'
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.users[-1])
+        self.url = f'/api/eventos/{self.evento.pk}/report/participants/'
+
+    def test_paginacao_por_cursor_percorre_todos(self):
+        response = self.client.get(self.url, {'page_size': 5})
+        ids = [linha['id'] for linha in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            ids += [linha['id'] for linha in response.data['results']]
+
+        self.assertEqual(len(ids), 12)
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(response.data['total'], 12)
+
+    def test_filtros_e_totais_do_rollup(self):
+        response = self.client.get(self.url, {'status': 'confirmada'})
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertEqual((response.data['total'], response.data['total_filtrado']), (12, 4))
+
+        response = self.client.get(self.url, {'status': 'confirmada', 'kit': self.kits[0].pk})
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNone(response.data['total_filtrado'])
+
+        self.assertEqual(self.client.get(self.url, {'status': 'invalido'}).status_code, 400)
+
+    def test_busca_por_prefixo_e_ordenacao_por_nome(self):
+        response = self.client.get(self.url, {'q': 'participante 1', 'ordering': '-nome'})
+        nomes = [linha['nome'] for linha in response.data['results']]
+        self.assertEqual(nomes, ['Participante 11', 'Participante 10', 'Participante 1'])
+
+        response = self.client.get(self.url, {'q': 'USER3@'})
+        self.assertEqual([linha['email'] for linha in response.data['results']], ['user3@teste.com'])
+
+    def test_consultas_nao_dependem_do_tamanho_da_pagina(self):
+        with self.assertNumQueries(4):
+            self.client.get(self.url, {'page_size': 2})
+        with self.assertNumQueries(4):
+            self.client.get(self.url, {'page_size': 12})
+
+    def test_apenas_o_organizador(self):
+        client = APIClient()
+        client.force_authenticate(self.users[0])
+        self.assertEqual(client.get(self.url).status_code, 403)
+
+
+class PainelOrganizadorTests(TestCase):
+    """Painel agregado do organizador: consultas fixas, cache e invalidação"""
+
+    def setUp(self):
+        cache.clear()
+        self.localidade = localidade.objects.create(cidade='Lavras', uf='MG')
+        self.users = criar_participantes(self.localidade, 10)
+        self.organizador = organizador.objects.create(participante=self.users[-1].participante)
+        self.eventos = [
+            criar_evento(self.organizador, self.localidade, nome=f'Evento {i}', limiteQuantInsc=10)
+            for i in range(3)
+        ]
+        for i, user in enumerate(self.users[:6]):
+            inscricao_obj = inscricao.objects.create(
+                evento=self.eventos[i % 2], participante=user.participante,
+                status='confirmada' if i < 4 else 'cancelado'
+            )
+            if i < 4:
+                pagamento.objects.create(inscricao=inscricao_obj, status='pago', metodoPagamento='pix', valor=50)
+
+    def test_numeros_por_evento_com_consultas_fixas(self):
+        with CaptureQueriesContext(connection) as consultas:
+            painel = PainelOrganizador.obter(self.organizador.pk)
+        self.assertEqual(len(consultas_sem_cache(consultas)), 2)
+
+        por_nome = {item['nome']: item for item in painel['eventos']}
+        self.assertEqual(por_nome['Evento 0']['inscricoes_total'], 2)
+        self.assertEqual(por_nome['Evento 0']['confirmadas'], 2)
+        self.assertEqual(por_nome['Evento 0']['receita'], 100)
+        self.assertEqual(por_nome['Evento 0']['taxa_ocupacao'], 20.0)
+        self.assertEqual(por_nome['Evento 2']['inscricoes_total'], 0)
+        self.assertEqual(painel['totais']['receita'], 200)
+
+        with CaptureQueriesContext(connection) as consultas:
+            PainelOrganizador.obter(self.organizador.pk)
+        self.assertEqual(consultas_sem_cache(consultas), [])
+
+    def test_inscricao_invalida_o_painel(self):
+        PainelOrganizador.obter(self.organizador.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            inscricao.objects.create(evento=self.eventos[2], participante=self.users[7].participante)
+
+        painel = PainelOrganizador.obter(self.organizador.pk)
+        por_nome = {item['nome']: item for item in painel['eventos']}
+        self.assertEqual(por_nome['Evento 2']['inscricoes_total'], 1)
+
+    def test_invalidacao_chega_aos_outros_processos(self):
+        # Outro worker: instância própria do backend configurado (um LocMemCache não atravessaria processos)
+        outro_worker = caches.create_connection('default')
+        self.assertNotIsInstance(outro_worker, LocMemCache)
+        PainelOrganizador.obter(self.organizador.pk)
+        with mock.patch('evento.painel.cache', outro_worker), CaptureQueriesContext(connection) as consultas:
+            PainelOrganizador.obter(self.organizador.pk)
+        self.assertEqual(consultas_sem_cache(consultas), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            inscricao.objects.create(evento=self.eventos[2], participante=self.users[7].participante)
+
+        with mock.patch('evento.painel.cache', outro_worker):
+            painel = PainelOrganizador.obter(self.organizador.pk)
+        por_nome = {item['nome']: item for item in painel['eventos']}
+        self.assertEqual(por_nome['Evento 2']['inscricoes_total'], 1)
+
+    def test_novo_evento_invalida_o_painel(self):
+        PainelOrganizador.obter(self.organizador.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            criar_evento(self.organizador, self.localidade, nome='Evento novo')
+
+        self.assertEqual(PainelOrganizador.obter(self.organizador.pk)['totais']['eventos'], 4)
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.users[-1])
+        response = client.get('/api/eventos/organizador/painel/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['eventos']), 3)
+
+        client.force_authenticate(self.users[0])
+        self.assertEqual(client.get('/api/eventos/organizador/painel/').status_code, 403)
+
+
+class ModeracaoEventosTests(TestCase):
+
+    def setUp(self):
+        self.localidade = localidade.objects.create(cidade='Lavras', uf='MG')
+        users = criar_participantes(self.localidade, 2)
+        self.organizadores = [organizador.objects.create(participante=user.participante) for user in users]
+        agora = timezone.now()
+        self.pendentes = []
+        for i in range(4):
+            evento_obj = criar_evento(self.organizadores[i % 2], self.localidade, nome=f'Evento {i}', status='pendente')
+            # Envio mais recente primeiro: a fila deve inverter a ordem de criação
+            evento.objects.filter(pk=evento_obj.pk).update(criadoEm=agora - timedelta(hours=i))
+            self.pendentes.append(evento_obj)
+        self.ativo = criar_evento(self.organizadores[0], self.localidade)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='admin', is_staff=True))
+
+    def _moderar(self, **dados):
+        return self.client.post('/api/eventos/pendentes/lote/', dados, format='json')
+
+    def test_fila_compacta_ordenada_pelo_envio_mais_antigo(self):
+        response = self.client.get('/api/eventos/pendentes/fila/?page_size=3')
+
+        self.assertEqual(response.status_code, 200)
+        resultados = response.data['results']
+        self.assertEqual([item['id'] for item in resultados], [e.pk for e in reversed(self.pendentes)][:3])
+        self.assertNotIn('descricao', resultados[0])
+        self.assertEqual(resultados[0]['organizador_email'], 'user1@teste.com')
+        self.assertEqual(resultados[0]['localidade_uf'], 'MG')
+
+        proxima = self.client.get(response.data['next'])
+        self.assertEqual([item['id'] for item in proxima.data['results']], [self.pendentes[0].pk])
+
+    def test_fila_restrita_a_admins(self):
+        client = APIClient()
+        client.force_authenticate(self.organizadores[0].participante.user)
+        self.assertEqual(client.get('/api/eventos/pendentes/fila/').status_code, 403)
+        self.assertEqual(client.post('/api/eventos/pendentes/lote/', {}, format='json').status_code, 403)
+
+    def test_aprovacao_em_lote_com_um_update_e_emails_no_outbox(self):
+        ids = [e.pk for e in self.pendentes[:3]] + [self.ativo.pk]
+
+        with CaptureQueriesContext(connection) as consultas:
+            response = self._moderar(ids=ids, status='ativo', confirmacao=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['atualizados'], ids[:3])
+        self.assertEqual(response.data['ignorados'], [self.ativo.pk])
+        updates = [c['sql'] for c in consultas.captured_queries if c['sql'].startswith('UPDATE "evento_evento"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(
+            set(evento.objects.filter(pk__in=ids).values_list('status', flat=True)), {'ativo'}
+        )
+        self.assertEqual(evento.objects.get(pk=self.pendentes[3].pk).status, 'pendente')
+        self.assertEqual(
+            sorted(emailPendente.objects.values_list('destinatario', flat=True)),
+            ['user0@teste.com', 'user0@teste.com', 'user1@teste.com']
+        )
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_negacao_em_lote_exige_feedback_e_confirmacao(self):
+        ids = [e.pk for e in self.pendentes]
+
+        self.assertEqual(self._moderar(ids=ids, status='negado', confirmacao=True).status_code, 400)
+        response = self._moderar(ids=ids, status='negado', feedback_admin='Dados incompletos')
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.data['requires_confirmation'])
+        self.assertEqual(response.data['quantidade'], 4)
+        self.assertFalse(evento.objects.filter(status='negado').exists())
+
+        response = self._moderar(ids=ids, status='negado', feedback_admin='Dados incompletos', confirmacao=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(evento.objects.filter(status='negado').count(), 4)
+        self.assertTrue(all('Dados incompletos' in email.corpoTexto for email in emailPendente.objects.all()))
+
+
+class BuscaEventosTests(TestCase):
+    """Índice FTS5 dos eventos ativos: ranking, destaque e sincronização pelos sinais"""
+
+    def setUp(self):
+        self.localidade = localidade.objects.create(cidade='Lavras', uf='MG')
+        user = criar_participantes(self.localidade, 1)[0]
+        self.organizador = organizador.objects.create(participante=user.participante)
+
+    def _ids(self, consulta):
+        return [resultado['id'] for resultado in EventSearch.buscar(consulta)]
+
+    def test_nome_pesa_mais_que_a_descricao(self):
+        na_descricao = criar_evento(self.organizador, self.localidade, nome='Corrida Noturna',
+                                    descricao='Percurso com trecho de maratona pela cidade')
+        no_nome = criar_evento(self.organizador, self.localidade, nome='Maratona de Lavras',
+                               descricao='Percurso pela cidade')
+        criar_evento(self.organizador, self.localidade, nome='Pedal', descricao='Passeio ciclístico')
+
+        resultados = EventSearch.buscar('maratona')
+        self.assertEqual([resultado['id'] for resultado in resultados], [no_nome.pk, na_descricao.pk])
+        self.assertGreater(resultados[0]['relevancia'], resultados[1]['relevancia'])
+
+    def test_prefixo_e_todos_os_termos(self):
+        alvo = criar_evento(self.organizador, self.localidade, nome='Maratona Universitária')
+        criar_evento(self.organizador, self.localidade, nome='Maratona Noturna')
+
+        self.assertEqual(self._ids('marat univ'), [alvo.pk])
+        # Operadores do FTS5 são descartados em vez de virarem erro de sintaxe
+        self.assertEqual(self._ids('(univ"* -'), [alvo.pk])
+        self.assertEqual(self._ids('"*'), [])
+
+    def test_cidade_e_uf_fazem_parte_do_indice(self):
+        outra = localidade.objects.create(cidade='Varginha', uf='SP')
+        alvo = criar_evento(self.organizador, outra)
+        criar_evento(self.organizador, self.localidade)
+
+        self.assertEqual(self._ids('varginha'), [alvo.pk])
+        self.assertEqual(self._ids('sp'), [alvo.pk])
+
+    def test_destaque_com_mark_e_texto_escapado(self):
+        criar_evento(self.organizador, self.localidade, nome='Maratona <b>&</b> Amigos',
+                     descricao='Largada da maratona às 7h')
+
+        resultado = EventSearch.buscar('maratona')[0]
+        self.assertEqual(resultado['nome_destacado'], '<mark>Maratona</mark> &lt;b&gt;&amp;&lt;/b&gt; Amigos')
+        self.assertIn('<mark>maratona</mark>', resultado['trecho'])
+
+    def test_indice_acompanha_criacao_edicao_e_remocao(self):
+        evento_obj = criar_evento(self.organizador, self.localidade, nome='Maratona')
+        self.assertEqual(self._ids('maratona'), [evento_obj.pk])
+
+        evento_obj.nome = 'Triatlo'
+        evento_obj.save()
+        self.assertEqual(self._ids('maratona'), [])
+        self.assertEqual(self._ids('triatlo'), [evento_obj.pk])
+
+        evento_obj.delete()
+        self.assertEqual(self._ids('triatlo'), [])
+
+    def test_evento_que_deixa_de_ser_ativo_sai_do_indice(self):
+        evento_obj = criar_evento(self.organizador, self.localidade, nome='Maratona', status='pendente')
+        self.assertEqual(self._ids('maratona'), [])
+
+        evento_obj.status = 'ativo'
+        evento_obj.save()
+        self.assertEqual(self._ids('maratona'), [evento_obj.pk])
+
+        evento_obj.status = 'cancelado'
+        evento_obj.save()
+        self.assertEqual(self._ids('maratona'), [])
+
+    def test_alterar_a_localidade_reindexa_os_eventos(self):
+        ativo = criar_evento(self.organizador, self.localidade)
+        criar_evento(self.organizador, self.localidade, status='pendente')
+
+        self.localidade.cidade = 'Perdões'
+        self.localidade.save()
+
+        # remove_diacritics: a busca sem acento encontra a cidade acentuada
+        self.assertEqual(self._ids('perdoes'), [ativo.pk])
+        self.assertEqual(self._ids('lavras'), [])
+
+    def test_endpoint(self):
+        evento_obj = criar_evento(self.organizador, self.localidade, nome='Maratona')
+        criar_evento(self.organizador, self.localidade, nome='Maratona Cancelada', status='cancelado')
+
+        response = self.client.get('/api/eventos/search/', {'q': 'maratona'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.data['results']], [evento_obj.pk])
+        self.assertEqual(response.data['results'][0]['destaque']['nome'], '<mark>Maratona</mark>')
+
+        self.assertEqual(self.client.get('/api/eventos/search/').status_code, 400)
+
+
+class EventoPublicoTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.localidade = localidade.objects.create(cidade='Lavras', uf='MG')
+        self.users = criar_participantes(self.localidade, 2)
+        self.organizador = organizador.objects.create(participante=self.users[0].participante)
+        self.evento = criar_evento(self.organizador, self.localidade)
+        self.outro = criar_evento(self.organizador, self.localidade, nome='Outro')
+        inscricao.objects.create(evento=self.evento, participante=self.users[1].participante)
+        self.url = f'/api/eventos/{self.evento.pk}/'
+
+    def _client(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def test_anonimo_servido_do_cache_sem_consultas_aos_modelos(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(self.url)
+        self.assertEqual(consultas_sem_cache(consultas), [])
+        # Custo real: no DatabaseCache a leitura do cache é uma consulta (no Redis, nenhuma)
+        self.assertEqual(len(consultas.captured_queries), 1 if isinstance(caches['default'], DatabaseCache) else 0)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['nome'], 'Corrida de Teste')
+        self.assertEqual(response.data['organizador_email'], 'user0@teste.com')
+        self.assertTrue(response.data['isInscricaoAberta'])
+        self.assertFalse(response.data['isInscrito'])
+        self.assertFalse(response.data['isOrganizador'])
+
+    def test_salvar_o_evento_invalida_o_cache(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.evento.nome = 'Corrida Renomeada'
+            self.evento.save()
+
+        self.assertEqual(self.client.get(self.url).data['nome'], 'Corrida Renomeada')
+
+    def test_invalidacao_chega_aos_outros_processos(self):
+        # Outro worker: instância própria do backend configurado, que não compartilha memória com esta
+        self.assertNotIsInstance(caches['default'], LocMemCache)
+        outro_worker = caches.create_connection('default')
+        etag = self.client.get(self.url)['ETag']
+        self.assertIsNotNone(outro_worker.get(f'evento:publico:{self.evento.pk}:versao'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.evento.nome = 'Corrida Renomeada'
+            self.evento.save()
+
+        self.assertIsNone(outro_worker.get(f'evento:publico:{self.evento.pk}:versao'))
+        self.assertNotEqual(self.client.get(self.url)['ETag'], etag)
+        self.assertEqual(outro_worker.get(f'evento:publico:{self.evento.pk}')['dados']['nome'], 'Corrida Renomeada')
+
+    def test_evento_inexistente(self):
+        self.assertEqual(self.client.get('/api/eventos/999999/').status_code, 404)
+
+    def test_campos_pessoais_acrescentados_ao_payload_compartilhado(self):
+        inscrito = self._client(self.users[1]).get(self.url).data
+        dono = self._client(self.users[0]).get(self.url).data
+
+        self.assertEqual((inscrito['isInscrito'], inscrito['isOrganizador']), (True, False))
+        self.assertEqual((dono['isInscrito'], dono['isOrganizador']), (False, True))
+        self.assertEqual(inscrito['descricao'], dono['descricao'])
+
+    def test_flags_de_um_evento_e_em_lote(self):
+        client = self._client(self.users[1])
+
+        response = client.get(f'/api/eventos/{self.evento.pk}/flags/')
+        self.assertEqual(response.data, {'id': self.evento.pk, 'isInscrito': True, 'isOrganizador': False})
+        self.assertEqual(client.get('/api/eventos/999999/flags/').status_code, 404)
+
+        with self.assertNumQueries(2):
+            response = client.get(f'/api/eventos/flags/?ids={self.outro.pk},{self.evento.pk},999999')
+        self.assertEqual(response.data['results'], [
+            {'id': self.evento.pk, 'isInscrito': True, 'isOrganizador': False},
+            {'id': self.outro.pk, 'isInscrito': False, 'isOrganizador': False},
+        ])
+
+        self.assertEqual(client.get('/api/eventos/flags/?ids=a,b').status_code, 400)
+        self.assertEqual(client.get('/api/eventos/flags/').status_code, 400)
+        self.assertEqual(self.client.get('/api/eventos/flags/?ids=1').status_code, 401)
+
+
+class ValidadoresHTTPTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.localidade = localidade.objects.create(cidade='Lavras', uf='MG')
+        user = criar_participantes(self.localidade, 1)[0]
+        self.organizador = organizador.objects.create(participante=user.participante)
+        self.evento = criar_evento(self.organizador, self.localidade)
+
+    def _revalidar(self, url, **headers):
+        """(resposta inicial, resposta condicional com o ETag recebido)"""
+        response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, 200)
+        return response, self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'], **headers)
+
+    def test_lista_de_eventos_304_sem_serializar(self):
+        response, condicional = self._revalidar('/api/eventos/')
+
+        self.assertIn('Last-Modified', response)
+        self.assertEqual(condicional.status_code, 304)
+        self.assertEqual(condicional['ETag'], response['ETag'])
+        with self.assertNumQueries(1):
+            self.client.get('/api/eventos/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(
+            self.client.get('/api/eventos/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304
+        )
+
+    def test_lista_de_eventos_muda_com_o_evento_e_com_os_filtros(self):
+        response = self.client.get('/api/eventos/')
+
+        self.assertNotEqual(self.client.get('/api/eventos/?uf=MG')['ETag'], response['ETag'])
+        criar_evento(self.organizador, self.localidade, nome='Novo')
+        self.assertEqual(self.client.get('/api/eventos/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_lista_de_eventos_muda_quando_um_evento_sai_do_catalogo(self):
+        outro = criar_evento(self.organizador, self.localidade, nome='Outro')
+        alteracaoEvento.objects.update(criadoEm=timezone.now() - timedelta(days=1))
+        evento.objects.filter(pk__in=[self.evento.pk, outro.pk]).update(
+            atualizadoEm=timezone.now() - timedelta(days=1)
+        )
+        response = self.client.get('/api/eventos/')
+
+        outro.status = 'cancelado'
+        outro.save()
+        self.evento.delete()
+
+        for validador in ({'HTTP_IF_NONE_MATCH': response['ETag']},
+                          {'HTTP_IF_MODIFIED_SINCE': response['Last-Modified']}):
+            revalidada = self.client.get('/api/eventos/', **validador)
+            self.assertEqual(revalidada.status_code, 200)
+            self.assertEqual(revalidada.data['results'], [])
+
+    def test_detalhe_muda_com_kits_e_categorias(self):
+        url = f'/api/eventos/{self.evento.pk}/'
+        response, condicional = self._revalidar(url)
+        self.assertEqual(condicional.status_code, 304)
+
+        atualizado_em = self.evento.atualizadoEm
+        with self.captureOnCommitCallbacks(execute=True):
+            kit.objects.create(evento=self.evento, nome='Kit')
+        self.evento.refresh_from_db()
+        self.assertGreater(self.evento.atualizadoEm, atualizado_em)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_detalhe_varia_com_o_usuario(self):
+        url = f'/api/eventos/{self.evento.pk}/'
+        anonimo = self.client.get(url)
+        client = APIClient()
+        client.force_authenticate(self.organizador.participante.user)
+
+        dono = client.get(url, HTTP_IF_NONE_MATCH=anonimo['ETag'])
+        self.assertEqual(dono.status_code, 200)
+        self.assertTrue(dono.data['isOrganizador'])
+        self.assertIn('Authorization', dono['Vary'])
+
+    def test_estados_e_cidades(self):
+        _, condicional = self._revalidar('/api/auth/estados/')
+        self.assertEqual(condicional.status_code, 304)
+
+        response, condicional = self._revalidar('/api/auth/cidades/?estado=mg')
+        self.assertEqual(condicional.status_code, 304)
+        localidade.objects.create(cidade='Perdões', uf='MG')
+        self.assertEqual(
+            self.client.get('/api/auth/cidades/?estado=mg', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200
+        )
+
+    def test_cidades_mudam_com_a_edicao_da_localidade(self):
+        response, _ = self._revalidar('/api/auth/cidades/?estado=mg')
+        estados, _ = self._revalidar('/api/auth/estados/')
+
+        self.localidade.cidade = 'Lavras Novas'
+        self.localidade.save()
+
+        renomeada = self.client.get('/api/auth/cidades/?estado=mg', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(renomeada.status_code, 200)
+        self.assertEqual(renomeada.data['cidades'], ['Lavras Novas'])
+        self.assertEqual(self.client.get('/api/auth/estados/', HTTP_IF_NONE_MATCH=estados['ETag']).status_code, 200)
+
+
+class CatalogoEventosTests(TestCase):
+
+    def setUp(self):
+        self.lavras = localidade.objects.create(cidade='Lavras', uf='MG')
+        self.campinas = localidade.objects.create(cidade='Campinas', uf='SP')
+        user = criar_participantes(self.lavras, 1)[0]
+        self.organizador = organizador.objects.create(participante=user.participante)
+        hoje = date.today()
+        self.aberto = criar_evento(self.organizador, self.lavras, nome='Aberto', dataIni=hoje + timedelta(days=20))
+        self.barato = criar_evento(
+            self.organizador, self.campinas, nome='Barato', valorInsc=10, dataIni=hoje + timedelta(days=40)
+        )
+        self.encerrado = criar_evento(
+            self.organizador, self.lavras, nome='Encerrado', dataIni=hoje + timedelta(days=5),
+            dataIniInsc=hoje - timedelta(days=10), dataFimInsc=hoje - timedelta(days=1)
+        )
+        self.futuro = criar_evento(
+            self.organizador, self.campinas, nome='Futuro', valorInsc=200, dataIni=hoje + timedelta(days=60),
+            dataIniInsc=hoje + timedelta(days=5), dataFimInsc=hoje + timedelta(days=50)
+        )
+        criar_evento(self.organizador, self.lavras, nome='Pendente', status='pendente')
+
+    def _nomes(self, **params):
+        response = self.client.get('/api/eventos/', params)
+        self.assertEqual(response.status_code, 200)
+        return [item['nome'] for item in response.data['results']]
+
+    def test_lista_apenas_ativos_ordenados_por_data(self):
+        self.assertEqual(self._nomes(), ['Encerrado', 'Aberto', 'Barato', 'Futuro'])
+
+    def test_filtro_de_inscricoes(self):
+        self.assertEqual(self._nomes(inscricoes='abertas'), ['Aberto', 'Barato'])
+        self.assertEqual(self._nomes(inscricoes='fechadas'), ['Encerrado', 'Futuro'])
+
+    def test_filtro_de_localidade(self):
+        self.assertEqual(self._nomes(uf='sp'), ['Barato', 'Futuro'])
+        self.assertEqual(self._nomes(cidade='Lavras'), ['Encerrado', 'Aberto'])
+        self.assertEqual(self._nomes(uf='SP', inscricoes='abertas'), ['Barato'])
+
+    def test_filtro_de_datas_e_valores(self):
+        hoje = date.today()
+        inicio, fim = hoje + timedelta(days=20), hoje + timedelta(days=40)
+        self.assertEqual(self._nomes(data_inicio=inicio.isoformat(), data_fim=fim.isoformat()), ['Aberto', 'Barato'])
+        self.assertEqual(self._nomes(valor_min='50'), ['Encerrado', 'Aberto', 'Futuro'])
+        self.assertEqual(self._nomes(valor_max='50.00'), ['Encerrado', 'Aberto', 'Barato'])
+
+    def test_filtros_invalidos_retornam_400(self):
+        for params, campo in (
+            ({'inscricoes': 'todas'}, 'inscricoes'),
+            ({'data_inicio': '2025-13-01'}, 'data_inicio'),
+            ({'data_fim': 'amanha'}, 'data_fim'),
+            ({'valor_min': 'abc'}, 'valor_min'),
+            ({'valor_max': '1,5'}, 'valor_max'),
+        ):
+            response = self.client.get('/api/eventos/', params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn(campo, response.data)
+
+    def test_cursor_percorre_todas_as_paginas_com_os_filtros(self):
+        response = self.client.get('/api/eventos/', {'page_size': 1, 'uf': 'SP'})
+        nomes = [item['nome'] for item in response.data['results']]
+        self.assertIsNone(response.data['previous'])
+
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            self.assertEqual(response.status_code, 200)
+            nomes += [item['nome'] for item in response.data['results']]
+
+        self.assertEqual(nomes, ['Barato', 'Futuro'])
+
+    def test_page_size_respeita_o_maximo(self):
+        response = self.client.get('/api/eventos/', {'page_size': 2})
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+        response = self.client.get('/api/eventos/', {'page_size': 1000})
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertIsNone(response.data['next'])
+
+    def test_cursor_invalido_retorna_404(self):
+        self.assertEqual(self.client.get('/api/eventos/?cursor=invalido').status_code, 404)
+
+
+@override_settings(ALTERACOES_MARGEM_SEGUNDOS=0)
+class AlteracoesCatalogoTests(TestCase):
+
+    def setUp(self):
+        self.localidade = localidade.objects.create(cidade='Lavras', uf='MG')
+        user = criar_participantes(self.localidade, 1)[0]
+        self.organizador = organizador.objects.create(participante=user.participante)
+        self.ativo = criar_evento(self.organizador, self.localidade, nome='Ativo')
+        self.cancelado = criar_evento(self.organizador, self.localidade, nome='Cancelado')
+        self.removido = criar_evento(self.organizador, self.localidade, nome='Removido')
+        self.pendente = criar_evento(self.organizador, self.localidade, nome='Pendente', status='pendente')
+        self.token = self.client.get('/api/eventos/changes/').data['proximo']
+
+    def _alteracoes(self, since, **params):
+        response = self.client.get('/api/eventos/changes/', {'since': since, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_since_zero_percorre_o_catalogo(self):
+        data = self._alteracoes(0)
+
+        self.assertEqual([item['nome'] for item in data['eventos']], ['Ativo', 'Cancelado', 'Removido'])
+        self.assertEqual(data['removidos'], [])
+        self.assertFalse(data['tem_mais'])
+        self.assertEqual(self._alteracoes(data['proximo'])['eventos'], [])
+
+    def test_eventos_fora_do_catalogo_nao_entram_no_log(self):
+        self.pendente.nome = 'Ainda pendente'
+        self.pendente.save()
+
+        self.assertEqual(self._alteracoes(self.token)['proximo'], self.token)
+        self.assertFalse(alteracaoEvento.objects.filter(evento_id=self.pendente.pk).exists())
+
+    def test_alteracoes_e_tombstones_desde_o_token(self):
+        for nome in ('Ativo 2', 'Ativo 3'):
+            self.ativo.nome = nome
+            self.ativo.save()
+        self.cancelado.status = 'cancelado'
+        self.cancelado.save()
+        removido_id = self.removido.pk
+        self.removido.delete()
+
+        # Corte da compactação, alterações e eventos
+        with self.assertNumQueries(3):
+            data = self._alteracoes(self.token)
+
+        self.assertEqual([(item['id'], item['nome']) for item in data['eventos']], [(self.ativo.pk, 'Ativo 3')])
+        self.assertEqual(data['removidos'], [
+            {'id': self.cancelado.pk, 'status': 'cancelado'},
+            {'id': removido_id, 'status': 'removido'},
+        ])
+
+    def test_aprovacao_em_lote_entra_no_log(self):
+        admin = APIClient()
+        admin.force_authenticate(User.objects.create(username='admin', is_staff=True))
+        admin.post(
+            '/api/eventos/pendentes/lote/', {'ids': [self.pendente.pk], 'status': 'ativo', 'confirmacao': True},
+            format='json'
+        )
+
+        self.assertEqual([item['id'] for item in self._alteracoes(self.token)['eventos']], [self.pendente.pk])
+
+    def test_paginacao_pelo_limite(self):
+        data = self._alteracoes(0, limit=2)
+        self.assertTrue(data['tem_mais'])
+        self.assertEqual(len(data['eventos']), 2)
+        self.assertEqual([item['nome'] for item in self._alteracoes(data['proximo'], limit=2)['eventos']], ['Removido'])
+
+    @override_settings(ALTERACOES_MARGEM_SEGUNDOS=60)
+    def test_alteracoes_recentes_esperam_a_margem(self):
+        self.ativo.save()
+        self.assertEqual(self._alteracoes(self.token)['eventos'], [])
+
+    def test_parametros_invalidos(self):
+        self.assertEqual(self.client.get('/api/eventos/changes/?since=abc').status_code, 400)
+
+    def _envelhecer_log(self):
+        alteracaoEvento.objects.update(criadoEm=timezone.now() - timedelta(days=settings.ALTERACOES_RETENCAO_DIAS + 1))
+
+    def test_compactacao_mantem_o_catalogo_e_expira_tokens_antigos(self):
+        for nome in ('Ativo 2', 'Ativo 3'):
+            self.ativo.nome = nome
+            self.ativo.save()
+        self.cancelado.status = 'cancelado'
+        self.cancelado.save()
+        self.removido.delete()
+        self._envelhecer_log()
+        token_antigo = self._alteracoes(self.token)['proximo']
+        # Alteração dentro da retenção: fica intacta
+        self.cancelado.status = 'ativo'
+        self.cancelado.save()
+
+        self.assertEqual(AlteracoesCatalogo.compactar(lote=2), 6)
+
+        self.assertEqual(
+            sorted(alteracaoEvento.objects.values_list('evento_id', flat=True)), [self.ativo.pk, self.cancelado.pk]
+        )
+        data = self._alteracoes(0)
+        self.assertEqual([item['nome'] for item in data['eventos']], ['Ativo 3', 'Cancelado'])
+        self.assertEqual(data['removidos'], [])
+
+        response = self.client.get('/api/eventos/changes/', {'since': self.token})
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual([item['id'] for item in self._alteracoes(token_antigo)['eventos']], [self.cancelado.pk])
+
+    def test_compactacao_sem_alteracoes_antigas_nao_expira_tokens(self):
+        self.ativo.save()
+
+        self.assertEqual(AlteracoesCatalogo.compactar(), 0)
+        self.assertEqual(self.client.get('/api/eventos/changes/', {'since': self.token}).status_code, 200)
+        self.assertEqual(AlteracoesCatalogo.compactar(), 0)
+
+
+class OrcamentoConsultasTests(TestCase):
+    """
+    Cada endpoint tem um orçamento fixo de consultas, que não pode crescer com
+    a quantidade de objetos: uma relação carregada por objeto (N+1) estoura
+    o orçamento a partir de 10 objetos.
+    """
+
+    TAMANHOS = (1, 10, 1000)
+
+    def setUp(self):
+        cache.clear()
+        self.localidade = localidade.objects.create(cidade='Lavras', uf='MG')
+        self.users = criar_participantes(self.localidade, 2)
+        self.participante = self.users[-1].participante
+        self.organizador = organizador.objects.create(participante=self.participante)
+        self.evento = criar_evento(self.organizador, self.localidade)
+        self.inscricao = inscricao.objects.create(evento=self.evento, participante=self.participante)
+        self.admin = User.objects.create(username='admin@teste.com', is_staff=True)
+
+    def _popular(self, quantidade):
+        """`quantidade` eventos ativos com inscrição do participante e `quantidade` eventos pendentes"""
+        modelo = self.evento
+        eventos = evento.objects.bulk_create([
+            evento(
+                organizador=self.organizador, localidade=self.localidade, nome=f'Evento {i}',
+                descricao=modelo.descricao, dataIni=modelo.dataIni, dataFim=modelo.dataFim,
+                dataIniInsc=modelo.dataIniInsc, dataFimInsc=modelo.dataFimInsc, limiteQuantInsc=10,
+                valorInsc=modelo.valorInsc, status='ativo' if i < quantidade else 'pendente'
+            )
+            for i in range(quantidade * 2)
+        ])
+        kit_obj = kit.objects.create(evento=self.evento, nome='Kit')
+        inscricao.objects.bulk_create([
+            inscricao(evento=evento_obj, participante=self.participante, kit=kit_obj)
+            for evento_obj in eventos[:quantidade]
+        ])
+
+    def assertOrcamento(self, url, orcamento, user=None):
+        client = APIClient()
+        client.force_authenticate(user or self.users[-1])
+        for quantidade in self.TAMANHOS:
+            with self.subTest(url=url, objetos=quantidade):
+                ponto = transaction.savepoint()
+                try:
+                    self._popular(quantidade)
+                    with CaptureQueriesContext(connection) as consultas:
+                        response = client.get(url)
+                finally:
+                    transaction.savepoint_rollback(ponto)
+                self.assertEqual(response.status_code, 200)
+                sql = consultas_sem_cache(consultas)
+                self.assertLessEqual(len(sql), orcamento, '\n'.join(sql))
+
+    def test_lista_de_inscricoes(self):
+        self.assertOrcamento('/api/inscricoes/', 2)
+
+    def test_detalhe_da_inscricao(self):
+        self.assertOrcamento(f'/api/inscricoes/{self.inscricao.pk}/', 1)
+
+    def test_lista_de_eventos(self):
+        # Agregado dos validadores (ETag/Last-Modified) + página
+        self.assertOrcamento('/api/eventos/', 2)
+
+    def test_eventos_do_organizador(self):
+        self.assertOrcamento('/api/eventos/organizador/', 2)
+
+    def test_detalhe_do_evento(self):
+        self.assertOrcamento(f'/api/eventos/{self.evento.pk}/', 3)
+
+    def test_perfil_com_eventos_organizados(self):
+        self.assertOrcamento('/api/perfil/', 3)
+
+    def test_eventos_pendentes_do_admin(self):
+        self.assertOrcamento('/api/eventos/pendentes/', 1, user=self.admin)
+
+    def test_fila_de_moderacao(self):
+        self.assertOrcamento('/api/eventos/pendentes/fila/', 1, user=self.admin)
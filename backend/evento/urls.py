@@ -1,27 +1,38 @@
 from django.urls import path
 from .views import (
-    ListEventos, ListEventosOrganizador, DetailEvento, ListInscricoes, CriarInscricao, 
+    ListEventos, AlteracoesEventos, BuscarEventos, ListEventosOrganizador, PainelEventosOrganizador, DetailEvento, FlagsEvento, ListInscricoes, CriarInscricao, ListaEsperaEvento,
     DetalhesInscricao, DetalhesParticipante, CriarEvento, 
-    GerenciarEvento, GerenciarEventosPendentesAdmin, GerarRelatorio, PaymentStatus
+    GerenciarEvento, GerenciarEventosPendentesAdmin, FilaModeracaoEventos, ModerarEventosLote, GerarRelatorio, RelatorioParticipantes, PaymentStatus,
+    payment_status_stream
 )
 
 urlpatterns = [
     path('eventos/', ListEventos.as_view(), name='list-eventos'),
+    path('eventos/changes/', AlteracoesEventos.as_view(), name='alteracoes-eventos'),
+    path('eventos/search/', BuscarEventos.as_view(), name='buscar-eventos'),
     path('eventos/organizador/', ListEventosOrganizador.as_view(), name='list-eventos-organizador'),
+    path('eventos/organizador/painel/', PainelEventosOrganizador.as_view(), name='painel-organizador'),
     path('eventos/<int:pk>/', DetailEvento.as_view(), name='detail-evento'),
+    path('eventos/<int:pk>/flags/', FlagsEvento.as_view(), name='flags-evento'),
+    path('eventos/flags/', FlagsEvento.as_view(), name='flags-eventos'),
 
     path('inscricoes/', ListInscricoes.as_view(), name='list-inscricoes'),
     path('inscricoes/<int:pk>/', DetalhesInscricao.as_view(), name='detalhe-inscricao'),
     path('eventos/<int:pk>/criar', CriarInscricao.as_view(), name='criar-inscricao'),
+    path('eventos/<int:pk>/lista-espera/', ListaEsperaEvento.as_view(), name='lista-espera'),
 
     path('eventos/criar/', CriarEvento.as_view(), name='criar-evento'),
     path('eventos/gerenciar/<int:pk>/', GerenciarEvento.as_view(), name='gerenciar-evento'),
     path('eventos/pendentes/', GerenciarEventosPendentesAdmin.as_view(), name='gerenciar-eventos-pendentes'),
     path('eventos/pendentes/<int:pk>/', GerenciarEventosPendentesAdmin.as_view(), name='atualizar-status-evento'),
+    path('eventos/pendentes/fila/', FilaModeracaoEventos.as_view(), name='fila-moderacao'),
+    path('eventos/pendentes/lote/', ModerarEventosLote.as_view(), name='moderar-eventos-lote'),
     
     path('perfil/', DetalhesParticipante.as_view(), name='detalhe-participante'),
 
     path('eventos/<int:event_id>/report/', GerarRelatorio.as_view(), name='event-report'),
+    path('eventos/<int:event_id>/report/participants/', RelatorioParticipantes.as_view(), name='event-report-participants'),
     path('payment/status/<int:inscricao_id>/', PaymentStatus.as_view(), name='payment-status'),
+    path('payment/status/<int:inscricao_id>/stream/', payment_status_stream, name='payment-status-stream'),
 ]
 
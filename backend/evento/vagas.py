@@ -0,0 +1,230 @@
+import random
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, Sum, Value, When
+from django.db.models.functions import Greatest
+from .models import evento, slotVagas
+
+# Tempo (s) em que um evento com contador distribuído esgotado é recusado sem consultar o banco
+LOTADO_CACHE_TTL = 5
+
+# Tentativas de compare-and-swap do lote antes de reservar vaga a vaga
+CAS_TENTATIVAS = 5
+
+# Marca de lotado no cache local do processo: é lida dentro da transação da reserva e,
+# no DatabaseCache, essa leitura travaria o banco antes do UPDATE do slot. Uma vaga
+# liberada em outro processo aparece ali em até LOTADO_CACHE_TTL segundos.
+lotados = caches['local']
+
+
+def _chave_lotado(evento_id):
+    return f'vagas:lotado:{evento_id}'
+
+
+class ControleVagas:
+    """
+    Controle atômico da ocupação de vagas dos eventos.
+
+    Por padrão o contador é a própria linha do evento (quantInscAtual).
+    Eventos muito disputados podem usar um contador distribuído
+    (evento.slotsContador > 0): a capacidade restante é repartida em cotas
+    entre N slots e cada inscrição incrementa um slot aleatório, evitando
+    que todas as escritas disputem o lock da mesma linha.
+    """
+
+    @staticmethod
+    def reservar(evento_obj):
+        """Reserva uma vaga. Retorna False se o evento estiver lotado."""
+        if evento_obj.slotsContador:
+            return ControleVagas._reservar_em_slot(evento_obj)
+        return ControleVagas._reservar_na_linha(evento_obj.pk)
+
+    @staticmethod
+    def reservar_lote(evento_obj, quantidade):
+        """Reserva até `quantidade` vagas de uma vez. Retorna quantas foram reservadas."""
+        if quantidade <= 0:
+            return 0
+        with transaction.atomic():
+            if evento_obj.slotsContador:
+                # Traz as contagens dos slots para a linha, reserva nela e redistribui as cotas
+                ControleVagas.compactar(evento_obj.pk, redistribuir=False)
+                reservadas = ControleVagas._reservar_lote_na_linha(evento_obj.pk, quantidade)
+                ControleVagas.compactar(evento_obj.pk)
+                return reservadas
+            return ControleVagas._reservar_lote_na_linha(evento_obj.pk, quantidade)
+
+    @staticmethod
+    def liberar(evento_obj, quantidade=1):
+        """Devolve vagas ao evento sem deixar nenhum contador ficar negativo"""
+        lotados.delete(_chave_lotado(evento_obj.pk))
+        if evento_obj.slotsContador:
+            for _ in range(quantidade):
+                if not ControleVagas._liberar_em_slot(evento_obj.pk):
+                    # Vagas já compactadas na linha do evento: a cota volta na próxima compactação
+                    return ControleVagas._liberar_na_linha(evento_obj.pk, quantidade)
+                quantidade -= 1
+            return True
+        return ControleVagas._liberar_na_linha(evento_obj.pk, quantidade)
+
+    @staticmethod
+    def liberar_em_lote(contagens):
+        """
+        Devolve vagas de vários eventos de uma vez ({evento_id: quantidade}).
+        Eventos com contador único são atualizados num único UPDATE.
+        """
+        if not contagens:
+            return
+        lotados.delete_many([_chave_lotado(evento_id) for evento_id in contagens])
+
+        unicos = dict(contagens)
+        distribuidos = evento.objects.filter(pk__in=contagens, slotsContador__gt=0).values_list('id', flat=True)
+        for evento_id in distribuidos:
+            ControleVagas.compactar(evento_id, liberadas=unicos.pop(evento_id))
+        if unicos:
+            evento.objects.filter(pk__in=unicos).update(quantInscAtual=Case(
+                *[When(pk=evento_id, then=Greatest(F('quantInscAtual') - n, Value(0), output_field=PositiveIntegerField()))
+                  for evento_id, n in unicos.items()],
+                default=F('quantInscAtual'),
+            ))
+
+    @staticmethod
+    def ocupacao(evento_obj):
+        """Inscrições contabilizadas: linha do evento + slots ainda não compactados"""
+        if not evento_obj.slotsContador:
+            return evento.objects.filter(pk=evento_obj.pk).values_list('quantInscAtual', flat=True).get()
+        base = evento.objects.filter(pk=evento_obj.pk).values_list('quantInscAtual', flat=True).get()
+        usadas = slotVagas.objects.filter(evento_id=evento_obj.pk).aggregate(total=Sum('usadas'))['total']
+        return base + (usadas or 0)
+
+    @staticmethod
+    def habilitar_contador_distribuido(evento_obj, slots):
+        """Cria os slots do evento e distribui entre eles a capacidade restante"""
+        with transaction.atomic():
+            slotVagas.objects.bulk_create(
+                [slotVagas(evento=evento_obj, indice=indice) for indice in range(slots)],
+                ignore_conflicts=True
+            )
+            evento.objects.filter(pk=evento_obj.pk).update(slotsContador=slots)
+            evento_obj.slotsContador = slots
+            ControleVagas.compactar(evento_obj.pk)
+
+    @staticmethod
+    def desabilitar_contador_distribuido(evento_obj):
+        """Devolve as contagens dos slots para a linha do evento e remove os slots"""
+        with transaction.atomic():
+            ControleVagas.compactar(evento_obj.pk, redistribuir=False)
+            slotVagas.objects.filter(evento_id=evento_obj.pk).delete()
+            evento.objects.filter(pk=evento_obj.pk).update(slotsContador=0)
+            evento_obj.slotsContador = 0
+
+    @staticmethod
+    def compactar(evento_id, redistribuir=True, liberadas=0):
+        """
+        Soma as usadas de todos os slots em evento.quantInscAtual (descontando
+        vagas liberadas) e reparte a capacidade restante em novas cotas.
+        Retorna as vagas livres.
+        """
+        with transaction.atomic():
+            evento_obj = evento.objects.select_for_update().get(pk=evento_id)
+            slots = list(slotVagas.objects.select_for_update().filter(evento_id=evento_id).order_by('indice'))
+            ocupadas = max(evento_obj.quantInscAtual + sum(slot.usadas for slot in slots) - liberadas, 0)
+            livres = max(evento_obj.limiteQuantInsc - ocupadas, 0)
+
+            if slots:
+                cota, resto = divmod(livres if redistribuir else 0, len(slots))
+                for posicao, slot in enumerate(slots):
+                    slot.vagas = cota + (1 if posicao < resto else 0)
+                    slot.usadas = 0
+                slotVagas.objects.bulk_update(slots, ['vagas', 'usadas'])
+
+            evento.objects.filter(pk=evento_id).update(quantInscAtual=ocupadas)
+        return livres
+
+    @staticmethod
+    def _reservar_na_linha(evento_id):
+        """UPDATE condicional (quantInscAtual < limiteQuantInsc) na linha do evento"""
+        atualizados = evento.objects.filter(
+            pk=evento_id, quantInscAtual__lt=F('limiteQuantInsc')
+        ).update(quantInscAtual=F('quantInscAtual') + 1)
+        return atualizados == 1
+
+    @staticmethod
+    def _reservar_lote_na_linha(evento_id, quantidade):
+        """
+        Compare-and-swap na linha do evento; repete se outra escrita mudou o
+        contador. Sob disputa contínua, termina vaga a vaga com o UPDATE
+        condicional, que sempre avança: reserva uma vaga ou encontra o evento lotado.
+        """
+        for _ in range(CAS_TENTATIVAS):
+            atual, limite = ControleVagas._ler_contador(evento_id)
+            reservadas = min(quantidade, max(limite - atual, 0))
+            if reservadas == 0:
+                return 0
+            atualizados = evento.objects.filter(pk=evento_id, quantInscAtual=atual).update(
+                quantInscAtual=F('quantInscAtual') + reservadas
+            )
+            if atualizados == 1:
+                return reservadas
+
+        reservadas = 0
+        while reservadas < quantidade and ControleVagas._reservar_na_linha(evento_id):
+            reservadas += 1
+        return reservadas
+
+    @staticmethod
+    def _ler_contador(evento_id):
+        """(quantInscAtual, limiteQuantInsc) atuais do evento"""
+        return evento.objects.filter(pk=evento_id).values_list('quantInscAtual', 'limiteQuantInsc').get()
+
+    @staticmethod
+    def _liberar_na_linha(evento_id, quantidade):
+        atualizados = evento.objects.filter(
+            pk=evento_id, quantInscAtual__gte=quantidade
+        ).update(quantInscAtual=F('quantInscAtual') - quantidade)
+        return atualizados == 1
+
+    @staticmethod
+    def _incrementar_slot(evento_id, indice):
+        atualizados = slotVagas.objects.filter(
+            evento_id=evento_id, indice=indice, usadas__lt=F('vagas')
+        ).update(usadas=F('usadas') + 1)
+        return atualizados == 1
+
+    @staticmethod
+    def _reservar_em_slot(evento_obj):
+        if lotados.get(_chave_lotado(evento_obj.pk)):
+            return False
+
+        # Caminho rápido: um slot aleatório, sem ler nada antes
+        if ControleVagas._incrementar_slot(evento_obj.pk, random.randrange(evento_obj.slotsContador)):
+            return True
+
+        for tentativa in range(2):
+            indices = list(
+                slotVagas.objects.filter(evento_id=evento_obj.pk, usadas__lt=F('vagas'))
+                .values_list('indice', flat=True)
+            )
+            random.shuffle(indices)
+            for indice in indices:
+                if ControleVagas._incrementar_slot(evento_obj.pk, indice):
+                    return True
+            # Cotas esgotadas: compacta para recuperar vagas liberadas ou um limite maior
+            if tentativa == 0 and ControleVagas.compactar(evento_obj.pk) == 0:
+                break
+
+        lotados.set(_chave_lotado(evento_obj.pk), True, LOTADO_CACHE_TTL)
+        return False
+
+    @staticmethod
+    def _liberar_em_slot(evento_id):
+        indices = list(
+            slotVagas.objects.filter(evento_id=evento_id, usadas__gt=0).values_list('indice', flat=True)
+        )
+        random.shuffle(indices)
+        for indice in indices:
+            atualizados = slotVagas.objects.filter(
+                evento_id=evento_id, indice=indice, usadas__gt=0
+            ).update(usadas=F('usadas') - 1)
+            if atualizados == 1:
+                return True
+        return False
@@ -1,61 +1,319 @@
+import asyncio
 import json
+import time
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
 from rest_framework import generics, status, permissions, serializers
+from rest_framework.filters import OrderingFilter
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from .models import evento, categoria, kit
-from inscricoes.models import inscricao
+from inscricoes.models import inscricao, listaEspera
 from usuarios.models import participante, organizador
 from localidades.models import localidade
+from authentication.identity import (
+    get_current_participante, get_current_organizador,
+    get_current_participante_id, get_current_organizador_id
+)
+from authentication.tokens import ParticipanteRefreshToken
+from .alteracoes import AlteracoesCatalogo
+from .cancelamento import CancelamentoService
+from .condicional import gerar_etag, responder_condicional, ultima_modificacao
 from .email_service import EmailService
+from .estatisticas import EstatisticasEvento
 from .serializers import (
     eventoSerializer, inscricaoSerializer, eventoSerializerList,
-    InscricaoCreateSerializer, InscricaoResponseSerializer, 
-    DetalhesParticipanteSerializer, EventoPendenteSerializer, EventoStatusUpdateSerializer
+    InscricaoCreateSerializer, InscricaoResponseSerializer, ListaEsperaCreateSerializer,
+    DetalhesParticipanteSerializer, EventoPendenteSerializer, EventoStatusUpdateSerializer,
+    EventoModeracaoSerializer, EventoModeracaoLoteSerializer, ParticipanteRelatorioSerializer, aplicar_plano
 )
+from .idempotencia import idempotente
+from .lista_espera import ListaEsperaService
+from .pagination import EventoCursorPagination, InscricaoCursorPagination, ModeracaoCursorPagination
+from .painel import PainelOrganizador
+from .publico import EventoPublico
+from .pubsub import PubSub, topico_inscricao
+from .renderers import CSVRenderer, XLSXRenderer
+from .search import EventSearch
+from .status_pagamento import StatusPagamento
+from .vagas import ControleVagas
 from datetime import date
+from decimal import Decimal, InvalidOperation
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.utils.dateparse import parse_date
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from datetime import datetime
 
-def get_current_participante(request):
-    """Retorna o participante atual ou fallback para pk=1"""
-    if request.user.is_authenticated:
+def is_organizador_do_evento(request, evento_obj):
+    """Verifica se o participante atual organiza o evento, sem carregar o organizador"""
+    organizador_id = get_current_organizador_id(request)
+    return organizador_id is not None and evento_obj.organizador_id == organizador_id
+
+
+class PlanoConsultaMixin:
+    """
+    Aplica o plano de carregamento declarado no serializer da view
+    (select_related/prefetch_related, ver aplicar_plano) ao queryset usado
+    em list() e get_object(), evitando uma consulta por objeto serializado.
+    """
+
+    def filter_queryset(self, queryset):
+        return aplicar_plano(super().filter_queryset(queryset), self.get_serializer_class())
+
+
+def filtrar_catalogo(queryset, params):
+    """
+    Aplica os filtros do catálogo de eventos a partir dos query params:
+    inscricoes (abertas|fechadas), uf, cidade, data_inicio, data_fim,
+    valor_min e valor_max.
+    """
+    hoje = date.today()
+    inscricoes = params.get('inscricoes')
+    if inscricoes == 'abertas':
+        queryset = queryset.filter(dataIniInsc__lte=hoje, dataFimInsc__gte=hoje)
+    elif inscricoes == 'fechadas':
+        queryset = queryset.filter(Q(dataIniInsc__gt=hoje) | Q(dataFimInsc__lt=hoje))
+    elif inscricoes:
+        raise serializers.ValidationError({'inscricoes': 'Use "abertas" ou "fechadas".'})
+
+    uf = params.get('uf')
+    if uf:
+        queryset = queryset.filter(localidade__uf=uf.upper())
+    cidade = params.get('cidade')
+    if cidade:
+        queryset = queryset.filter(localidade__cidade=cidade)
+
+    for param, lookup in (('data_inicio', 'dataIni__gte'), ('data_fim', 'dataIni__lte')):
+        valor = params.get(param)
+        if valor:
+            try:
+                data = parse_date(valor)
+            except ValueError:
+                data = None
+            if data is None:
+                raise serializers.ValidationError({param: 'Data inválida, use o formato AAAA-MM-DD.'})
+            queryset = queryset.filter(**{lookup: data})
+
+    for param, lookup in (('valor_min', 'valorInsc__gte'), ('valor_max', 'valorInsc__lte')):
+        valor = params.get(param)
+        if valor:
+            try:
+                queryset = queryset.filter(**{lookup: Decimal(valor)})
+            except InvalidOperation:
+                raise serializers.ValidationError({param: 'Valor inválido.'})
+
+    return queryset
+
+
+class ListEventos(PlanoConsultaMixin, generics.ListAPIView):
+    """
+    Lista eventos ativos (aprovados) disponíveis para visualização.
+
+    Paginado por cursor (dataIni, id) e filtrável por período de inscrição,
+    UF/cidade, intervalo de datas e faixa de preço.
+    """
+    serializer_class = eventoSerializerList
+    permission_classes = [permissions.AllowAny]
+    pagination_class = EventoCursorPagination
+
+    def get_queryset(self):
+        queryset = evento.objects.filter(status='ativo')
+        return filtrar_catalogo(queryset, self.request.query_params)
+
+    def list(self, request, *args, **kwargs):
+        """
+        ETag/Last-Modified a partir da última alteração do catálogo
+        (alteracaoEvento) e dos filtros, sem serializar a página; 304 se
+        nada mudou. O log também registra os eventos que saem do catálogo
+        (cancelados, negados, removidos), que um max(atualizadoEm) dos
+        eventos ativos não enxerga.
+        """
+        alteracao_id, alterado_em = AlteracoesCatalogo.ultima()
+        etag = gerar_etag('eventos', alteracao_id, date.today(), request.query_params.urlencode())
+        listar = super().list
+        return responder_condicional(
+            request, lambda: listar(request, *args, **kwargs), etag, ultima_modificacao(alterado_em)
+        )
+
+
+class AlteracoesEventos(generics.GenericAPIView):
+    """
+    Sync incremental do catálogo: GET /eventos/changes/?since=<token>&limit=<n>
+
+    Retorna os eventos ativos criados ou alterados desde o token e tombstones
+    (removidos) dos que saíram do catálogo (negados, cancelados, removidos).
+    `proximo` é o token da chamada seguinte; com `tem_mais`, chame de novo
+    imediatamente. since=0 percorre o catálogo inteiro.
+
+    Tokens anteriores à compactação do log (ALTERACOES_RETENCAO_DIAS)
+    recebem 410: o cliente descarta o estado local e refaz com since=0.
+
+    Limitação: alterações só aparecem depois de ALTERACOES_MARGEM_SEGUNDOS.
+    Uma transação que confirma mais tarde que isso (contado do INSERT da
+    alteração) pode ter seu id pulado por um token já adiante; transações
+    longas que alteram eventos pedem uma margem maior.
+    """
+    serializer_class = eventoSerializerList
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
         try:
-            return participante.objects.get(user=request.user)
-        except participante.DoesNotExist:
-            return participante.objects.get(pk=1)
-    else:
-        return participante.objects.get(pk=1)
+            since = max(int(request.query_params.get('since', 0)), 0)
+            limite = min(max(int(request.query_params.get('limit', 500)), 1), 1000)
+        except ValueError:
+            return Response({'error': 'since/limit inválidos.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if AlteracoesCatalogo.token_expirado(since):
+            return Response(
+                {'error': 'Token anterior à retenção do log de alterações; refaça o sync com since=0.'},
+                status=status.HTTP_410_GONE
+            )
 
+        data = AlteracoesCatalogo.listar(since, limite, context=self.get_serializer_context())
+        return Response({'since': since, **data})
+
+
+class BuscarEventos(generics.GenericAPIView):
+    """
+    Busca textual nos eventos ativos: GET /eventos/search/?q=<termos>
 
-class ListEventos(generics.ListAPIView):
-    """Lista eventos ativos (aprovados) disponíveis para visualização"""
-    queryset = evento.objects.filter(status='ativo')
+    Resultados ordenados por relevância, com nome e trecho da descrição
+    destacados. Paginação por limit (máx. 50) e offset.
+    """
     serializer_class = eventoSerializerList
     permission_classes = [permissions.AllowAny]
 
+    def get(self, request):
+        consulta = request.query_params.get('q', '').strip()
+        if not consulta:
+            return Response({'error': 'Informe o parâmetro "q".'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limite = min(max(int(request.query_params.get('limit', 20)), 1), 50)
+            offset = max(int(request.query_params.get('offset', 0)), 0)
+        except ValueError:
+            return Response({'error': 'limit/offset inválidos.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        resultados = EventSearch.buscar(consulta, limite=limite, offset=offset)
+        eventos = evento.objects.filter(
+            pk__in=[r['id'] for r in resultados], status='ativo'
+        ).select_related('localidade').in_bulk()
+
+        data = []
+        for resultado in resultados:
+            evento_obj = eventos.get(resultado['id'])
+            if evento_obj is None:
+                continue
+            item = self.get_serializer(evento_obj).data
+            item['relevancia'] = resultado['relevancia']
+            item['destaque'] = {
+                'nome': resultado['nome_destacado'],
+                'trecho': resultado['trecho'],
+            }
+            data.append(item)
+
+        return Response({'q': consulta, 'limit': limite, 'offset': offset, 'results': data})
+
 
-class ListEventosOrganizador(generics.ListAPIView):
+class ListEventosOrganizador(PlanoConsultaMixin, generics.ListAPIView):
     """Lista eventos do organizador autenticado"""
     serializer_class = eventoSerializerList
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        current_participante = get_current_participante(self.request)
-        try:
-            organizador_obj = current_participante.organizadores
-            return evento.objects.filter(organizador=organizador_obj)
-        except organizador.DoesNotExist:
+        organizador_id = get_current_organizador_id(self.request)
+        if organizador_id is None:
             return evento.objects.none()
+        return evento.objects.filter(organizador_id=organizador_id)
+
+
+class PainelEventosOrganizador(generics.GenericAPIView):
+    """
+    Painel do organizador autenticado: GET /eventos/organizador/painel/
+
+    Inscrições, confirmadas, receita e ocupação de todos os seus eventos,
+    agregados numa consulta e mantidos em cache (ver PainelOrganizador).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        organizador_id = get_current_organizador_id(request)
+        if organizador_id is None:
+            return Response({'error': 'Usuário não é organizador.'}, status=status.HTTP_403_FORBIDDEN)
+        return Response(PainelOrganizador.obter(organizador_id))
 
 
-class DetailEvento(generics.RetrieveAPIView):
-    """Detalhes completos de um evento específico"""
+class DetailEvento(PlanoConsultaMixin, generics.RetrieveAPIView):
+    """
+    Detalhes completos de um evento específico.
+
+    A parte pública vem do cache compartilhado (EventoPublico); para
+    usuários autenticados isInscrito e isOrganizador são acrescentados
+    com uma consulta. Requisições anônimas com cache válido fazem uma única
+    leitura do cache no lugar das consultas aos modelos; com o DatabaseCache
+    padrão essa leitura é uma consulta à tabela cache_compartilhado, e só com
+    REDIS_URL o banco não é usado.
+    """
     queryset = evento.objects.all()
     serializer_class = eventoSerializer
     permission_classes = [permissions.AllowAny]
 
+    def retrieve(self, request, pk):
+        entrada = EventoPublico.entrada(pk)
+        flags = {'isInscrito': False, 'isOrganizador': False}
+        if request.user.is_authenticated:
+            flags = EventoPublico.flags(
+                [pk], get_current_participante_id(request), get_current_organizador_id(request)
+            ).get(pk, flags)
+
+        # Validadores: versão do cache (muda a cada alteração do evento, kits e categorias),
+        # dia de hoje (abertura das inscrições) e os campos pessoais
+        etag = gerar_etag('evento', pk, entrada['versao'], date.today(), flags['isInscrito'], flags['isOrganizador'])
+        return responder_condicional(
+            request, lambda: Response({**EventoPublico.montar(entrada, request), **flags}),
+            etag, ultima_modificacao(entrada.get('atualizadoEm')), vary=['Authorization']
+        )
+
+
+class FlagsEvento(generics.GenericAPIView):
+    """
+    Campos pessoais do usuário autenticado em um ou vários eventos:
+    GET /eventos/<pk>/flags/ ou GET /eventos/flags/?ids=1,2,3 (máx. 100)
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    MAXIMO_IDS = 100
+
+    def get(self, request, pk=None):
+        if pk is not None:
+            ids = [pk]
+        else:
+            try:
+                valores = request.query_params.get('ids', '').split(',')
+                ids = sorted({int(valor) for valor in valores if valor.strip()})
+            except ValueError:
+                return Response(
+                    {'error': 'ids deve ser uma lista de números separados por vírgula.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if not ids or len(ids) > self.MAXIMO_IDS:
+                return Response(
+                    {'error': f'Informe de 1 a {self.MAXIMO_IDS} ids.'}, status=status.HTTP_400_BAD_REQUEST
+                )
+
+        flags = EventoPublico.flags(ids, get_current_participante_id(request), get_current_organizador_id(request))
+        if pk is not None:
+            if pk not in flags:
+                return Response({'error': 'Evento não encontrado'}, status=status.HTTP_404_NOT_FOUND)
+            return Response({'id': pk, **flags[pk]})
+        return Response({'results': [{'id': evento_id, **flags[evento_id]} for evento_id in ids if evento_id in flags]})
 
-class ListInscricoes(generics.ListAPIView):
+
+class ListInscricoes(PlanoConsultaMixin, generics.ListAPIView):
     """
     Lista todas as inscrições realizadas no sistema.
     
@@ -66,8 +324,7 @@ class ListInscricoes(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        current_participante = get_current_participante(self.request)
-        return inscricao.objects.filter(participante=current_participante)
+        return inscricao.objects.filter(participante_id=get_current_participante_id(self.request))
 
 
 class CriarInscricao(generics.GenericAPIView):
@@ -131,8 +388,9 @@ class CriarInscricao(generics.GenericAPIView):
         
         return Response(data)
     
+    @method_decorator(idempotente)
     def post(self, request, pk):
-        """Cria inscrição no evento"""
+        """Cria inscrição no evento (aceita Idempotency-Key para repetições seguras)"""
         evento_obj = evento.objects.get(pk=pk)
         data = request.data.copy()
         
@@ -140,13 +398,27 @@ class CriarInscricao(generics.GenericAPIView):
         serializer.is_valid(raise_exception=True)
         serializer.validated_data['evento'] = evento_obj
 
-        if evento_obj.quantInscAtual >= evento_obj.limiteQuantInsc:
-            return Response(
-                {'error': 'Evento lotado. Não há mais vagas disponíveis.'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        inscricao_obj = serializer.save()
+        # A vaga é reservada com um UPDATE condicional na mesma transação da
+        # inscrição: se a criação falhar, a reserva é desfeita junto.
+        with transaction.atomic():
+            if not ControleVagas.reservar(evento_obj):
+                return Response(
+                    {
+                        'error': 'Evento lotado. Não há mais vagas disponíveis.',
+                        'lista_espera_url': f"/api/eventos/{pk}/lista-espera/",
+                    },
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            try:
+                with transaction.atomic():
+                    inscricao_obj = serializer.save()
+            except IntegrityError:
+                # Já inscrito (restrição inscricao_participante_uniq): a reserva da vaga é desfeita
+                transaction.set_rollback(True)
+                return Response(
+                    {'error': 'Você já está inscrito neste evento.'}, status=status.HTTP_400_BAD_REQUEST
+                )
+            listaEspera.objects.filter(evento=evento_obj, participante_id=inscricao_obj.participante_id).delete()
         response_serializer = InscricaoResponseSerializer(inscricao_obj)
         
         response_data = response_serializer.data
@@ -157,22 +429,80 @@ class CriarInscricao(generics.GenericAPIView):
     
     def delete(self, request, pk): 
         current_participante = get_current_participante(request)
-        inscricao_obj = inscricao.objects.get(participante=current_participante, evento__id=pk)
-        inscricao_obj.delete()
-        evento_obj = inscricao_obj.evento
-        evento_obj.quantInscAtual -= 1
-        evento_obj.save()
+        with transaction.atomic():
+            inscricao_obj = inscricao.objects.select_related('evento').get(participante=current_participante, evento__id=pk)
+            inscricao_obj.delete()
+            ControleVagas.liberar(inscricao_obj.evento)
+        ListaEsperaService.promover(pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ListaEsperaEvento(generics.GenericAPIView):
+    """GET: Posição na lista de espera. POST: Entra na lista. DELETE: Sai da lista"""
+    serializer_class = ListaEsperaCreateSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        entrada = listaEspera.objects.filter(
+            evento_id=pk, participante_id=get_current_participante_id(request)
+        ).first()
+        return Response({
+            'naLista': entrada is not None,
+            'posicao': ListaEsperaService.posicao(entrada) if entrada else None,
+            'total': listaEspera.objects.filter(evento_id=pk).count(),
+        })
+
+    def post(self, request, pk):
+        evento_obj = evento.objects.get(pk=pk)
+        participante_id = get_current_participante_id(request)
+
+        if inscricao.objects.filter(evento=evento_obj, participante_id=participante_id).exists():
+            return Response(
+                {'error': 'Você já está inscrito neste evento.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if listaEspera.objects.filter(evento=evento_obj, participante_id=participante_id).exists():
+            return Response(
+                {'error': 'Você já está na lista de espera deste evento.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if ControleVagas.ocupacao(evento_obj) < evento_obj.limiteQuantInsc:
+            return Response(
+                {'error': 'O evento ainda possui vagas. Faça sua inscrição diretamente.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = self.get_serializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        entrada = serializer.save(evento=evento_obj)
+
+        # Uma vaga pode ter sido liberada entre a verificação e a entrada na fila
+        promovidas = ListaEsperaService.promover(pk)
+        inscricao_obj = next((obj for obj in promovidas if obj.participante_id == participante_id), None)
+        if inscricao_obj is not None:
+            return Response(
+                {'naLista': False, 'payment_url': f"/gateway/payment/{inscricao_obj.id}/"},
+                status=status.HTTP_201_CREATED
+            )
+
+        return Response(
+            {'naLista': True, 'posicao': ListaEsperaService.posicao(entrada)},
+            status=status.HTTP_201_CREATED
+        )
+
+    def delete(self, request, pk):
+        listaEspera.objects.filter(evento_id=pk, participante_id=get_current_participante_id(request)).delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
            
 
-class DetalhesInscricao(generics.RetrieveAPIView):
+class DetalhesInscricao(PlanoConsultaMixin, generics.RetrieveAPIView):
     """Detalhes de uma inscrição específica"""
     queryset = inscricao.objects.all()
     serializer_class = InscricaoResponseSerializer
     permission_classes = [permissions.IsAuthenticated]
     
 
-class DetalhesParticipante(generics.ListAPIView):
+class DetalhesParticipante(PlanoConsultaMixin, generics.ListAPIView):
     """Detalhes completos do participante"""
     serializer_class = DetalhesParticipanteSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -215,16 +545,23 @@ class CriarEvento(generics.CreateAPIView):
         
         return super().get_serializer(*args, **kwargs)
     
-    def perform_create(self, serializer):
-        current_participante = get_current_participante(self.request)
+    def create(self, request, *args, **kwargs):
+        self.novo_organizador = False
+        response = super().create(request, *args, **kwargs)
+        if self.novo_organizador:
+            # As claims do token dizem "sem organizador": tokens novos já trazem o organizador_id
+            refresh = ParticipanteRefreshToken.for_user(request.user)
+            response.data['tokens'] = {'refresh': str(refresh), 'access': str(refresh.access_token)}
+        return response
 
-        try:
-            organizador_obj = current_participante.organizadores
-        except organizador.DoesNotExist:
+    def perform_create(self, serializer):
+        organizador_obj = get_current_organizador(self.request)
+        if organizador_obj is None:
             organizador_obj = organizador.objects.create(
-                participante=current_participante,
+                participante=get_current_participante(self.request),
                 valor=0.00
             )
+            self.novo_organizador = True
         
         uf = self.request.data.get('uf')
         cidade = self.request.data.get('cidade')
@@ -249,9 +586,8 @@ class GerenciarEvento(generics.GenericAPIView):
     def get(self, request, pk):
         """Retorna dados do evento para edição"""
         evento_obj = evento.objects.get(pk=pk)
-        current_participante = get_current_participante(request)
         
-        if evento_obj.organizador.participante != current_participante:
+        if not is_organizador_do_evento(request, evento_obj):
             return Response(
                 {'error': 'Você não tem permissão para editar este evento.'},
                 status=status.HTTP_403_FORBIDDEN
@@ -265,9 +601,8 @@ class GerenciarEvento(generics.GenericAPIView):
         from datetime import date
         
         evento_obj = evento.objects.get(pk=pk)
-        current_participante = get_current_participante(request)
 
-        if evento_obj.organizador.participante != current_participante:
+        if not is_organizador_do_evento(request, evento_obj):
             return Response(
                 {'error': 'Você não tem permissão para editar este evento.'},
                 status=status.HTTP_403_FORBIDDEN
@@ -279,9 +614,16 @@ class GerenciarEvento(generics.GenericAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        limite_anterior = evento_obj.limiteQuantInsc
         serializer = self.get_serializer(evento_obj, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         serializer.save()
+
+        # Limite aumentado: as novas vagas vão primeiro para a lista de espera
+        if evento_obj.limiteQuantInsc > limite_anterior:
+            if evento_obj.slotsContador:
+                ControleVagas.compactar(evento_obj.pk)
+            ListaEsperaService.promover(evento_obj.pk)
         
         return Response(serializer.data, status=status.HTTP_200_OK)
         
@@ -290,7 +632,12 @@ class GerenciarEvento(generics.GenericAPIView):
         from datetime import date
         
         evento_obj = evento.objects.get(pk=pk)
-        current_participante = get_current_participante(request)
+
+        if not (request.user.is_staff or is_organizador_do_evento(request, evento_obj)):
+            return Response(
+                {'error': 'Você não tem permissão para cancelar este evento.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
         
         if evento_obj.dataFim < date.today():
             return Response(
@@ -298,11 +645,15 @@ class GerenciarEvento(generics.GenericAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        evento_obj.status = 'cancelado'
-        evento_obj.save()
-        
-        inscricoes_evento = inscricao.objects.filter(evento=evento_obj)
-        inscricoes_evento.update(status='cancelado')
+        # O aviso aos inscritos é agendado na mesma transação e enviado pelo comando notifica_cancelamentos
+        with transaction.atomic():
+            evento_obj.status = 'cancelado'
+            evento_obj.save()
+            
+            inscricoes_evento = inscricao.objects.filter(evento=evento_obj)
+            inscricoes_evento.update(status='cancelado')
+            EstatisticasEvento.cancelar_evento(evento_obj.pk)
+            CancelamentoService.registrar(evento_obj)
         
         return Response({'message': 'Evento cancelado com sucesso.'}, status=status.HTTP_200_OK)
 
@@ -310,26 +661,42 @@ class GerarRelatorio(generics.GenericAPIView):
     """
     Classe para geração de relatórios do sistema
     GET /eventos/<event_id>/report/: Gera relatório de um evento específico
+    GET /eventos/<event_id>/report/?type=participants&format=csv|xlsx: exporta os participantes em fluxo
     """
     permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [CSVRenderer, XLSXRenderer]
     
     def get(self, request, event_id):
         """Gera relatório detalhado de um evento específico"""
         try:
             event = evento.objects.get(id=event_id)
-            current_participante = get_current_participante(request)
 
-            if event.organizador.participante != current_participante:
+            if not is_organizador_do_evento(request, event):
                 return Response(
                     {'error': 'Você não tem permissão para gerar relatórios deste evento.'},
                     status=status.HTTP_403_FORBIDDEN
                 )
                 
-            from .reports import EventReports
+            from .reports import EventReports, PARTICIPANTES_COLUNAS
             report_type = request.query_params.get('type', 'summary')
+
+            renderer = request.accepted_renderer
+            if isinstance(renderer, (CSVRenderer, XLSXRenderer)):
+                if report_type != 'participants':
+                    return Response({'error': 'Exportação disponível apenas para o relatório de participantes'}, status=400)
+                # Linhas lidas em blocos e enviadas à medida que são geradas: memória constante
+                response = StreamingHttpResponse(
+                    renderer.gerar(PARTICIPANTES_COLUNAS, EventReports.participant_rows(event.pk)),
+                    content_type=renderer.media_type,
+                )
+                response['Content-Disposition'] = f'attachment; filename="participantes-evento-{event.pk}.{renderer.format}"'
+                return response
             
             if report_type == 'summary':
-                report = EventReports.get_event_summary(event_id)
+                granularidade = request.query_params.get('granularidade', 'dia')
+                if granularidade not in ('dia', 'hora'):
+                    return Response({'error': 'Granularidade inválida, use "dia" ou "hora"'}, status=400)
+                report = EventReports.get_event_summary(event_id, granularidade=granularidade)
             elif report_type == 'participants':
                 report = EventReports.get_participant_report(event_id)
             else:
@@ -344,6 +711,75 @@ class GerarRelatorio(generics.GenericAPIView):
             return Response({'error': 'Evento não encontrado'}, status=404)
 
 
+def filtros_participantes(params):
+    """Valida os filtros do relatório de participantes: status, kit, categoria e q (busca)"""
+    status_insc = params.get('status') or None
+    if status_insc is not None and status_insc not in dict(inscricao._meta.get_field('status').choices):
+        raise serializers.ValidationError({'status': 'Status inválido.'})
+
+    filtros = {'status': status_insc, 'q': params.get('q', '').strip()}
+    for param in ('kit', 'categoria'):
+        valor = params.get(param)
+        try:
+            filtros[param] = int(valor) if valor else None
+        except ValueError:
+            raise serializers.ValidationError({param: 'Informe o id numérico.'})
+    return filtros
+
+
+class RelatorioParticipantes(generics.ListAPIView):
+    """
+    Relatório de participantes paginado: GET /eventos/<event_id>/report/participants/
+
+    Paginado por cursor e ordenável por id ou nome (?ordering=nome|-nome|id|-id).
+    Filtros status, kit e categoria e busca por prefixo de nome ou email (?q=).
+    total e total_filtrado vêm do rollup estatisticaEvento, sem COUNT nas inscrições.
+    """
+    serializer_class = ParticipanteRelatorioSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = InscricaoCursorPagination
+    filter_backends = [OrderingFilter]
+    ordering_fields = ['id', 'nome']
+    ordering = 'id'
+
+    def get_queryset(self):
+        from .reports import EventReports
+        queryset = EventReports.participant_queryset(self.kwargs['event_id'])
+        if self.filtros['status']:
+            queryset = queryset.filter(status=self.filtros['status'])
+        if self.filtros['kit']:
+            queryset = queryset.filter(kit_id=self.filtros['kit'])
+        if self.filtros['categoria']:
+            queryset = queryset.filter(categoria_id=self.filtros['categoria'])
+        if self.filtros['q']:
+            # Prefixo (istartswith) usa os índices de nome/email do participante
+            queryset = queryset.filter(
+                Q(participante__nome__istartswith=self.filtros['q']) |
+                Q(participante__email__istartswith=self.filtros['q'])
+            )
+        return queryset
+
+    def list(self, request, event_id):
+        from .reports import EventReports
+        event = evento.objects.filter(pk=event_id).first()
+        if event is None:
+            return Response({'error': 'Evento não encontrado'}, status=404)
+        if not is_organizador_do_evento(request, event):
+            return Response(
+                {'error': 'Você não tem permissão para gerar relatórios deste evento.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        self.filtros = filtros_participantes(request.query_params)
+        response = super().list(request, event_id)
+        total, total_filtrado = EventReports.participant_totals(
+            event.pk, status=self.filtros['status'], kit_id=self.filtros['kit'], categoria_id=self.filtros['categoria']
+        )
+        response.data['total'] = total
+        response.data['total_filtrado'] = None if self.filtros['q'] else total_filtrado
+        return response
+
+
 class GerenciarEventosPendentesAdmin(generics.GenericAPIView):
     """GET: Lista eventos pendentes ou detalhes de um evento específico. PATCH: Atualiza status do evento (apenas admins)"""
     serializer_class = EventoPendenteSerializer
@@ -352,7 +788,7 @@ class GerenciarEventosPendentesAdmin(generics.GenericAPIView):
     
     def get(self, request, pk=None):
         if pk:
-            evento_obj = evento.objects.get(pk=pk)
+            evento_obj = evento.objects.select_related('organizador__participante', 'localidade').get(pk=pk)
             serializer = self.get_serializer(evento_obj)
             data = serializer.data
             
@@ -361,7 +797,9 @@ class GerenciarEventosPendentesAdmin(generics.GenericAPIView):
             data['localidade_uf'] = evento_obj.localidade.uf
             return Response(data)
         else:
-            eventos_pendentes = evento.objects.filter(status='pendente')
+            eventos_pendentes = evento.objects.filter(status='pendente').select_related(
+                'organizador__participante', 'localidade'
+            )
             serializer = self.get_serializer(eventos_pendentes, many=True)
             data = serializer.data
             
@@ -423,19 +861,20 @@ class GerenciarEventosPendentesAdmin(generics.GenericAPIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            evento_obj.status = novo_status
-            evento_obj.save()
-            
-            email_enviado = False
-            if novo_status == 'ativo':
-                email_enviado = EmailService.enviar_email_aprovacao(evento_obj)
-            elif novo_status == 'negado':
-                email_enviado = EmailService.enviar_email_negacao(evento_obj, feedback_admin)
+            # O email entra no outbox na mesma transação da mudança de status
+            with transaction.atomic():
+                evento_obj.status = novo_status
+                evento_obj.save()
+
+                if novo_status == 'ativo':
+                    EmailService.enviar_email_aprovacao(evento_obj)
+                elif novo_status == 'negado':
+                    EmailService.enviar_email_negacao(evento_obj, feedback_admin)
             
             serializer = EventoStatusUpdateSerializer(evento_obj)
             response_data = serializer.data
             response_data['message'] = f'Evento {"aprovado" if novo_status == "ativo" else "negado"} com sucesso!'
-            response_data['email_enviado'] = email_enviado
+            response_data['email_enfileirado'] = True
             
             if novo_status == 'negado':
                 response_data['feedback_enviado'] = feedback_admin
@@ -454,6 +893,94 @@ class GerenciarEventosPendentesAdmin(generics.GenericAPIView):
             )
 
 
+class FilaModeracaoEventos(PlanoConsultaMixin, generics.ListAPIView):
+    """
+    Fila de moderação: GET /eventos/pendentes/fila/
+
+    Eventos pendentes em formato compacto (sem descrição), paginados por
+    cursor e ordenados pelo envio, do mais antigo ao mais novo
+    (?ordering=-criadoEm para os mais novos primeiro). Apenas admins.
+    """
+    serializer_class = EventoModeracaoSerializer
+    permission_classes = [permissions.IsAdminUser]
+    pagination_class = ModeracaoCursorPagination
+    filter_backends = [OrderingFilter]
+    ordering_fields = ['criadoEm', 'id']
+    ordering = ('criadoEm', 'id')
+
+    def get_queryset(self):
+        return evento.objects.filter(status='pendente')
+
+
+class ModerarEventosLote(generics.GenericAPIView):
+    """
+    Aprova ou nega vários eventos pendentes: POST /eventos/pendentes/lote/
+    {"ids": [...], "status": "ativo"|"negado", "feedback_admin": "...", "confirmacao": true}
+
+    O status muda com um único UPDATE e os emails entram no outbox na mesma
+    transação. Eventos que não estão mais pendentes são ignorados. Apenas admins.
+    """
+    serializer_class = EventoModeracaoLoteSerializer
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        novo_status = serializer.validated_data['status']
+        feedback_admin = serializer.validated_data['feedback_admin']
+
+        if not serializer.validated_data['confirmacao']:
+            quantidade = evento.objects.filter(pk__in=ids, status='pendente').count()
+            message = f'Tem certeza que deseja {"aprovar" if novo_status == "ativo" else "negar"} {quantidade} evento(s)?'
+            if novo_status == 'negado':
+                message += f'\n\nFeedback que será enviado: "{feedback_admin}"'
+            return Response(
+                {
+                    'error': 'Confirmação necessária',
+                    'message': message,
+                    'quantidade': quantidade,
+                    'status_novo': novo_status,
+                    'requires_confirmation': True
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with transaction.atomic():
+            # Trava as linhas: um evento moderado em paralelo não recebe dois emails
+            eventos = list(
+                evento.objects.select_for_update(of=('self',))
+                .select_related('organizador__participante', 'localidade')
+                .filter(pk__in=ids, status='pendente')
+                .order_by('id')
+            )
+            atualizados = [evento_obj.pk for evento_obj in eventos]
+            evento.objects.filter(pk__in=atualizados).update(status=novo_status, atualizadoEm=timezone.now())
+            for evento_obj in eventos:
+                evento_obj.status = novo_status
+            EmailService.enviar_emails_moderacao(eventos, novo_status, feedback_admin)
+
+            # QuerySet.update não dispara post_save: índice de busca, cache, painel e log do catálogo atualizados aqui
+            if novo_status == 'ativo':
+                AlteracoesCatalogo.registrar(atualizados)
+            for evento_obj in eventos:
+                EventSearch.indexar(evento_obj)
+                EventoPublico.invalidar(evento_obj.pk)
+            for organizador_id in {evento_obj.organizador_id for evento_obj in eventos}:
+                PainelOrganizador.invalidar_organizador(organizador_id)
+
+        response_data = {
+            'message': f'{len(atualizados)} evento(s) {"aprovado(s)" if novo_status == "ativo" else "negado(s)"} com sucesso!',
+            'status': novo_status,
+            'atualizados': atualizados,
+            'ignorados': sorted(set(ids) - set(atualizados)),
+            'emails_enfileirados': len(atualizados),
+        }
+        if novo_status == 'negado':
+            response_data['feedback_enviado'] = feedback_admin
+        return Response(response_data, status=status.HTTP_200_OK)
+
+
 class PaymentStatus(generics.GenericAPIView):
     """
     Verifica o status do pagamento de uma inscrição
@@ -463,47 +990,120 @@ class PaymentStatus(generics.GenericAPIView):
     def get(self, request, inscricao_id):
         """Retorna o status do pagamento da inscrição"""
         try:
-            from inscricoes.models import inscricao, pagamento
-            
-            inscricao_obj = inscricao.objects.get(id=inscricao_id)
-            current_participante = get_current_participante(request)
-            
-            if inscricao_obj.participante != current_participante:
-                return Response(
-                    {'error': 'Você não tem permissão para visualizar esta inscrição.'},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-            
-            try:
-                pagamento_obj = pagamento.objects.get(inscricao=inscricao_obj)
-                payment_date = pagamento_obj.dataPagamento
-                if hasattr(payment_date, 'date'):
-                    payment_date = payment_date.date()
-                
-                payment_data = {
-                    'has_payment': True,
-                    'payment_status': pagamento_obj.status,
-                    'payment_method': pagamento_obj.metodoPagamento,
-                    'payment_amount': str(pagamento_obj.valor),
-                    'payment_date': payment_date.strftime('%d/%m/%Y'),
-                    'inscription_status': inscricao_obj.status,
-                }
-            except pagamento.DoesNotExist:
-                payment_data = {
-                    'has_payment': False,
-                    'payment_status': 'pendente',
-                    'inscription_status': inscricao_obj.status,
-                    'payment_url': f"/gateway/payment/{inscricao_obj.id}/",
-                }
-            
-            return Response(payment_data)
-            
+            inscricao_obj = StatusPagamento.carregar(inscricao_id)
         except inscricao.DoesNotExist:
             return Response(
                 {'error': 'Inscrição não encontrada'}, 
                 status=status.HTTP_404_NOT_FOUND
             )
 
+        if inscricao_obj.participante_id != get_current_participante_id(request):
+            return Response(
+                {'error': 'Você não tem permissão para visualizar esta inscrição.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        return Response(StatusPagamento.montar(inscricao_obj))
+
+
+# Duração máxima de uma conexão SSE (o cliente reconecta) e intervalo dos comentários de keep-alive
+STREAM_DURACAO = 300
+STREAM_KEEPALIVE = 15
+# Tempo máximo que o long-poll segura a requisição sem mudança de status
+LONG_POLL_TIMEOUT = 25
+
+
+def _sse(payment_data):
+    return f"event: status\ndata: {json.dumps(payment_data)}\n\n"
+
+
+def _status_autorizado(request, inscricao_id):
+    """Autentica o JWT e retorna (status HTTP, payload) do status de pagamento"""
+    from rest_framework.exceptions import AuthenticationFailed
+    from authentication.backends import ClaimsJWTAuthentication
+
+    try:
+        autenticacao = ClaimsJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        autenticacao = None
+    if autenticacao is None:
+        return 401, {'detail': 'As credenciais de autenticação não foram fornecidas.'}
+    request.user = autenticacao[0]
+
+    try:
+        inscricao_obj = StatusPagamento.carregar(inscricao_id)
+    except inscricao.DoesNotExist:
+        return 404, {'error': 'Inscrição não encontrada'}
+    if inscricao_obj.participante_id != get_current_participante_id(request):
+        return 403, {'error': 'Você não tem permissão para visualizar esta inscrição.'}
+    return 200, StatusPagamento.montar(inscricao_obj)
+
+
+async def payment_status_stream(request, inscricao_id):
+    """
+    Acompanha o status do pagamento com uma única conexão.
+
+    Sob ASGI responde em Server-Sent Events: envia o status atual e um
+    evento a cada mudança até o pagamento ser aprovado. Sob WSGI faz
+    long-poll: responde assim que o status for diferente de ?estado= (ou
+    após LONG_POLL_TIMEOUT segundos) e o cliente refaz a requisição.
+
+    O PubSub só acorda a conexão quando a mudança acontece neste processo;
+    a cada STREAM_KEEPALIVE segundos sem mensagem o status é relido do
+    banco, o que cobre pagamentos concluídos por outros workers.
+    """
+    assinatura = PubSub.assinar(topico_inscricao(inscricao_id), asyncio.get_running_loop())
+    # A assinatura vem antes da leitura do estado para não perder mudanças no intervalo
+    codigo, payment_data = await sync_to_async(_status_autorizado)(request, inscricao_id)
+    if codigo != 200:
+        PubSub.cancelar(assinatura)
+        return JsonResponse(payment_data, status=codigo)
+
+    async def proximo_status(timeout):
+        """(mensagem publicada ou status relido do banco, se veio do banco)"""
+        mensagem = await assinatura.aguardar_async(timeout)
+        if mensagem is not None:
+            return mensagem, False
+        return await sync_to_async(StatusPagamento.atual)(inscricao_id), True
+
+    if not isinstance(request, ASGIRequest):
+        try:
+            estado_cliente = request.GET.get('estado')
+            limite = time.monotonic() + LONG_POLL_TIMEOUT
+            while estado_cliente == payment_data['estado'] and not StatusPagamento.finalizado(payment_data):
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                mensagem, _ = await proximo_status(min(STREAM_KEEPALIVE, restante))
+                if mensagem is None:
+                    break
+                payment_data = mensagem
+        finally:
+            PubSub.cancelar(assinatura)
+        return JsonResponse(payment_data)
+
+    async def eventos():
+        try:
+            ultimo = payment_data
+            yield _sse(ultimo)
+            limite = time.monotonic() + STREAM_DURACAO
+            while not StatusPagamento.finalizado(ultimo) and time.monotonic() < limite:
+                mensagem, relido = await proximo_status(STREAM_KEEPALIVE)
+                if mensagem is None:
+                    break
+                if mensagem['estado'] != ultimo['estado']:
+                    ultimo = mensagem
+                    yield _sse(ultimo)
+                elif relido:
+                    yield ': keep-alive\n\n'
+        finally:
+            PubSub.cancelar(assinatura)
+
+    response = StreamingHttpResponse(eventos(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 
 
 
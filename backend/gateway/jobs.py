@@ -0,0 +1,135 @@
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from inscricoes.models import pagamento
+
+logger = logging.getLogger(__name__)
+
+# Tempo (s) simulado de compensação de cada método de pagamento
+PROCESSING_DELAYS = {
+    'pix': 1,
+    'cartao': 3,
+    'boleto': 2,
+}
+
+# Probabilidade de aprovação do gateway simulado
+TAXA_APROVACAO = 0.95
+
+
+class ProcessadorPagamentos:
+    """
+    Fila local de processamento dos pagamentos simulados.
+
+    A espera do gateway não ocupa threads: uma única thread agendadora
+    mantém um heap ordenado pelo horário de conclusão de cada pagamento e
+    entrega os vencidos a um pool pequeno, que só faz o trabalho de banco.
+    O estado de cada job é o próprio pagamento (status 'processando' e
+    processandoDesde); o heap é só a agenda deste processo. Jobs perdidos
+    num restart do worker ficam parados em 'processando' e são concluídos
+    por recuperar_parados(), chamado pelo varredor de reservas.
+    """
+
+    _lock = threading.Condition()
+    _agenda = []
+    _sequencia = itertools.count()
+    _agendador = None
+    _pool = None
+
+    @classmethod
+    def enfileirar(cls, pagamento_id, metodo_pagamento):
+        """Agenda a conclusão do pagamento após o atraso simulado do método"""
+        execucao = time.monotonic() + PROCESSING_DELAYS.get(metodo_pagamento, 2)
+        with cls._lock:
+            cls._iniciar()
+            heapq.heappush(cls._agenda, (execucao, next(cls._sequencia), pagamento_id))
+            cls._lock.notify()
+
+    @staticmethod
+    def processar(pagamento_id):
+        """Conclui o pagamento: aprova (confirmando a inscrição) ou marca como falho"""
+        pagamento_obj = (
+            pagamento.objects.select_for_update().select_related('inscricao', 'inscricao__evento', 'inscricao__kit')
+            .filter(pk=pagamento_id, status='processando').first()
+        )
+        if pagamento_obj is None:
+            # Inscrição removida ou pagamento já concluído
+            return None
+
+        if random.random() < TAXA_APROVACAO:
+            pagamento_obj.status = 'pago'
+            inscricao_obj = pagamento_obj.inscricao
+            # Confirmada não expira mais
+            inscricao_obj.status = 'confirmada'
+            inscricao_obj.expiraEm = None
+            inscricao_obj.save()
+        else:
+            pagamento_obj.status = 'falhou'
+        pagamento_obj.save()
+        return pagamento_obj.status
+
+    @staticmethod
+    def parados():
+        """Pagamentos em 'processando' há mais de GATEWAY_JOB_TIMEOUT_SEGUNDOS (job perdido)"""
+        limite = timezone.now() - timedelta(seconds=settings.GATEWAY_JOB_TIMEOUT_SEGUNDOS)
+        return pagamento.objects.filter(
+            Q(processandoDesde__lte=limite) | Q(processandoDesde__isnull=True), status='processando'
+        )
+
+    @classmethod
+    def recuperar_parados(cls, lote=100):
+        """
+        Conclui no processo atual os jobs parados (o atraso simulado já passou).
+        Cada pagamento é travado em processar(): um job que conclua ao mesmo
+        tempo não é aplicado duas vezes. Retorna quantos foram concluídos.
+        """
+        concluidos = 0
+        for pagamento_id in list(cls.parados().order_by('id').values_list('id', flat=True)[:lote]):
+            try:
+                with transaction.atomic():
+                    if cls.processar(pagamento_id) is not None:
+                        concluidos += 1
+            except Exception:
+                logger.exception('Erro ao recuperar o pagamento %s', pagamento_id)
+        if concluidos:
+            logger.warning('%s pagamentos parados em processamento foram concluídos', concluidos)
+        return concluidos
+
+    @classmethod
+    def _iniciar(cls):
+        if cls._agendador is not None and cls._agendador.is_alive():
+            return
+        cls._pool = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'GATEWAY_WORKERS', 4), thread_name_prefix='gateway-pagamento'
+        )
+        cls._agendador = threading.Thread(target=cls._agendar, name='gateway-agendador', daemon=True)
+        cls._agendador.start()
+
+    @classmethod
+    def _agendar(cls):
+        while True:
+            with cls._lock:
+                while not cls._agenda or cls._agenda[0][0] > time.monotonic():
+                    espera = cls._agenda[0][0] - time.monotonic() if cls._agenda else None
+                    cls._lock.wait(espera)
+                _, _, pagamento_id = heapq.heappop(cls._agenda)
+            cls._pool.submit(cls._executar, pagamento_id)
+
+    @classmethod
+    def _executar(cls, pagamento_id):
+        close_old_connections()
+        try:
+            with transaction.atomic():
+                cls.processar(pagamento_id)
+        except Exception:
+            logger.exception('Erro ao processar o pagamento %s', pagamento_id)
+        finally:
+            close_old_connections()
@@ -2,12 +2,14 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
+from django.db import transaction
+from django.utils import timezone
 from inscricoes.models import inscricao, pagamento
 from evento.models import evento
+from evento.idempotencia import idempotente
+from .jobs import PROCESSING_DELAYS, ProcessadorPagamentos
 import json
 from decimal import Decimal
-import time
-import random
 
 
 def gateway_payment(request, inscricao_id):
@@ -43,72 +45,108 @@ def gateway_payment(request, inscricao_id):
 
 @csrf_exempt
 @require_http_methods(["POST"])
+@idempotente
 def process_payment(request, inscricao_id):
     """
-    Processa o pagamento simulado
+    Enfileira o pagamento simulado e responde 202 com o id do job
+    (aceita Idempotency-Key para repetições seguras).
+    O resultado é consultado em payment_job_status ou em /api/payment/status/.
     """
     try:
-        inscricao_obj = get_object_or_404(inscricao, id=inscricao_id)
-        
-        # Pega os dados do formulário
         data = json.loads(request.body)
         metodo_pagamento = data.get('metodo_pagamento')
-        
-        # Simula processamento (pode adicionar delay baseado no método)
-        processing_delays = {
-            'pix': 1,
-            'cartao': 3,
-            'boleto': 2
-        }
-        
-        time.sleep(processing_delays.get(metodo_pagamento, 2))
-        
-        # Simula sucesso/falha (95% de sucesso)
-        if random.random() < 0.95:
+        if metodo_pagamento not in PROCESSING_DELAYS:
+            return JsonResponse({
+                'success': False,
+                'message': 'Método de pagamento inválido.',
+            }, status=400)
+
+        with transaction.atomic():
+            inscricao_obj = get_object_or_404(
+                inscricao.objects.select_for_update().select_related('evento', 'kit'), id=inscricao_id
+            )
+
+            if inscricao_obj.status == 'confirmada':
+                return JsonResponse({
+                    'success': True,
+                    'message': 'Pagamento já confirmado.',
+                    'redirect_url': f'/gateway/success/{inscricao_id}/'
+                })
+
             # Calcula valor total
             valor_base = inscricao_obj.evento.valorInsc
             valor_kit = inscricao_obj.kit.precoExtra if inscricao_obj.kit and inscricao_obj.kit.precoExtra else Decimal('0.00')
             valor_total = valor_base + valor_kit
-            
-            # Cria ou atualiza o pagamento
+
+            # O pagamento em 'processando' é o registro do job
             pagamento_obj, created = pagamento.objects.get_or_create(
                 inscricao=inscricao_obj,
                 defaults={
-                    'status': 'pago',
+                    'status': 'processando',
                     'valor': valor_total,
-                    'metodoPagamento': metodo_pagamento
+                    'metodoPagamento': metodo_pagamento,
+                    'processandoDesde': timezone.now(),
                 }
             )
-            
-            if not created:
-                pagamento_obj.status = 'pago'
+
+            if not created and pagamento_obj.status != 'processando':
+                pagamento_obj.status = 'processando'
                 pagamento_obj.valor = valor_total
                 pagamento_obj.metodoPagamento = metodo_pagamento
+                pagamento_obj.processandoDesde = timezone.now()
                 pagamento_obj.save()
-            
-            # Atualiza status da inscrição
-            inscricao_obj.status = 'confirmada'
-            inscricao_obj.save()
-            
-            return JsonResponse({
-                'success': True,
-                'message': 'Pagamento processado com sucesso!',
-                'redirect_url': f'/gateway/success/{inscricao_id}/'
-            })
-        else:
-            # Simula falha no pagamento
-            return JsonResponse({
-                'success': False,
-                'message': 'Falha no processamento do pagamento. Tente novamente.',
-                'redirect_url': f'/gateway/error/{inscricao_id}/'
-            })
-            
-    except Exception as e:
+
+            # Reenfileirar um job já em andamento é seguro: só o primeiro a concluir altera o pagamento
+            transaction.on_commit(
+                lambda: ProcessadorPagamentos.enfileirar(pagamento_obj.id, pagamento_obj.metodoPagamento)
+            )
+
+        return JsonResponse({
+            'success': None,
+            'job_id': str(pagamento_obj.jobId),
+            'status': 'processando',
+            'message': 'Pagamento em processamento.',
+            'status_url': f'/gateway/status/{pagamento_obj.jobId}/',
+        }, status=202)
+
+    except (json.JSONDecodeError, AttributeError):
         return JsonResponse({
             'success': False,
-            'message': f'Erro interno: {str(e)}',
-            'redirect_url': f'/gateway/error/{inscricao_id}/'
+            'message': 'Dados de pagamento inválidos.',
+        }, status=400)
+
+
+@require_http_methods(["GET"])
+def payment_job_status(request, job_id):
+    """
+    Status de um job de pagamento: success é None enquanto processa.
+    O job é identificado pelo jobId (UUID), não pelo id sequencial do pagamento.
+    """
+    pagamento_obj = get_object_or_404(pagamento.objects.only('jobId', 'status', 'inscricao_id'), jobId=job_id)
+    inscricao_id = pagamento_obj.inscricao_id
+
+    if pagamento_obj.status == 'processando':
+        return JsonResponse({
+            'success': None,
+            'job_id': str(pagamento_obj.jobId),
+            'status': 'processando',
+            'message': 'Pagamento em processamento.',
+        })
+    if pagamento_obj.status == 'pago':
+        return JsonResponse({
+            'success': True,
+            'job_id': str(pagamento_obj.jobId),
+            'status': 'pago',
+            'message': 'Pagamento processado com sucesso!',
+            'redirect_url': f'/gateway/success/{inscricao_id}/'
         })
+    return JsonResponse({
+        'success': False,
+        'job_id': str(pagamento_obj.jobId),
+        'status': pagamento_obj.status,
+        'message': 'Falha no processamento do pagamento. Tente novamente.',
+        'redirect_url': f'/gateway/error/{inscricao_id}/'
+    })
 
 
 def payment_success(request, inscricao_id):
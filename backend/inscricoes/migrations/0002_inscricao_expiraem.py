@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evento', '0013_contador_distribuido'),
+        ('inscricoes', '0001_initial'),
+        ('usuarios', '0002_participante_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inscricao',
+            name='expiraEm',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='inscricao',
+            index=models.Index(fields=['status', 'expiraEm'], name='inscricao_status_expira_idx'),
+        ),
+    ]
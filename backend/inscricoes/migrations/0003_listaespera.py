@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evento', '0013_contador_distribuido'),
+        ('inscricoes', '0002_inscricao_expiraem'),
+        ('usuarios', '0002_participante_user'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='listaEspera',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dataEntrada', models.DateTimeField(auto_now_add=True)),
+                ('categoria', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='listaEspera', to='evento.categoria')),
+                ('evento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='listaEspera', to='evento.evento')),
+                ('kit', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='listaEspera', to='evento.kit')),
+                ('participante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='listasEspera', to='usuarios.participante')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['evento', 'id'], name='listaespera_evento_posicao_idx')],
+                'constraints': [models.UniqueConstraint(fields=('evento', 'participante'), name='listaespera_evento_participante_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inscricoes', '0003_listaespera'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pagamento',
+            name='status',
+            field=models.CharField(choices=[('pendente', 'Pendente'), ('processando', 'Processando'), ('pago', 'Pago'), ('falhou', 'Falhou')], default='pendente', max_length=12),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evento', '0017_estatisticaevento'),
+        ('inscricoes', '0004_pagamento_processando'),
+        ('usuarios', '0002_participante_user'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inscricao',
+            index=models.Index(fields=['evento', 'status', 'id'], name='inscricao_evento_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inscricao',
+            index=models.Index(fields=['evento', 'id'], name='inscricao_evento_id_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+from datetime import datetime, time
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def copiar_data_inscricao(apps, schema_editor):
+    """criadoEm das inscrições existentes: meia-noite de dataInsc (a melhor informação disponível)"""
+    inscricao = apps.get_model('inscricoes', 'inscricao')
+    datas = inscricao.objects.order_by().values_list('dataInsc', flat=True).distinct()
+    for data in list(datas):
+        inscricao.objects.filter(dataInsc=data).update(
+            criadoEm=django.utils.timezone.make_aware(datetime.combine(data, time.min))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inscricoes', '0005_inscricao_relatorio_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inscricao',
+            name='criadoEm',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copiar_data_inscricao, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='inscricao',
+            index=models.Index(fields=['evento', 'criadoEm'], name='inscricao_evento_criado_idx'),
+        ),
+    ]
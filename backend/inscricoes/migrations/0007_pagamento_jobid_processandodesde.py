@@ -0,0 +1,36 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:12
+
+import uuid
+from django.db import migrations, models
+
+
+def gerar_job_ids(apps, schema_editor):
+    pagamento = apps.get_model('inscricoes', 'pagamento')
+    for pagamento_id in pagamento.objects.values_list('id', flat=True).iterator():
+        pagamento.objects.filter(pk=pagamento_id).update(jobId=uuid.uuid4())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inscricoes', '0006_inscricao_criadoem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pagamento',
+            name='jobId',
+            field=models.UUIDField(editable=False, null=True),
+        ),
+        migrations.RunPython(gerar_job_ids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='pagamento',
+            name='jobId',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+        migrations.AddField(
+            model_name='pagamento',
+            name='processandoDesde',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evento', '0022_compactacaoalteracoes'),
+        ('inscricoes', '0007_pagamento_jobid_processandodesde'),
+        ('usuarios', '0003_participante_busca_prefixo'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='inscricao',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'cancelado'), _negated=True), fields=('evento', 'participante'), name='inscricao_participante_uniq'),
+        ),
+    ]
@@ -1,3 +1,4 @@
+import uuid
 from django.db import models
 
 class MC:
@@ -8,7 +9,9 @@ class MC:
     )
     pagamento_status = (
         ('pendente', 'Pendente'),
-        ('pago','Pago')
+        ('processando', 'Processando'),
+        ('pago','Pago'),
+        ('falhou', 'Falhou')
     )
     inscricao_status = (
         ('pendente', 'Pendente'),
@@ -18,15 +21,57 @@ class MC:
 
 class inscricao(models.Model):
     dataInsc = models.DateField(auto_now=True)
+    # Momento da inscrição; ao contrário de dataInsc, não muda a cada save
+    criadoEm = models.DateTimeField(auto_now_add=True)
     status = models.CharField(choices=MC().inscricao_status, default='pendente')
     evento = models.ForeignKey('evento.evento', on_delete=models.CASCADE, related_name='inscricoes')
     participante = models.ForeignKey('usuarios.participante', on_delete=models.CASCADE, related_name='inscricoes', null=True)
     kit = models.ForeignKey('evento.kit', on_delete=models.CASCADE, related_name='inscricoes', null=True)
     categoria = models.ForeignKey('evento.categoria', on_delete=models.CASCADE, related_name='inscricoes', null=True)
+    # Fim da reserva da vaga enquanto a inscrição aguarda pagamento (None = sem expiração)
+    expiraEm = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'expiraEm'], name='inscricao_status_expira_idx'),
+            # Relatório de participantes: filtro por status e paginação por id dentro do evento
+            models.Index(fields=['evento', 'status', 'id'], name='inscricao_evento_status_idx'),
+            models.Index(fields=['evento', 'id'], name='inscricao_evento_id_idx'),
+            # Séries de inscrições por hora/dia (relatórios)
+            models.Index(fields=['evento', 'criadoEm'], name='inscricao_evento_criado_idx'),
+        ]
+        constraints = [
+            # Uma inscrição não cancelada por participante e evento: barra a duplicata de
+            # promoções concorrentes da lista de espera e de inscrições repetidas
+            models.UniqueConstraint(
+                fields=['evento', 'participante'], condition=~models.Q(status='cancelado'),
+                name='inscricao_participante_uniq'
+            ),
+        ]
     
 class pagamento(models.Model):
-    status = models.CharField(choices=MC().pagamento_status, max_length=10, default='pendente')
+    status = models.CharField(choices=MC().pagamento_status, max_length=12, default='pendente')
     valor = models.DecimalField(max_digits=10, decimal_places=2, blank=False, null=False, default=0)
     metodoPagamento = models.CharField(choices=MC().metodo_pagamento, max_length=20, null=False, blank=False)
     dataPagamento = models.DateField(auto_now=True)
     inscricao = models.OneToOneField(inscricao, on_delete=models.CASCADE, related_name='pagamentos')
+    # Id público do job no gateway (não sequencial: /gateway/status/<jobId>/ não pode ser enumerado)
+    jobId = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    # Início do processamento atual; jobs parados há mais de GATEWAY_JOB_TIMEOUT_SEGUNDOS são retomados
+    processandoDesde = models.DateTimeField(null=True, blank=True)
+
+class listaEspera(models.Model):
+    """Fila FIFO por evento; a posição é dada pela ordem do id dentro do evento"""
+    evento = models.ForeignKey('evento.evento', on_delete=models.CASCADE, related_name='listaEspera')
+    participante = models.ForeignKey('usuarios.participante', on_delete=models.CASCADE, related_name='listasEspera')
+    kit = models.ForeignKey('evento.kit', on_delete=models.CASCADE, related_name='listaEspera', null=True)
+    categoria = models.ForeignKey('evento.categoria', on_delete=models.CASCADE, related_name='listaEspera', null=True)
+    dataEntrada = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['evento', 'participante'], name='listaespera_evento_participante_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['evento', 'id'], name='listaespera_evento_posicao_idx'),
+        ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('localidades', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='localidade',
+            name='atualizadoEm',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
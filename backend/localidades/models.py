@@ -3,3 +3,5 @@ from django.db import models
 class localidade(models.Model):
     cidade = models.CharField(max_length=100, blank=False, null=False)
     uf = models.CharField(max_length=2, blank=False, null=False)
+    # Entra no ETag das listas de estados/cidades: uma edição (admin, shell) muda a versão
+    atualizadoEm = models.DateTimeField(auto_now=True)
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+# Índices para a busca por prefixo (istartswith) de nome e email no relatório de participantes
+INDICES = {
+    # O Django compara UPPER("campo"::text) LIKE UPPER('prefixo%')
+    'postgresql': [
+        'CREATE INDEX participante_nome_prefixo_idx ON usuarios_participante (UPPER(nome::text) text_pattern_ops)',
+        'CREATE INDEX participante_email_prefixo_idx ON usuarios_participante (UPPER(email::text) text_pattern_ops)',
+    ],
+    # O LIKE do SQLite não diferencia maiúsculas e usa índices com COLLATE NOCASE
+    'sqlite': [
+        'CREATE INDEX participante_nome_prefixo_idx ON usuarios_participante (nome COLLATE NOCASE)',
+        'CREATE INDEX participante_email_prefixo_idx ON usuarios_participante (email COLLATE NOCASE)',
+    ],
+}
+
+
+def criar_indices(apps, schema_editor):
+    for sql in INDICES.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def remover_indices(apps, schema_editor):
+    if schema_editor.connection.vendor in INDICES:
+        schema_editor.execute('DROP INDEX IF EXISTS participante_nome_prefixo_idx')
+        schema_editor.execute('DROP INDEX IF EXISTS participante_email_prefixo_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0002_participante_user'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indices, remover_indices),
+    ]
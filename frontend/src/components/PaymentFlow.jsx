@@ -10,9 +10,57 @@ const PaymentFlow = () => {
     const [error, setError] = useState(null);
 
     useEffect(() => {
-        checkPaymentStatus();
+        const controller = new AbortController();
+        checkPaymentStatus().then((data) => {
+            if (data && data.payment_status !== 'pago') {
+                watchPaymentStatus(data.estado, controller.signal);
+            }
+        });
+        return () => controller.abort();
     }, [inscricaoId]);
 
+    // Uma única conexão por checkout: SSE quando o servidor é ASGI, long-poll no WSGI
+    const watchPaymentStatus = async (estado, signal) => {
+        const token = localStorage.getItem('accessToken');
+        try {
+            while (!signal.aborted) {
+                const response = await fetch(
+                    `/api/payment/status/${inscricaoId}/stream/?estado=${encodeURIComponent(estado || '')}`,
+                    { headers: { 'Authorization': `Bearer ${token}` }, signal }
+                );
+                if (!response.ok) return;
+
+                if ((response.headers.get('Content-Type') || '').startsWith('text/event-stream')) {
+                    const reader = response.body.getReader();
+                    const decoder = new TextDecoder();
+                    let buffer = '';
+                    for (;;) {
+                        const { value, done } = await reader.read();
+                        if (done) break;
+                        buffer += decoder.decode(value, { stream: true });
+                        const events = buffer.split('\n\n');
+                        buffer = events.pop();
+                        for (const event of events) {
+                            const dataLine = event.split('\n').find((line) => line.startsWith('data: '));
+                            if (dataLine) {
+                                const data = JSON.parse(dataLine.slice(6));
+                                setPaymentStatus(data);
+                                estado = data.estado;
+                            }
+                        }
+                    }
+                } else {
+                    const data = await response.json();
+                    setPaymentStatus(data);
+                    estado = data.estado;
+                }
+                if (estado && estado.startsWith('pago:')) return;
+            }
+        } catch (err) {
+            // Conexão encerrada (saída da página ou falha de rede)
+        }
+    };
+
     const checkPaymentStatus = async () => {
         try {
             const token = localStorage.getItem('accessToken');
@@ -26,6 +74,7 @@ const PaymentFlow = () => {
             if (response.ok) {
                 const data = await response.json();
                 setPaymentStatus(data);
+                return data;
             } else {
                 setError('Erro ao verificar status do pagamento');
             }
@@ -78,7 +127,11 @@ const PaymentFlow = () => {
                             <div className="detail-row">
                                 <span>Status do Pagamento:</span>
                                 <span className={`status ${paymentStatus.payment_status}`}>
-                                    {paymentStatus.payment_status === 'pago' ? '✅ Pago' : '⏳ Pendente'}
+                                    {{
+                                        pago: '✅ Pago',
+                                        processando: '🔄 Processando',
+                                        falhou: '❌ Falhou',
+                                    }[paymentStatus.payment_status] || '⏳ Pendente'}
                                 </span>
                             </div>
                             <div className="detail-row">
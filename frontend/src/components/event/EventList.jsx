@@ -2,14 +2,8 @@ import Event from "./Event";
 import { formatDateToBR } from '../../utils/dateUtils';
 import styles from "./EventList.module.css";
 
-function EventList({ events, title, type = "open" }) {
-  const filteredEvents = events.filter(event => {
-    if (type === "open") {
-      return event.isInscricaoAberta === true;
-    } else {
-      return event.isInscricaoAberta === false;
-    }
-  });
+// `events` já vem filtrado pelo servidor (inscricoes=abertas|fechadas); `type` só escolhe os textos
+function EventList({ events, title, type = "open", hasMore = false, loadingMore = false, onLoadMore }) {
 
   const getStatusText = (isInscricaoAberta) => {
     return isInscricaoAberta === true ? "Evento disponível" : "Evento Indisponível";
@@ -19,8 +13,8 @@ function EventList({ events, title, type = "open" }) {
     <section className={styles.eventsSection}>
       <h2 className={styles.sectionTitle}>{title}</h2>
       <div className={styles.eventsGrid}>
-        {filteredEvents.length > 0 ? (
-          filteredEvents.map((event) => (
+        {events.length > 0 ? (
+          events.map((event) => (
             <Event
               key={event.id}
               id={event.id}
@@ -41,6 +35,11 @@ function EventList({ events, title, type = "open" }) {
           </p>
         )}
       </div>
+      {hasMore && onLoadMore && (
+        <button className={styles.loadMore} onClick={onLoadMore} disabled={loadingMore}>
+          {loadingMore ? "Carregando..." : "Carregar mais"}
+        </button>
+      )}
     </section>
   );
 }
@@ -3,7 +3,7 @@ import { useNavigate } from 'react-router-dom';
 import Navigation from '../components/navigation/Navigation';
 import Footer from '../components/footer/Footer';
 import ConfirmationModal from '../components/confirmationModal/ConfirmationModal';
-import { getPendingEvents, updateEventStatus } from '../utils/api/apiTaskManager';
+import { getPendingEvents, updateEventStatus, moderateEvents } from '../utils/api/apiTaskManager';
 import { formatDateToBR } from '../utils/dateUtils';
 import mainImage from '../assets/main-image.jpg';
 import styles from './PendingEvents.module.css';
@@ -11,6 +11,9 @@ import styles from './PendingEvents.module.css';
 function PendingEvents() {
   const navigate = useNavigate();
   const [events, setEvents] = useState([]);
+  const [nextPage, setNextPage] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [selectedEvents, setSelectedEvents] = useState(new Set());
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [updatingEvents, setUpdatingEvents] = useState(new Set());
@@ -19,6 +22,7 @@ function PendingEvents() {
   const [confirmModal, setConfirmModal] = useState({
     isOpen: false,
     eventId: null,
+    eventIds: null,
     status: null,
     eventData: null,
     type: 'default',
@@ -32,8 +36,9 @@ function PendingEvents() {
       try {
         setLoading(true);
         setError('');
-        const eventsData = await getPendingEvents();
-        setEvents(eventsData);
+        const page = await getPendingEvents();
+        setEvents(page.results);
+        setNextPage(page.next);
       } catch (error) {
         console.error('Erro ao carregar eventos pendentes:', error);
         if (error.response?.status === 403) {
@@ -51,6 +56,49 @@ function PendingEvents() {
     loadPendingEvents();
   }, [navigate]);
 
+  const removeEvents = (eventIds) => {
+    setEvents(prevEvents => prevEvents.filter(event => !eventIds.includes(event.id)));
+    setSelectedEvents(prev => new Set([...prev].filter(id => !eventIds.includes(id))));
+  };
+
+  const handleLoadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const page = await getPendingEvents(nextPage);
+      setEvents(prevEvents => [...prevEvents, ...page.results]);
+      setNextPage(page.next);
+    } catch (error) {
+      console.error('Erro ao carregar mais eventos pendentes:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const toggleSelected = (eventId) => {
+    setSelectedEvents(prev => {
+      const newSet = new Set(prev);
+      if (newSet.has(eventId)) {
+        newSet.delete(eventId);
+      } else {
+        newSet.add(eventId);
+      }
+      return newSet;
+    });
+  };
+
+  // Aprovação/negação dos selecionados numa única requisição
+  const handleBulkStatusUpdate = (newStatus) => {
+    setConfirmModal({
+      isOpen: true,
+      eventId: null,
+      eventIds: [...selectedEvents],
+      status: newStatus,
+      eventData: null,
+      type: newStatus === 'ativo' ? 'approve' : 'reject',
+      requiresFeedback: newStatus === 'negado'
+    });
+  };
+
   const handleStatusUpdate = async (eventId, newStatus) => {
     // Verificar se já está atualizando este evento
     if (updatingEvents.has(eventId)) {
@@ -62,7 +110,7 @@ function PendingEvents() {
       await updateEventStatus(eventId, newStatus, false);
       
       // Se chegou aqui, a operação foi bem-sucedida sem precisar de confirmação
-      setEvents(prevEvents => prevEvents.filter(event => event.id !== eventId));
+      removeEvents([eventId]);
       
     } catch (error) {
       if (error.response?.status === 400) {
@@ -103,7 +151,23 @@ function PendingEvents() {
   };
 
   const handleConfirmStatusUpdate = async (feedback = '') => {
-    const { eventId, status } = confirmModal;
+    const { eventId, eventIds, status } = confirmModal;
+
+    if (eventIds) {
+      try {
+        setUpdatingEvents(new Set(eventIds));
+        const result = await moderateEvents(eventIds, status, feedback);
+        // Ignorados já foram moderados por outro admin: também saem da fila
+        removeEvents(eventIds);
+        handleCloseModal();
+        console.log(result.message);
+      } catch (error) {
+        console.error('Erro ao moderar eventos selecionados:', error);
+      } finally {
+        setUpdatingEvents(new Set());
+      }
+      return;
+    }
     
     try {
       // Adicionar evento ao conjunto de eventos sendo atualizados
@@ -113,12 +177,13 @@ function PendingEvents() {
       const result = await updateEventStatus(eventId, status, true, feedback);
       
       // Remover o evento da lista após aprovação/negação
-      setEvents(prevEvents => prevEvents.filter(event => event.id !== eventId));
+      removeEvents([eventId]);
       
       // Fechar modal
       setConfirmModal({
         isOpen: false,
         eventId: null,
+        eventIds: null,
         status: null,
         eventData: null,
         type: 'default',
@@ -144,6 +209,7 @@ function PendingEvents() {
     setConfirmModal({
       isOpen: false,
       eventId: null,
+      eventIds: null,
       status: null,
       eventData: null,
       type: 'default',
@@ -195,6 +261,28 @@ function PendingEvents() {
           </p>
         </div>
 
+        {selectedEvents.size > 0 && (
+          <div className={styles.bulkActions}>
+            <span className={styles.bulkCount}>{selectedEvents.size} evento(s) selecionado(s)</span>
+            <div className={styles.actionButtons}>
+              <button
+                className={styles.approveButton}
+                onClick={() => handleBulkStatusUpdate('ativo')}
+                disabled={updatingEvents.size > 0}
+              >
+                Aprovar selecionados
+              </button>
+              <button
+                className={styles.rejectButton}
+                onClick={() => handleBulkStatusUpdate('negado')}
+                disabled={updatingEvents.size > 0}
+              >
+                Negar selecionados
+              </button>
+            </div>
+          </div>
+        )}
+
         {events.length === 0 ? (
           <div className={styles.emptyState}>
             <h2 className={styles.emptyTitle}>Nenhum evento pendente</h2>
@@ -219,7 +307,15 @@ function PendingEvents() {
                 <div className={styles.eventContent}>
                   <div className={styles.eventHeader}>
                     <h3 className={styles.eventTitle}>{event.nome || "Nome do evento"}</h3>
-                    <span className={styles.eventStatus}>Pendente</span>
+                    <label className={styles.selectEvent}>
+                      <input
+                        type="checkbox"
+                        checked={selectedEvents.has(event.id)}
+                        onChange={() => toggleSelected(event.id)}
+                        disabled={updatingEvents.has(event.id)}
+                      />
+                      <span className={styles.eventStatus}>Pendente</span>
+                    </label>
                   </div>
                   
                   <div className={styles.eventDetails}>
@@ -232,6 +328,9 @@ function PendingEvents() {
                     <p className={styles.eventOrganizer}>
                       <strong>Organizador:</strong> {event.organizador_email || "Não informado"}
                     </p>
+                    <p className={styles.eventDate}>
+                      <strong>Enviado em:</strong> {new Date(event.criadoEm).toLocaleString('pt-BR')}
+                    </p>
                     <p className={styles.eventPrice}>
                       <strong>Valor:</strong> {event.valorInsc ? `R$ ${parseFloat(event.valorInsc).toFixed(2)}` : "Gratuito"}
                     </p>
@@ -267,6 +366,14 @@ function PendingEvents() {
             ))}
           </div>
         )}
+
+        {nextPage && (
+          <div className={styles.loadMoreContainer}>
+            <button className={styles.viewButton} onClick={handleLoadMore} disabled={loadingMore}>
+              {loadingMore ? 'Carregando...' : 'Carregar mais'}
+            </button>
+          </div>
+        )}
       </main>
       
       <Footer />
@@ -277,7 +384,9 @@ function PendingEvents() {
         onConfirm={handleConfirmStatusUpdate}
         title={confirmModal.type === 'approve' ? 'Confirmar Aprovação' : 'Confirmar Negação'}
         message={
-          confirmModal.type === 'approve' 
+          confirmModal.eventIds
+            ? `Tem certeza que deseja ${confirmModal.type === 'approve' ? 'aprovar' : 'negar'} ${confirmModal.eventIds.length} evento(s)? Um email será enviado a cada organizador.`
+            : confirmModal.type === 'approve' 
             ? 'Tem certeza que deseja aprovar este evento? Um email de confirmação será enviado ao organizador.'
             : 'Tem certeza que deseja negar este evento? Um email com seu feedback será enviado ao organizador.'
         }
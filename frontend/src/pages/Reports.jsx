@@ -21,10 +21,16 @@ ChartJS.register(
 const Reports = () => {
   const [eventId, setEventId] = useState('');
   const [userEvents, setUserEvents] = useState([]);
+  const [dashboardTotals, setDashboardTotals] = useState(null);
   const [reportData, setReportData] = useState(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
   const [selectedReportSubtype, setSelectedReportSubtype] = useState('summary');
+  const [participants, setParticipants] = useState([]);
+  const [participantsNext, setParticipantsNext] = useState(null);
+  const [participantsTotals, setParticipantsTotals] = useState({ total: 0, filtrado: null });
+  const [participantFilters, setParticipantFilters] = useState({ q: '', status: '' });
+  const [granularity, setGranularity] = useState('dia');
 
   useEffect(() => {
     fetchUserEvents();
@@ -33,8 +39,10 @@ const Reports = () => {
     const fetchUserEvents = async () => {
     try {
       setLoading(true);
-      const response = await api.get('/eventos/organizador/');
-      setUserEvents(response.data);
+      // Painel: eventos do organizador com os números agregados numa única chamada
+      const response = await api.get('/eventos/organizador/painel/');
+      setUserEvents(response.data.eventos);
+      setDashboardTotals(response.data.totais);
     } catch {
       setError('Erro ao carregar eventos do organizador');
     } finally {
@@ -42,6 +50,58 @@ const Reports = () => {
     }
   };
 
+  // Participantes vêm paginados por cursor; `url` é o link "next" da página anterior
+  const fetchParticipants = async (url = null) => {
+    const params = new URLSearchParams({ page_size: '50' });
+    if (participantFilters.q) params.set('q', participantFilters.q);
+    if (participantFilters.status) params.set('status', participantFilters.status);
+
+    const response = await api.get(url || `/eventos/${eventId}/report/participants/?${params}`);
+    setParticipants(prev => (url ? [...prev, ...response.data.results] : response.data.results));
+    setParticipantsNext(response.data.next);
+    setParticipantsTotals({ total: response.data.total, filtrado: response.data.total_filtrado });
+  };
+
+  const loadReport = async (subtype, granularidade = granularity) => {
+    if (subtype === 'participants') {
+      await fetchParticipants();
+      const selectedEvent = userEvents.find(event => String(event.id) === String(eventId));
+      setReportData({ evento: selectedEvent?.nome, data_geracao: new Date().toLocaleString('pt-BR') });
+    } else {
+      const response = await api.get(`/eventos/${eventId}/report/?type=${subtype}&granularidade=${granularidade}`);
+      setReportData(response.data);
+    }
+  };
+
+  const loadMoreParticipants = async () => {
+    try {
+      setLoading(true);
+      await fetchParticipants(participantsNext);
+    } catch (err) {
+      setError(err.response?.data?.error || 'Erro ao carregar participantes');
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  const handleGranularityChange = async (newGranularity) => {
+    setGranularity(newGranularity);
+    try {
+      setLoading(true);
+      setError('');
+      await loadReport('summary', newGranularity);
+    } catch (err) {
+      setError(err.response?.data?.error || 'Erro ao gerar relatório');
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  const handleParticipantFilter = (e) => {
+    e.preventDefault();
+    generateEventReport();
+  };
+
   const generateEventReport = async () => {
     if (!eventId) {
       setError('Selecione um evento');
@@ -51,8 +111,7 @@ const Reports = () => {
     try {
       setLoading(true);
       setError('');
-      const response = await api.get(`/eventos/${eventId}/report/?type=${selectedReportSubtype}`);
-      setReportData(response.data);
+      await loadReport(selectedReportSubtype);
     } catch (err) {
       setError(err.response?.data?.error || 'Erro ao gerar relatório');
     } finally {
@@ -72,8 +131,7 @@ const Reports = () => {
       try {
         setLoading(true);
         setError('');
-        const response = await api.get(`/eventos/${eventId}/report/?type=${newSubtype}`);
-        setReportData(response.data);
+        await loadReport(newSubtype);
       } catch (err) {
         setError(err.response?.data?.error || 'Erro ao gerar relatório');
       } finally {
@@ -82,31 +140,23 @@ const Reports = () => {
     }
   };
 
-  const exportToCSV = () => {
-    if (!reportData) return;
-
-    let csvContent = '';
-    let filename = '';
-
-    if (selectedReportSubtype === 'participants') {
-      csvContent = "data:text/csv;charset=utf-8,";
-      csvContent += "Nome,Email,Kit,Status,Data Inscrição\n";
-      
-      reportData.participantes?.forEach(participant => {
-        csvContent += `${participant.nome},${participant.email},${participant.kit},${participant.status},${participant.data_inscricao}\n`;
-      });
-      
-      filename = `participantes_${reportData.evento}.csv`;
-    }
-
-    if (csvContent) {
-      const encodedUri = encodeURI(csvContent);
+  // Exportação gerada e transmitida pelo servidor (sem montar a lista no navegador)
+  const exportParticipants = async (format) => {
+    try {
+      const response = await api.get(
+        `/eventos/${eventId}/report/?type=participants&format=${format}`,
+        { responseType: 'blob', timeout: 0 }
+      );
+      const url = URL.createObjectURL(response.data);
       const link = document.createElement("a");
-      link.setAttribute("href", encodedUri);
-      link.setAttribute("download", filename);
+      link.setAttribute("href", url);
+      link.setAttribute("download", `participantes_${reportData.evento}.${format}`);
       document.body.appendChild(link);
       link.click();
       document.body.removeChild(link);
+      URL.revokeObjectURL(url);
+    } catch {
+      setError('Erro ao exportar participantes');
     }
   };
 
@@ -171,16 +221,30 @@ const Reports = () => {
         }]
       };
 
-      // Gráfico de linhas para inscrições por dia
-      const inscricoesPorDiaData = reportData.inscricoes_por_dia ? {
+      // Gráfico de linhas para inscrições por dia ou por hora
+      const porHora = reportData.inscricoes_por_hora;
+      const serieInscricoes = porHora ? {
+        labels: porHora.horas.map(hora => {
+          const date = new Date(`${hora}:00Z`);
+          return date.toLocaleString('pt-BR', { day: '2-digit', month: '2-digit', hour: '2-digit', minute: '2-digit' });
+        }),
+        series: porHora.inscricoes_horarias,
+        label: 'Inscrições por Hora'
+      } : reportData.inscricoes_por_dia ? {
         labels: reportData.inscricoes_por_dia.datas.map(data => {
           const date = new Date(data);
           return date.toLocaleDateString('pt-BR', { day: '2-digit', month: '2-digit' });
         }),
+        series: reportData.inscricoes_por_dia.inscricoes_diarias,
+        label: 'Inscrições Diárias'
+      } : null;
+
+      const inscricoesData = serieInscricoes ? {
+        labels: serieInscricoes.labels,
         datasets: [
           {
-            label: 'Inscrições Diárias',
-            data: reportData.inscricoes_por_dia.inscricoes_diarias,
+            label: serieInscricoes.label,
+            data: serieInscricoes.series,
             borderColor: '#d9a444',
             backgroundColor: 'rgba(217, 164, 68, 0.1)',
             borderWidth: 3,
@@ -194,7 +258,7 @@ const Reports = () => {
         ]
       } : null;
 
-      return { statusData, categoriaData, kitData, inscricoesPorDiaData };
+      return { statusData, categoriaData, kitData, inscricoesData };
     }
 
     return null;
@@ -305,6 +369,29 @@ const Reports = () => {
         <p>Gere relatórios detalhados dos seus eventos</p>
       </div>
 
+      {dashboardTotals && (
+        <div className={styles.statsGrid}>
+          <div className={styles.statCard}>
+            <h3>Eventos</h3>
+            <p className={styles.statValue}>{dashboardTotals.eventos}</p>
+          </div>
+          <div className={styles.statCard}>
+            <h3>Inscrições</h3>
+            <p className={styles.statValue}>{dashboardTotals.inscricoes}</p>
+          </div>
+          <div className={styles.statCard}>
+            <h3>Confirmadas</h3>
+            <p className={styles.statValue}>{dashboardTotals.confirmadas}</p>
+          </div>
+          <div className={styles.statCard}>
+            <h3>Receita</h3>
+            <p className={styles.statValue}>
+              {Number(dashboardTotals.receita).toLocaleString('pt-BR', { style: 'currency', currency: 'BRL' })}
+            </p>
+          </div>
+        </div>
+      )}
+
       <div className={styles.controls}>
         <div className={styles.eventSelector}>
           <select
@@ -315,7 +402,7 @@ const Reports = () => {
             <option value="">Selecione um evento</option>
             {userEvents.map(event => (
               <option key={event.id} value={event.id}>
-                {event.nome} - {new Date(event.dataIni).toLocaleDateString('pt-BR')}
+                {event.nome} - {new Date(event.dataIni).toLocaleDateString('pt-BR')} ({event.inscricoes_total} inscrições, {event.taxa_ocupacao}% ocupado)
               </option>
             ))}
           </select>
@@ -365,9 +452,14 @@ const Reports = () => {
             </h2>
             <div className={styles.actions}>
               {selectedReportSubtype === 'participants' ? (
-                <button onClick={exportToCSV} className={styles.exportButton}>
-                  Exportar CSV
-                </button>
+                <>
+                  <button onClick={() => exportParticipants('csv')} className={styles.exportButton}>
+                    Exportar CSV
+                  </button>
+                  <button onClick={() => exportParticipants('xlsx')} className={styles.exportButton}>
+                    Exportar XLSX
+                  </button>
+                </>
               ) : null}
               <span className={styles.generatedAt}>
                 Gerado em: {reportData.data_geracao}
@@ -402,11 +494,20 @@ const Reports = () => {
             <div className={styles.chartsContainer}>
               {selectedReportSubtype === 'summary' && (
                 <>
-                  {chartData.inscricoesPorDiaData && (
+                  {chartData.inscricoesData && (
                     <div className={styles.chartCard}>
                       <h3>Evolução das Inscrições</h3>
+                      <select
+                        value={granularity}
+                        onChange={(e) => handleGranularityChange(e.target.value)}
+                        disabled={loading}
+                        className={styles.select}
+                      >
+                        <option value="dia">Por dia</option>
+                        <option value="hora">Por hora</option>
+                      </select>
                       <div className={styles.chartContainer}>
-                        <Line data={chartData.inscricoesPorDiaData} options={lineChartOptions} />
+                        <Line data={chartData.inscricoesData} options={lineChartOptions} />
                       </div>
                     </div>
                   )}
@@ -441,9 +542,33 @@ const Reports = () => {
           )}
 
           {/* Tabela de Participantes */}
-          {selectedReportSubtype === 'participants' && reportData.participantes && (
+          {selectedReportSubtype === 'participants' && (
             <div className={styles.tableCard}>
-              <h3>Lista de Participantes</h3>
+              <h3>
+                Lista de Participantes ({participants.length} de {participantsTotals.filtrado ?? participantsTotals.total})
+              </h3>
+              <form onSubmit={handleParticipantFilter} className={styles.subtypeSelector}>
+                <input
+                  type="search"
+                  placeholder="Buscar por nome ou email"
+                  value={participantFilters.q}
+                  onChange={(e) => setParticipantFilters({ ...participantFilters, q: e.target.value })}
+                  className={styles.select}
+                />
+                <select
+                  value={participantFilters.status}
+                  onChange={(e) => setParticipantFilters({ ...participantFilters, status: e.target.value })}
+                  className={styles.select}
+                >
+                  <option value="">Todos os status</option>
+                  <option value="confirmada">Confirmada</option>
+                  <option value="pendente">Pendente</option>
+                  <option value="cancelado">Cancelado</option>
+                </select>
+                <button type="submit" disabled={loading} className={styles.exportButton}>
+                  Filtrar
+                </button>
+              </form>
               <div className={styles.tableContainer}>
                 <table className={styles.participantsTable}>
                   <thead>
@@ -456,22 +581,27 @@ const Reports = () => {
                     </tr>
                   </thead>
                   <tbody>
-                    {reportData.participantes.map((participant, index) => (
-                      <tr key={index}>
+                    {participants.map(participant => (
+                      <tr key={participant.id}>
                         <td>{participant.nome}</td>
                         <td>{participant.email}</td>
-                        <td>{participant.kit}</td>
+                        <td>{participant.kit_nome || 'Sem kit'}</td>
                         <td>
                           <span className={`${styles.status} ${styles[participant.status]}`}>
                             {participant.status}
                           </span>
                         </td>
-                        <td>{participant.data_inscricao}</td>
+                        <td>{new Date(participant.criadoEm).toLocaleDateString('pt-BR')}</td>
                       </tr>
                     ))}
                   </tbody>
                 </table>
               </div>
+              {participantsNext && (
+                <button onClick={loadMoreParticipants} disabled={loading} className={styles.generateButton}>
+                  {loading ? 'Carregando...' : 'Carregar mais'}
+                </button>
+              )}
             </div>
           )}
         </div>
@@ -8,8 +8,15 @@ import EventList from "../components/event/EventList";
 import { useEvents } from "../utils/hooks/useEvents";
 import styles from "./initialPage.module.css";
 
+const FILTRO_ABERTOS = { inscricoes: "abertas" };
+const FILTRO_FECHADOS = { inscricoes: "fechadas" };
+
 function InitialPage() {
-  const { events, loading, error } = useEvents();
+  // Filtro de inscrições aplicado no servidor; cada lista pagina pelo próprio cursor
+  const abertos = useEvents(FILTRO_ABERTOS);
+  const fechados = useEvents(FILTRO_FECHADOS);
+  const loading = abertos.loading || fechados.loading;
+  const error = abertos.error || fechados.error;
   
   useEffect(() => {
     window.scrollTo(0, 0);
@@ -35,15 +42,21 @@ function InitialPage() {
       {!loading && !error && (
         <>
           <EventList 
-            events={events} 
+            events={abertos.events} 
             title="Todos os Eventos" 
             type="open" 
+            hasMore={abertos.hasMore}
+            loadingMore={abertos.loadingMore}
+            onLoadMore={abertos.loadMore}
           />
           
           <EventList 
-            events={events} 
+            events={fechados.events} 
             title="Eventos Indisponíveis" 
             type="closed" 
+            hasMore={fechados.hasMore}
+            loadingMore={fechados.loadingMore}
+            onLoadMore={fechados.loadMore}
           />
         </>
       )}
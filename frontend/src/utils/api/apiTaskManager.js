@@ -1,8 +1,9 @@
 import api from "./Api";
 
-async function getAllEvents() {
+// Uma página do catálogo: { results, next }. `next` (URL do cursor) já carrega os filtros
+async function getAllEvents(params = {}, url = null) {
   try {
-    const response = await api.get("/eventos/");
+    const response = url ? await api.get(url) : await api.get("/eventos/", { params });
     return response.data;
   } catch (error) {
     console.error("Erro ao buscar eventos:", error);
@@ -146,6 +147,11 @@ async function createEvent(eventData) {
     }
     
     const response = await api.post("/eventos/criar/", eventData, config);
+    // Primeiro evento do usuário: tokens reemitidos com o organizador nas claims
+    if (response.data.tokens) {
+      localStorage.setItem('authToken', response.data.tokens.access);
+      localStorage.setItem('refreshToken', response.data.tokens.refresh);
+    }
     return response.data;
   } catch (error) {
     console.error("Erro ao criar evento:", error);
@@ -195,9 +201,10 @@ async function getEventToManage(eventId) {
 export default getAllEvents;
 export { getEventById };
 
-async function getPendingEvents() {
+// Fila de moderação paginada por cursor; `url` é o link "next" da página anterior
+async function getPendingEvents(url = null) {
   try {
-    const response = await api.get("/eventos/pendentes/");
+    const response = await api.get(url || "/eventos/pendentes/fila/");
     return response.data;
   } catch (error) {
     console.error("Erro ao buscar eventos pendentes:", error);
@@ -224,6 +231,22 @@ async function updateEventStatus(eventId, status, confirmacao = false, feedback_
   }
 }
 
+async function moderateEvents(ids, status, feedback_admin = '') {
+  try {
+    const payload = { ids, status, confirmacao: true };
+
+    if (status === 'negado') {
+      payload.feedback_admin = feedback_admin.trim();
+    }
+
+    const response = await api.post("/eventos/pendentes/lote/", payload);
+    return response.data;
+  } catch (error) {
+    console.error("Erro ao moderar eventos em lote:", error);
+    throw error;
+  }
+}
+
 export { getUserInscriptions };
 export { getUserProfile };
 export { getUserAuthProfile };
@@ -238,6 +261,7 @@ export { createEvent };
 export { updateEvent };
 export { getPendingEvents };
 export { updateEventStatus };
+export { moderateEvents };
 export { cancelEvent };
 export { getEventToManage };
 export { getPaymentStatus };
@@ -1,44 +1,49 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useCallback } from 'react';
 import getAllEvents from '../api/apiTaskManager';
 
-export function useEvents() {
+// Catálogo paginado no servidor: `filtros` vão como query params (inscricoes, uf, cidade,
+// data_inicio, data_fim, valor_min, valor_max) e loadMore() segue o cursor `next`
+export function useEvents(filtros = {}) {
   const [events, setEvents] = useState([]);
+  const [next, setNext] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState(null);
+  const chaveFiltros = JSON.stringify(filtros);
 
-  useEffect(() => {
-    const fetchEvents = async () => {
-      try {
-        setLoading(true);
-        setError(null);
-        const eventsData = await getAllEvents();
-        const eventosAtivos = eventsData.filter(evento => evento.status !== 'cancelado');
-        setEvents(eventosAtivos);
-      } catch (error) {
-        setError("Erro ao carregar eventos");
-        console.error("Erro ao buscar eventos:", error);
-      } finally {
-        setLoading(false);
-      }
-    };
-
-    fetchEvents();
-  }, []);
-
-  const refetch = async () => {
+  const fetchEvents = useCallback(async () => {
     try {
       setLoading(true);
       setError(null);
-      const eventsData = await getAllEvents();
-      const eventosAtivos = eventsData.filter(evento => evento.status !== 'cancelado');
-      setEvents(eventosAtivos);
+      const page = await getAllEvents(JSON.parse(chaveFiltros));
+      setEvents(page.results);
+      setNext(page.next);
     } catch (error) {
       setError("Erro ao carregar eventos");
       console.error("Erro ao buscar eventos:", error);
     } finally {
       setLoading(false);
     }
+  }, [chaveFiltros]);
+
+  useEffect(() => {
+    fetchEvents();
+  }, [fetchEvents]);
+
+  const loadMore = async () => {
+    if (!next || loadingMore) return;
+    try {
+      setLoadingMore(true);
+      const page = await getAllEvents({}, next);
+      setEvents(prev => [...prev, ...page.results]);
+      setNext(page.next);
+    } catch (error) {
+      setError("Erro ao carregar eventos");
+      console.error("Erro ao buscar eventos:", error);
+    } finally {
+      setLoadingMore(false);
+    }
   };
 
-  return { events, loading, error, refetch };
+  return { events, loading, loadingMore, error, hasMore: Boolean(next), loadMore, refetch: fetchEvents };
 }